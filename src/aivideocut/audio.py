@@ -0,0 +1,135 @@
+# pyright: basic
+from collections.abc import Callable, Generator, Iterable
+from pathlib import Path
+
+import av
+import numpy as np
+
+
+def probe_audio(input_file: Path) -> tuple[int, int]:
+    with av.open(str(input_file)) as container:
+        audio_stream = container.streams.audio[0]
+        return audio_stream.rate, audio_stream.channels
+
+
+def decode_audio(input_file: Path) -> Generator[av.AudioFrame]:
+    with av.open(str(input_file)) as container:
+        yield from container.decode(container.streams.audio[0])
+
+
+def get_float_resampler(
+    frame: av.AudioFrame,
+    *,
+    sampling_rate: int | None = None,
+    layout: str | None = None,
+) -> av.AudioResampler:
+    return av.AudioResampler(
+        format="fltp",
+        layout=layout or frame.layout.name,
+        rate=sampling_rate or frame.sample_rate,
+    )
+
+
+def resample_audio(
+    frames: Iterable[av.AudioFrame],
+    *,
+    sampling_rate: int | None = None,
+    layout: str | None = None,
+) -> Generator[np.ndarray]:
+    # Yields float32 arrays shaped (channels, samples), converted frame by frame
+    # so memory does not grow with the duration of the file.
+    resampler: av.AudioResampler | None = None
+
+    for frame in frames:
+        if resampler is None:
+            resampler = get_float_resampler(
+                frame, sampling_rate=sampling_rate, layout=layout
+            )
+
+        for resampled_frame in resampler.resample(frame):
+            yield resampled_frame.to_ndarray()
+
+    if resampler is not None:
+        for resampled_frame in resampler.resample(None):
+            yield resampled_frame.to_ndarray()
+
+
+def tap_audio(
+    frames: Iterable[av.AudioFrame], consumer: Callable[[np.ndarray], None]
+) -> Generator[av.AudioFrame]:
+    # Hands every frame to `consumer` as native rate float32 while passing the
+    # frames on unchanged, so a single decode can feed two analyses.
+    resampler: av.AudioResampler | None = None
+
+    for frame in frames:
+        if resampler is None:
+            resampler = get_float_resampler(frame)
+
+        for resampled_frame in resampler.resample(frame):
+            consumer(resampled_frame.to_ndarray())
+
+        yield frame
+
+    if resampler is not None:
+        for resampled_frame in resampler.resample(None):
+            consumer(resampled_frame.to_ndarray())
+
+
+def iter_audio_frames(
+    input_file: Path,
+    *,
+    sampling_rate: int | None = None,
+    layout: str | None = None,
+) -> Generator[np.ndarray]:
+    return resample_audio(
+        decode_audio(input_file), sampling_rate=sampling_rate, layout=layout
+    )
+
+
+def iter_audio_chunks(
+    frames: Iterable[np.ndarray], chunk_samples: int
+) -> Generator[np.ndarray]:
+    # Re-blocks frames of any size into fixed-size chunks. The last chunk is
+    # zero-padded, models like Silero only accept exact window sizes.
+    pending: np.ndarray | None = None
+
+    for frame in frames:
+        pending = frame if pending is None else np.concatenate((pending, frame), 1)
+
+        full_chunks = pending.shape[1] // chunk_samples
+        for i in range(full_chunks):
+            yield pending[:, i * chunk_samples : (i + 1) * chunk_samples]
+
+        pending = pending[:, full_chunks * chunk_samples :]
+
+    if pending is not None and pending.shape[1] > 0:
+        padding = chunk_samples - pending.shape[1]
+        yield np.pad(pending, ((0, 0), (0, padding)))
+
+
+def gather_audio_intervals(
+    frames: Iterable[np.ndarray], sample_intervals: np.ndarray
+) -> np.ndarray:
+    # Concatenates the first channel inside sorted [start, end) sample
+    # intervals while decoding, so the gaps never pile up in memory.
+    interval_starts, interval_ends = sample_intervals[:, 0], sample_intervals[:, 1]
+    pieces: list[np.ndarray] = []
+    frame_start = 0
+
+    for frame in frames:
+        samples = frame[0]
+        frame_end = frame_start + samples.size
+
+        first = int(np.searchsorted(interval_ends, frame_start, side="right"))
+        last = int(np.searchsorted(interval_starts, frame_end, side="left"))
+        for start, end in sample_intervals[first:last].tolist():
+            pieces.append(
+                samples[
+                    max(start, frame_start) - frame_start : min(end, frame_end)
+                    - frame_start
+                ]
+            )
+
+        frame_start = frame_end
+
+    return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
@@ -0,0 +1,221 @@
+# pyright: basic
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from aivideocut.configs import ORIGINAL_SRT_FILE_PATH, gemini_cache, whisper_parallel
+
+# Every handler imports its module when it runs, so `aivideocut seo` never
+# loads torch, whisper or smartcut. This is also what `import-bench` times.
+COMMAND_MODULES = {
+    "cut": "aivideocut.sil2",
+    "transcribe": "aivideocut.transcribe",
+    "fix-srt": "aivideocut.gem_srt",
+    "translate": "aivideocut.gem_srt_english",
+    "summary": "aivideocut.gem_summary",
+    "chapters": "aivideocut.gem_yt_chapters",
+    "seo": "aivideocut.gem_yt_seo",
+    "article": "aivideocut.gem_article",
+}
+MODEL_COMMANDS = frozenset({"cut", "transcribe"})
+TEXT_COMMAND_MAX_IMPORT_SECS = 1
+
+# Same defaults as `run_many_files`, each one becomes --flag/--no-flag
+CUT_FLAGS = {
+    "normalize_audio": True,
+    "cut_audio_silences": True,
+    "cut_speech_silences": True,
+    "fix_codecs": True,
+    "fuse_fix_and_normalize": False,
+    "stream_vad": False,
+    "parallel_vad": False,
+    "vad_probabilities": False,
+    "measure_loudness_in_process": False,
+    "native_silence_cut": False,
+    "single_render": False,
+    "transcribe_srt": False,
+    "use_cache": True,
+}
+
+
+def run_cut(args: argparse.Namespace) -> None:
+    from aivideocut.sil2 import run_many_files, run_single_file
+
+    cut_flags = {flag: getattr(args, flag) for flag in CUT_FLAGS}
+
+    if args.input_path.is_file():
+        run_single_file(input_path=args.input_path, dry_run=args.dry_run, **cut_flags)
+        return
+
+    run_many_files(
+        input_path=args.input_path,
+        dry_run=args.dry_run,
+        workers=args.workers,
+        **cut_flags,
+    )
+
+
+def run_transcribe(args: argparse.Namespace) -> None:
+    from aivideocut.segments import read_speech_timestamps
+    from aivideocut.transcribe import transcribe_to_srt
+
+    transcribe_to_srt(
+        input_file=args.input_file,
+        output_file=args.output,
+        speech_timestamps=(
+            read_speech_timestamps(args.speech_json) if args.speech_json else None
+        ),
+        workers=args.workers,
+        dry_run=args.dry_run,
+    )
+
+
+def run_fix_srt(_args: argparse.Namespace) -> None:
+    from aivideocut.gem_srt import fix_srt_typos
+
+    fix_srt_typos()
+
+
+def run_translate(_args: argparse.Namespace) -> None:
+    from aivideocut.gem_srt_english import gem_translate_srt_to_pt_br
+
+    gem_translate_srt_to_pt_br()
+
+
+def run_summary(args: argparse.Namespace) -> None:
+    from aivideocut.gem_summary import generate_summary
+
+    generate_summary(dry_run=args.dry_run)
+
+
+def run_chapters(args: argparse.Namespace) -> None:
+    from aivideocut.gem_yt_chapters import gem_yt_chapters
+
+    gem_yt_chapters(dry_run=args.dry_run)
+
+
+def run_seo(_args: argparse.Namespace) -> None:
+    from aivideocut.gem_yt_seo import gem_yt_seo
+
+    gem_yt_seo()
+
+
+def run_article(args: argparse.Namespace) -> None:
+    from aivideocut.gem_article import gem_create_article
+
+    gem_create_article(dry_run=args.dry_run)
+
+
+def time_module_import(module: str, *, runs: int = 3) -> float | None:
+    # A fresh interpreter each run, best of `runs`. None if the import fails.
+    best_secs = float("inf")
+
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        process = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", f"import {module}"],
+            capture_output=True,
+            check=False,
+        )
+        elapsed_secs = time.perf_counter() - start_time
+
+        if process.returncode != 0:
+            return None
+
+        best_secs = min(best_secs, elapsed_secs)
+
+    return best_secs
+
+
+def run_import_bench(_args: argparse.Namespace) -> None:
+    interpreter_secs = time_module_import("sys") or 0.0
+    print(f"🐍 interpreter startup: {interpreter_secs * 1000:.0f}ms")
+
+    for command, module in COMMAND_MODULES.items():
+        import_secs = time_module_import(module)
+
+        if import_secs is None:
+            print(f"🔴 {command:<10} {module}: import failed")
+            continue
+
+        is_fast = import_secs < TEXT_COMMAND_MAX_IMPORT_SECS
+        status = "✅" if is_fast or command in MODEL_COMMANDS else "🔴"
+        print(
+            status,
+            f"{command:<10} {import_secs * 1000:>6.0f}ms",
+            f"({(import_secs - interpreter_secs) * 1000:.0f}ms of imports)",
+        )
+
+
+def add_cut_parser(subparsers: argparse._SubParsersAction) -> None:
+    parser = subparsers.add_parser("cut", help="cut silences from a video or dir")
+    parser.add_argument("input_path", type=Path)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--dry-run", action="store_true")
+
+    for flag, default in CUT_FLAGS.items():
+        parser.add_argument(
+            f"--{flag.replace('_', '-')}",
+            action=argparse.BooleanOptionalAction,
+            default=default,
+        )
+
+    parser.set_defaults(handler=run_cut)
+
+
+def add_transcribe_parser(subparsers: argparse._SubParsersAction) -> None:
+    parser = subparsers.add_parser("transcribe", help="transcribe a video to SRT")
+    parser.add_argument("input_file", type=Path)
+    parser.add_argument("speech_json", type=Path, nargs="?")
+    parser.add_argument("--output", type=Path, default=ORIGINAL_SRT_FILE_PATH)
+    parser.add_argument("--workers", type=int, default=whisper_parallel["workers"])
+    parser.add_argument("--dry-run", action="store_true")
+    parser.set_defaults(handler=run_transcribe)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="aivideocut")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    add_cut_parser(subparsers)
+    add_transcribe_parser(subparsers)
+
+    for command, handler, help_text, has_dry_run in (
+        ("fix-srt", run_fix_srt, "fix typos in the transcription", False),
+        ("translate", run_translate, "translate the fixed SRT", False),
+        ("summary", run_summary, "summarize the fixed SRT", True),
+        ("chapters", run_chapters, "YouTube chapters from the fixed SRT", True),
+        ("seo", run_seo, "YouTube SEO from the summary", False),
+        ("article", run_article, "article from the fixed SRT", True),
+    ):
+        command_parser = subparsers.add_parser(command, help=help_text)
+        command_parser.add_argument(
+            "--no-gemini-cache",
+            action="store_true",
+            help="ask Gemini again even for prompts already answered",
+        )
+        if has_dry_run:
+            command_parser.add_argument("--dry-run", action="store_true")
+        command_parser.set_defaults(handler=handler)
+
+    bench_parser = subparsers.add_parser(
+        "import-bench", help="time how long each command takes to import"
+    )
+    bench_parser.set_defaults(handler=run_import_bench)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = get_parser().parse_args(argv)
+
+    if getattr(args, "no_gemini_cache", False):
+        gemini_cache["enabled"] = False
+
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
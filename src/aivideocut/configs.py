@@ -1,4 +1,6 @@
+import os
 import re
+import tempfile
 from pathlib import Path
 from typing import Literal, TypeAlias
 
@@ -12,6 +14,103 @@ transcribe = {
     # "clip_timestamps": [0, 60],
 }
 
+# faster-whisper on CPU: int8 (or int8_float32) runs several times faster
+# than float32. cpu_threads=0 lets CTranslate2 decide.
+whisper_model_options = {
+    "device": "cpu",
+    "compute_type": "int8",
+    "cpu_threads": 0,
+}
+
+# > 1 uses faster-whisper's BatchedInferencePipeline, which runs its own VAD
+# and transcribes that many speech chunks per forward pass.
+whisper_batch_size = 8
+
+# Transcribe only what Silero marks as speech (packed into 30s clips) when
+# the pipeline transcribes a file that was not speech-cut.
+whisper_vad_gate = True
+
+# The speech is split at pack boundaries (silences) into chunks of about
+# `chunk_secs` and each chunk is transcribed in its own process. Chunks only
+# depend on `chunk_secs`, so the SRT is the same for any number of `workers`
+# (1 runs them here, one after the other). Every worker loads its own model,
+# ~1.5GB of RAM each for large-v2 int8.
+whisper_parallel = {
+    "workers": 1,
+    "chunk_secs": 600,
+}
+
+# Every finished chunk (or, transcribing the whole file, every batched VAD
+# clip or sequential 30s window) is appended to `<srt>.journal.jsonl`, a
+# crashed or killed transcription resumes from there. Chunks and batched
+# clips give the same SRT, byte for byte. A sequential run resumes at the
+# next window with the same prompt, so the same segments; only the first
+# word times of that window may move (faster-whisper restarts the clamp it
+# keeps on the last word end).
+whisper_checkpoint = True
+
+# Encode of the fix codecs stage (and of the fused fix + normalize)
+ffmpeg_video_encode = {
+    "codec": "libx264",
+    "crf": "13",
+    "preset": "fast",
+}
+# Audio encode of every ffmpeg stage that rewrites the audio
+ffmpeg_audio_encode = {
+    "codec": "aac",
+    "bitrate": "512k",
+}
+# EBU R128 targets of the audio normalization (ffmpeg's loudnorm)
+audio_normalization = {
+    "loudnorm_i": "-14",
+    "loudnorm_tp": "-2.0",
+    "loudnorm_lra": "11",
+}
+
+silero_vad = {
+    "threshold": 0.5,
+    "min_speech_duration_ms": 100,  # old 150
+    "min_silence_duration_ms": 50,  # old 100
+    "speech_pad_ms": 30,
+}
+
+# Built-in replacement for auto-editor's
+# `--edit audio:threshold=0.04,stream=all,mincut=30 --margin 0.2s,0.3s`
+# `--add-in 0,2sec --add-in -2sec,end`
+audio_silence = {
+    "method": "peak",
+    "threshold": 0.04,
+    "mincut": 30,
+    "minclip": 3,
+    "margin_secs": (0.2, 0.3),
+    "add_in_secs": ((0, 2), (-2, None)),
+}
+
+# torch intra-op threads for Silero, None lets torch use every core
+silero_torch_threads: int | None = None
+
+# Parallel VAD: the audio is split into `window_secs` windows, each one with
+# `overlap_secs` of context on both sides. `workers=None` uses every core.
+silero_parallel = {
+    "workers": None,
+    "window_secs": 300,
+    "overlap_secs": 10,
+}
+
+silero_adjust = {
+    "min_speech_length_secs": 0.2,  # old 0.5
+    "pad_start_secs": 0.01,  # old 0.03
+    "pad_end_secs": 0.01,  # old 0.04
+}
+
+# Values tried by `python -m aivideocut.speech_probs` on top of the settings
+# above, any silero_vad or silero_adjust key can be swept.
+silero_sweep = {
+    "threshold": [0.35, 0.5, 0.65],
+    "min_silence_duration_ms": [50, 100, 200],
+    "speech_pad_ms": [30, 60],
+}
+
 GeminiModels: TypeAlias = Literal[
     # Família Gemini 1.5
     # 1.5-flash-8b
@@ -107,7 +206,65 @@ GeminiModels: TypeAlias = Literal[
 ]
 
 DEFAULT_GEMINI_MODEL: GeminiModels = "gemini-1.5-flash-latest"
-PROMPT_MAX_CHARS = 6000
+
+# (input, output) token limits by model name prefix, the longest prefix wins
+gemini_token_limits = {
+    "gemini-1.5-flash": (1_048_576, 8_192),
+    "gemini-1.5-flash-8b": (1_048_576, 8_192),
+    "gemini-1.5-pro": (2_097_152, 8_192),
+    "gemini-2.0-flash": (1_048_576, 8_192),
+    "gemini-2.0-flash-lite": (1_048_576, 8_192),
+    "gemini-2.5-flash": (1_048_576, 65_536),
+    "gemini-2.5-pro": (1_048_576, 65_536),
+}
+
+# Chunks are sized in estimated tokens: as much text as fits in the input
+# limit next to the prompt template, and whose answer (text tokens times the
+# task's output ratio) fits in `output_safety` of the output limit. Never more
+# than `max_chunk_tokens`, very long inputs get shallow answers.
+# Summary and article chunks may repeat `text_overlap_tokens` of the end of
+# the previous chunk, so no chunk starts without context. The repeated text
+# is answered twice, so it is off by default.
+gemini_chunking = {
+    "max_chunk_tokens": 32_000,
+    "output_safety": 0.8,
+    "text_overlap_tokens": 0,
+}
+# Output tokens per input token of each task. SRT fixes and translations
+# answer with the whole input again, summaries and chapters with far less.
+gemini_output_ratios = {
+    "fix_srt": 1.1,
+    "translate": 1.2,
+    "summary": 0.3,
+    "chapters": 0.1,
+    "article": 1.0,
+}
+# Translations send only numbered cue texts, one line per cue, and the SRT is
+# rebuilt here from the original cues: no index or timestamp tokens are paid
+# for (twice) and the answer cannot break the timing. False sends whole SRT
+# blocks and saves the answer as is.
+gemini_translate_cue_texts = True
+
+# Chunks of one script sent to Gemini at the same time. Responses are still
+# joined in chunk order. Lower it if the API key hits its rate limit.
+gemini_concurrency = 8
+
+# Shared by every request of the process. `timeout_ms` is per request,
+# `base_url=None` is Google's endpoint.
+gemini_http_options = {
+    "base_url": None,
+    "timeout_ms": 120_000,
+}
+
+# Responses for the same model, prompt and config are reused from disk, so a
+# rerun only pays for the chunks that changed. The least recently used go
+# once the cache passes `max_bytes`. `ttl_secs=None` never expires them.
+gemini_cache = {
+    "enabled": True,
+    "max_bytes": 256 * 1024 * 1024,
+    "ttl_secs": None,
+}
+GEMINI_CACHE_PATH = Path.home() / ".cache" / "aivideocut" / "gemini_responses.sqlite3"
 
 OUTPUT_DIR_NAME = "transcriptions"
 
@@ -122,8 +279,40 @@ SEO_YT_FILE_PATH = OUTPUT_DIR_PATH / "seo_yt.md"
 CHAPTERS_YT_FILE_PATH = OUTPUT_DIR_PATH / "chapters_yt.md"
 ARTICLE_FILE_PATH = OUTPUT_DIR_PATH / "article.md"
 
-ONE_LINE_RE = re.compile(r"(?:\r?\n)")
-DOUBLE_LINE_RE = re.compile(r"(?:\r?\n){2}")
+# `python -m aivideocut.model_server` keeps Silero and Whisper loaded and runs
+# their jobs for every script that finds this socket. With no server there
+# (or use_model_server=False) the jobs run in the calling process. The socket
+# and the server's auth key live in a directory only this user can open.
+use_model_server = True
+MODEL_SERVER_DIR = (
+    Path(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir())
+    / f"aivideocut-models-{os.getuid()}"
+)
+MODEL_SERVER_SOCKET_PATH = MODEL_SERVER_DIR / "models.sock"
 
 ANY_SPACE_RE = re.compile(r"\s+")
 ENDING_DOT_RE = re.compile(r"([.!?])(?=\s|$)")
+
+# One SRT cue, matched on the raw bytes of the file: an optional index line,
+# the timing line, then the text lines up to the first blank line or the
+# next cue. The search skips any blank lines (spaces, \r) between cues.
+SRT_CUE_RE = re.compile(
+    rb"""
+    ^(?:\xef\xbb\xbf)?
+    (?:[ \t]*(\d+)[ \t]*\r?\n)?
+    [ \t]*(\d+):(\d\d):(\d\d)[,.](\d{3})[ \t]*-->
+    [ \t]*(\d+):(\d\d):(\d\d)[,.](\d{3})[^\r\n]*
+    (
+        (?:
+            \r?\n
+            (?!(?:[ \t]*\d+[ \t]*\r?\n)?[ \t]*\d+:\d\d:\d\d[,.]\d{3}[ \t]*-->)
+            [ \t]*\S[^\r\n]*
+        )*
+    )
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+# `12: text` lines of cue text payloads (see `srt.format_cue_text_lines`)
+CUE_TEXT_LINE_RE = re.compile(
+    r"^[ \t]*(\d+)[ \t]*[:.)][ \t]*(.*?)[ \t]*$", re.MULTILINE
+)
@@ -1,19 +1,22 @@
 # pyright: basic
+from functools import partial
 
 from rich import print as rprint
 
 from aivideocut.configs import (
     ARTICLE_FILE_PATH,
     OUTPUT_DIR_PATH,
-    PROMPT_MAX_CHARS,
     SRT_FIXED_FILENAME,
+    gemini_chunking,
+    gemini_output_ratios,
 )
 from aivideocut.gem_prompts import create_technical_explanation_prompt
-from aivideocut.gem_utils import ask_gemini
+from aivideocut.gem_tokens import get_chunk_token_budget, get_text_chunk_chars
+from aivideocut.gem_utils import ask_gemini_many
+from aivideocut.srt import read_srt_file
 from aivideocut.utils import (
     create_file_path,
     extract_text_from_srt,
-    read_file_path,
     smart_text_split,
     write_str_to_file,
 )
@@ -27,28 +30,37 @@ def gem_create_article(*, dry_run: bool = False) -> None:
         today_parent=False,
         separator="",
     )
-    srt_content = read_file_path(fixed_srt_path)
-    extracted_srt_text = extract_text_from_srt(srt_content)
+    srt_cues = read_srt_file(fixed_srt_path)
+    extracted_srt_text = extract_text_from_srt(srt_cues)
+    prompt_template = partial(
+        create_technical_explanation_prompt,
+        additional_context=(
+            "Vídeo educacional mostrando exemplos de uso avançado de "
+            "f-string no Python."
+        ),
+    )
+    max_tokens = get_chunk_token_budget(
+        prompt_template=prompt_template,
+        output_ratio=gemini_output_ratios["article"],
+    )
 
     text_chunks = smart_text_split(
-        extracted_srt_text, approx_max_chars=PROMPT_MAX_CHARS
+        extracted_srt_text,
+        approx_max_chars=get_text_chunk_chars(extracted_srt_text, max_tokens),
+        overlap_chars=get_text_chunk_chars(
+            extracted_srt_text, gemini_chunking["text_overlap_tokens"]
+        ),
     )
 
-    response_text = ""
-    for text in text_chunks:
-        prompt = create_technical_explanation_prompt(
-            text,
-            (
-                "Vídeo educacional mostrando exemplos de uso avançado de "
-                "f-string no Python."
-            ),
-        )
-
-        if dry_run:
+    prompts = [prompt_template(text) for text in text_chunks]
+
+    if dry_run:
+        for prompt in prompts:
             rprint(prompt, "\n\n---\n\n")
-            continue
+        return
 
-        gemini_response = ask_gemini(prompt)
+    response_text = ""
+    for gemini_response in ask_gemini_many(prompts):
         gemini_response_text = gemini_response.text
 
         if gemini_response_text:
@@ -57,9 +69,6 @@ def gem_create_article(*, dry_run: bool = False) -> None:
 
         rprint(response_text)
 
-    if dry_run:
-        return
-
     if not response_text:
         rprint("\n🔴 Gemini did not return the text")
         return
@@ -0,0 +1,100 @@
+# pyright: basic
+import json
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Any
+
+from aivideocut.configs import DEFAULT_GEMINI_MODEL
+from aivideocut.gem_utils import evict_gemini_clients, get_gemini_client
+
+STUB_GEMINI_RESPONSE = json.dumps(
+    {
+        "candidates": [
+            {
+                "content": {"parts": [{"text": "pong"}], "role": "model"},
+                "finishReason": "STOP",
+            }
+        ],
+        "modelVersion": "stub",
+    }
+).encode()
+
+
+class StubGeminiServer(ThreadingHTTPServer):
+    connections = 0
+
+
+class StubGeminiHandler(BaseHTTPRequestHandler):
+    # Answers every generateContent with a fixed response, keeping the
+    # connection open like Google's endpoint does.
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in two writes, with Nagle on a kept-alive
+    # connection waits ~40ms for the client's delayed ACK
+    disable_nagle_algorithm = True
+    server: StubGeminiServer
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(STUB_GEMINI_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(STUB_GEMINI_RESPONSE)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, ANN401
+        pass
+
+
+def benchmark_gemini_client(requests: int = 200) -> None:
+    # Plain HTTP on localhost, so this is the client overhead only. Against
+    # Google every new connection also pays DNS and a TLS handshake.
+    from google import genai
+    from google.genai import types
+
+    os.environ.setdefault("GEMINI_API_KEY", "stub")
+    server = StubGeminiServer(("127.0.0.1", 0), StubGeminiHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/"
+
+    def new_client_request() -> None:
+        # What ask_gemini did before: a new client (and connection) each time
+        client = genai.Client(
+            api_key=os.getenv("GEMINI_API_KEY"),
+            http_options=types.HttpOptions(base_url=base_url),
+        )
+        client.models.generate_content(model=DEFAULT_GEMINI_MODEL, contents="ping")
+
+    def shared_client_request() -> None:
+        client = get_gemini_client(base_url=base_url)
+        client.models.generate_content(model=DEFAULT_GEMINI_MODEL, contents="ping")
+
+    for name, send_request in (
+        ("new client per request", new_client_request),
+        ("shared client", shared_client_request),
+    ):
+        send_request()  # warm up
+        server.connections = 0
+        start_time = time.perf_counter()
+
+        for _ in range(requests):
+            send_request()
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        print(
+            f"⏱️ {name:<24} {elapsed_ms / requests:6.2f}ms/request,",
+            f"{server.connections} new connection(s) for {requests} requests",
+        )
+
+    server.shutdown()
+    evict_gemini_clients()
+
+
+if __name__ == "__main__":
+    # python -m aivideocut.gem_bench
+    benchmark_gemini_client()
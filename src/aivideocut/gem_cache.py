@@ -0,0 +1,143 @@
+# pyright: basic
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from collections.abc import Mapping
+from contextlib import closing
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from aivideocut.configs import GEMINI_CACHE_PATH, gemini_cache
+
+if TYPE_CHECKING:
+    from google.genai.types import GenerateContentResponse
+
+CREATE_RESPONSES_TABLE = """
+CREATE TABLE IF NOT EXISTS gemini_responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+# Least recently used first, everything past `max_bytes` of newer ones goes
+EVICT_RESPONSES = """
+DELETE FROM gemini_responses WHERE key IN (
+    SELECT key FROM (
+        SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC) AS kept_size
+        FROM gemini_responses
+    )
+    WHERE kept_size > ?
+)
+"""
+
+
+def get_response_cache_key(
+    *, model: str, prompt: str, config: Mapping[str, Any] | None = None
+) -> str:
+    prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+    raw_key = json.dumps(
+        {"model": model, "prompt": prompt_hash, "config": config},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(raw_key.encode(), digest_size=16).hexdigest()
+
+
+def connect_response_cache(path: Path) -> sqlite3.Connection:
+    # A connection per call: ask_gemini_many runs requests in threads, and a
+    # connection costs nothing next to a Gemini round trip. WAL lets readers
+    # in while another thread (or script) writes.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(CREATE_RESPONSES_TABLE)
+    return connection
+
+
+def get_cached_response(
+    key: str,
+    *,
+    path: Path = GEMINI_CACHE_PATH,
+    ttl_secs: float | None = None,
+) -> "GenerateContentResponse | None":
+    from google.genai.types import GenerateContentResponse
+
+    # Read per call, so a changed `gemini_cache` applies without a reimport
+    if ttl_secs is None:
+        ttl_secs = gemini_cache["ttl_secs"]
+
+    now = time.time()
+
+    with closing(connect_response_cache(path)) as connection, connection:
+        row = connection.execute(
+            "SELECT response, created_at FROM gemini_responses WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        response_json, created_at = row
+        if ttl_secs is not None and now - created_at > ttl_secs:
+            connection.execute("DELETE FROM gemini_responses WHERE key = ?", (key,))
+            return None
+
+        connection.execute(
+            "UPDATE gemini_responses SET accessed_at = ? WHERE key = ?", (now, key)
+        )
+
+    return GenerateContentResponse.model_validate_json(response_json)
+
+
+def save_cached_response(
+    key: str,
+    response: "GenerateContentResponse",
+    *,
+    model: str,
+    path: Path = GEMINI_CACHE_PATH,
+    max_bytes: int | None = None,
+) -> None:
+    if max_bytes is None:
+        max_bytes = gemini_cache["max_bytes"]
+
+    response_json = response.model_dump_json(exclude_none=True)
+    now = time.time()
+
+    with closing(connect_response_cache(path)) as connection, connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO gemini_responses VALUES (?, ?, ?, ?, ?, ?)",
+            (key, model, response_json, len(response_json), now, now),
+        )
+        connection.execute(EVICT_RESPONSES, (max_bytes,))
+
+
+def print_response_cache_stats(path: Path = GEMINI_CACHE_PATH) -> None:
+    with closing(connect_response_cache(path)) as connection:
+        rows = connection.execute(
+            "SELECT model, COUNT(*), SUM(size) FROM gemini_responses GROUP BY model"
+        ).fetchall()
+
+    for model, responses, size in rows:
+        print(f"🗄️ {model}: {responses} responses, {size / 1024:.1f}KB")
+
+    if not rows:
+        print("🗄️ Empty:", path)
+
+
+def clear_response_cache(path: Path = GEMINI_CACHE_PATH) -> None:
+    with closing(connect_response_cache(path)) as connection, connection:
+        connection.execute("DELETE FROM gemini_responses")
+
+    print("🗑️ Cleared:", path)
+
+
+if __name__ == "__main__":
+    # python -m aivideocut.gem_cache [clear]
+    if sys.argv[1:] == ["clear"]:
+        clear_response_cache()
+    else:
+        print_response_cache_stats()
@@ -136,6 +136,62 @@ def create_translate_srt_pt_to_en_prompt(
     )
 
 
+def create_translate_cue_texts_pt_to_en_prompt(
+    text_cues: str, additional_context: str = ""
+) -> str:
+    initial_prompt = textwrap.dedent("""
+    Você é um especialista tradutor de legendas de Português do Brasil para
+    Inglês dos Estados Unidos.
+
+    A legenda foi transcrita por uma IA (Whisper) e você só está recebendo um
+    trecho dela devido a limitação na quantidade de tokens, portanto, o
+    texto pode parecer sem final (isso é previsto).
+
+    Cada linha é uma fala da legenda no formato `número: texto`. Uma frase
+    pode começar em uma fala e terminar na seguinte.
+
+    **ATENÇÃO**: este é um script automatizado. Não adicione observação, notas ou
+    qualquer outra informação não solicitada explicitamente no prompt.
+
+    Seu trabalho é:
+    - Traduzir o texto de cada fala de PT-BR para EN-US de forma natural.
+    - Responder com **uma linha por fala**, no formato `número: tradução`, com
+      os mesmos números e na mesma ordem.
+    - Usar vocabulário natural para soar mais como nativo dos EUA ao invés de fazer
+      tradução literal e robótica.
+
+    Você NÃO PODE:
+    - Pular, juntar ou dividir falas. Todo número recebido aparece uma única vez
+      na resposta.
+    - Quebrar a linha no meio de uma fala.
+    - Adicionar notas, observações ou qualquer texto fora das linhas numeradas.
+    - VOCÊ NÃO PODE GERAR IMAGENS SUA RESPOSTA DEVE SER EM TEXTO.
+
+    ---\n\n""")
+
+    if additional_context:
+        additional_context = f"Contexto adicional: {additional_context}\n"
+
+    prompt_example = textwrap.dedent("""
+    Um exemplo:
+
+    Texto original:
+    1: Fala aí, pessoal! Nesse vídeo, a gente vai dar uma relaxada um pouco aqui, baixar um
+    2: pouquinho o tom, porque o nosso último vídeo foi bem puxado, foi bem complexo
+    3: ali.
+
+    Sua resposta:
+    1: Hey everyone! In this video, we're gonna take it easy for a bit, slow things down a little...
+    2: ...because our last video was pretty intense — it was a tough one.
+    3: Seriously.
+
+    ---\n\n""")
+
+    ending_prompt = "Seu trabalho começa a seguir. Traduza as seguintes falas:\n\n"
+
+    return f"{initial_prompt}{additional_context}{prompt_example}{ending_prompt}{text_cues}"
+
+
 def create_summary_prompt(text_chunk: str, additional_context: str = "") -> str:
     initial_prompt = textwrap.dedent("""
     Você é um assistente de IA especializado em resumir transcrições de aulas
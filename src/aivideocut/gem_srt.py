@@ -1,36 +1,40 @@
 # pyright: basic
+from functools import partial
 
 from rich import print as rprint
 
 from aivideocut.configs import (
     ORIGINAL_SRT_FILE_PATH,
     OUTPUT_DIR_PATH,
-    PROMPT_MAX_CHARS,
     SRT_FIXED_FILENAME,
+    gemini_output_ratios,
 )
 from aivideocut.gem_prompts import create_fix_srt_prompt
-from aivideocut.gem_utils import ask_gemini
+from aivideocut.gem_tokens import get_chunk_token_budget, split_srt_cues_by_tokens
+from aivideocut.gem_utils import ask_gemini_many
+from aivideocut.srt import read_srt_file
 from aivideocut.utils import (
     create_file_path,
-    read_file_path,
-    split_srt_blocks,
     write_str_to_file,
 )
 
 
 def fix_srt_typos() -> None:
-    srt_content = read_file_path(ORIGINAL_SRT_FILE_PATH)
-    srt_blocks = split_srt_blocks(srt_content, max_chars=PROMPT_MAX_CHARS)
+    srt_cues = read_srt_file(ORIGINAL_SRT_FILE_PATH)
+    prompt_template = partial(
+        create_fix_srt_prompt,
+        additional_context="Aula educacional sobre programação",
+    )
+    max_tokens = get_chunk_token_budget(
+        prompt_template=prompt_template,
+        output_ratio=gemini_output_ratios["fix_srt"],
+    )
+    srt_blocks = split_srt_cues_by_tokens(srt_cues, max_tokens)
+
+    prompts = [prompt_template("\n\n".join(block)) for block in srt_blocks]
 
     response_text = ""
-    for block in srt_blocks:
-        current_block = "\n\n".join(block)
-        prompt = create_fix_srt_prompt(
-            current_block,
-            "Aula educacional sobre programação",
-        )
-
-        gemini_response = ask_gemini(prompt)
+    for gemini_response in ask_gemini_many(prompts):
         gemini_response_text = gemini_response.text
 
         if gemini_response_text:
@@ -1,55 +1,121 @@
 # pyright: basic
+from functools import partial
 
 from rich import print as rprint
 
 from aivideocut.configs import (
     OUTPUT_DIR_PATH,
-    PROMPT_MAX_CHARS,
     SRT_FIXED_ENGLISH_FILENAME,
     SRT_FIXED_FILENAME,
+    gemini_output_ratios,
+    gemini_translate_cue_texts,
 )
 from aivideocut.gem_prompts import (
+    create_translate_cue_texts_pt_to_en_prompt,
     create_translate_srt_pt_to_en_prompt,
 )
-from aivideocut.gem_utils import ask_gemini
+from aivideocut.gem_tokens import (
+    get_chunk_token_budget,
+    split_srt_cues_by_tokens,
+    yield_blocks_by_token_budget,
+)
+from aivideocut.gem_utils import ask_gemini_many
+from aivideocut.srt import (
+    SRTCue,
+    cues_to_srt,
+    format_cue_text_lines,
+    parse_cue_text_lines,
+    read_srt_file,
+    replace_cue_texts,
+)
 from aivideocut.utils import (
     create_file_path,
-    read_file_path,
-    split_srt_blocks,
     write_str_to_file,
 )
 
+TRANSLATE_CONTEXT = (
+    "Vídeo educacional mostrando exemplos de uso avançado de f-string no Python."
+)
 
-def gem_translate_srt_to_pt_br() -> None:
-    fixed_srt_path = create_file_path(
-        full_filename=SRT_FIXED_FILENAME,
-        parent=OUTPUT_DIR_PATH,
-        unique_filename=False,
-        today_parent=False,
-        separator="",
+
+def translate_srt_blocks(srt_cues: list[SRTCue]) -> str:
+    prompt_template = partial(
+        create_translate_srt_pt_to_en_prompt,
+        additional_context=TRANSLATE_CONTEXT,
+    )
+    max_tokens = get_chunk_token_budget(
+        prompt_template=prompt_template,
+        output_ratio=gemini_output_ratios["translate"],
     )
-    srt_content = read_file_path(fixed_srt_path)
-    srt_blocks = split_srt_blocks(srt_content, max_chars=PROMPT_MAX_CHARS)
+    srt_blocks = split_srt_cues_by_tokens(srt_cues, max_tokens)
 
-    response_text = ""
-    for block in srt_blocks:
-        current_block = "\n\n".join(block)
-        prompt = create_translate_srt_pt_to_en_prompt(
-            current_block,
-            (
-                "Vídeo educacional mostrando exemplos de uso avançado de "
-                "f-string no Python."
-            ),
-        )
+    prompts = [prompt_template("\n\n".join(block)) for block in srt_blocks]
 
-        gemini_response = ask_gemini(prompt)
+    response_text = ""
+    for gemini_response in ask_gemini_many(prompts):
         gemini_response_text = gemini_response.text
 
         if gemini_response_text:
             response_text += gemini_response_text.strip()
             response_text += "\n\n"
 
-        rprint(response_text)
+    return response_text
+
+
+def translate_cue_texts(srt_cues: list[SRTCue]) -> str:
+    # Only `position: text` lines go to Gemini, the SRT is the original cues
+    # with the translated texts. A cue missing from the answer keeps its
+    # original text.
+    prompt_template = partial(
+        create_translate_cue_texts_pt_to_en_prompt,
+        additional_context=TRANSLATE_CONTEXT,
+    )
+    max_tokens = get_chunk_token_budget(
+        prompt_template=prompt_template,
+        output_ratio=gemini_output_ratios["translate"],
+    )
+    cue_text_blocks = yield_blocks_by_token_budget(
+        format_cue_text_lines(srt_cues), max_tokens
+    )
+
+    prompts = [prompt_template("\n".join(block)) for block in cue_text_blocks]
+
+    translated_texts: dict[int, str] = {}
+    for gemini_response in ask_gemini_many(prompts):
+        translated_texts.update(parse_cue_text_lines(gemini_response.text or ""))
+
+    missing_positions = [
+        position
+        for position in range(1, len(srt_cues) + 1)
+        if not translated_texts.get(position)
+    ]
+    if missing_positions:
+        rprint(
+            f"\n🔴 {len(missing_positions)} cue(s) missing from the answer,"
+            " kept untranslated:",
+            [srt_cues[position - 1].index for position in missing_positions],
+        )
+
+    if len(missing_positions) == len(srt_cues):
+        return ""
+
+    return cues_to_srt(replace_cue_texts(srt_cues, translated_texts))
+
+
+def gem_translate_srt_to_pt_br() -> None:
+    fixed_srt_path = create_file_path(
+        full_filename=SRT_FIXED_FILENAME,
+        parent=OUTPUT_DIR_PATH,
+        unique_filename=False,
+        today_parent=False,
+        separator="",
+    )
+    srt_cues = read_srt_file(fixed_srt_path)
+
+    if gemini_translate_cue_texts:
+        response_text = translate_cue_texts(srt_cues)
+    else:
+        response_text = translate_srt_blocks(srt_cues)
 
     if not response_text:
         rprint("\n🔴 Gemini did not return the text")
@@ -67,7 +133,7 @@ def gem_translate_srt_to_pt_br() -> None:
     )
     write_str_to_file(response_text, path=file, create_parents=True)
 
-    rprint(f"\n✅ Saved to: {file.name} (model = {gemini_response.model_version})")
+    rprint(f"\n✅ Saved to: {file.name}")
 
 
 if __name__ == "__main__":
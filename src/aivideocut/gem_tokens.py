@@ -0,0 +1,106 @@
+# pyright: basic
+import re
+import sys
+from collections.abc import Callable, Generator, Iterable
+from pathlib import Path
+
+from aivideocut.configs import (
+    DEFAULT_GEMINI_MODEL,
+    gemini_chunking,
+    gemini_token_limits,
+)
+from aivideocut.srt import SRTCue, format_srt_cue
+
+# Gemini splits numbers digit by digit and most words into pieces of a few
+# letters. Counting those pieces lands a bit above the real token count,
+# which is the safe side for a budget, at regex speed.
+TOKEN_ESTIMATE_RE = re.compile(r"\d|[^\W\d_]{1,5}|[^\w\s]+")
+
+PromptTemplate = Callable[[str], str]
+
+
+def estimate_tokens(text: str) -> int:
+    return sum(1 for _ in TOKEN_ESTIMATE_RE.finditer(text))
+
+
+def get_model_token_limits(model: str) -> tuple[int, int]:
+    matching_prefixes = [
+        prefix for prefix in gemini_token_limits if model.startswith(prefix)
+    ]
+
+    if not matching_prefixes:
+        msg = f"No token limits for {model} in configs.gemini_token_limits"
+        raise KeyError(msg)
+
+    return gemini_token_limits[max(matching_prefixes, key=len)]
+
+
+def get_chunk_token_budget(
+    *,
+    prompt_template: PromptTemplate,
+    output_ratio: float,
+    model: str = DEFAULT_GEMINI_MODEL,
+) -> int:
+    # Text tokens per chunk. The template is what every request repeats
+    # around the chunk (instructions, examples, context).
+    input_limit, output_limit = get_model_token_limits(model)
+    template_tokens = estimate_tokens(prompt_template(""))
+
+    input_budget = input_limit - template_tokens
+    output_budget = int(output_limit * gemini_chunking["output_safety"] / output_ratio)
+    return max(1, min(input_budget, output_budget, gemini_chunking["max_chunk_tokens"]))
+
+
+def yield_blocks_by_token_budget(
+    blocks: Iterable[str], max_tokens: int
+) -> Generator[list[str]]:
+    # Consecutive blocks, as many as fit in `max_tokens` (+1 per block for the
+    # blank line joining them). A block over the budget goes alone.
+    chunk_tokens = 0
+    chunk_blocks: list[str] = []
+
+    for block in blocks:
+        block_tokens = estimate_tokens(block) + 1
+
+        if chunk_blocks and chunk_tokens + block_tokens > max_tokens:
+            yield chunk_blocks
+            chunk_blocks = []
+            chunk_tokens = 0
+
+        chunk_tokens += block_tokens
+        chunk_blocks.append(block)
+
+    if chunk_blocks:
+        yield chunk_blocks
+
+
+def split_srt_cues_by_tokens(
+    cues: Iterable[SRTCue], max_tokens: int
+) -> Generator[list[str]]:
+    return yield_blocks_by_token_budget(map(format_srt_cue, cues), max_tokens)
+
+
+def get_text_chunk_chars(text: str, max_tokens: int) -> int:
+    # For the char based text splitter: tokens in chars at this text's own
+    # chars per token.
+    chars_per_token = len(text) / max(1, estimate_tokens(text))
+    return int(max_tokens * chars_per_token)
+
+
+def compare_token_estimate(path: Path, *, model: str = DEFAULT_GEMINI_MODEL) -> None:
+    # The estimate against Gemini's own count_tokens (free, but a request)
+    from aivideocut.gem_utils import get_gemini_client
+
+    text = path.read_text(encoding="utf-8")
+    estimated_tokens = estimate_tokens(text)
+    counted_tokens = (
+        get_gemini_client().models.count_tokens(model=model, contents=text).total_tokens
+    )
+
+    print(f"🔢 {path.name}: {len(text)} chars")
+    print(f"🔢 estimated {estimated_tokens} tokens, {model} counts {counted_tokens}")
+
+
+if __name__ == "__main__":
+    # python -m aivideocut.gem_tokens path/to/transcription.srt
+    compare_token_estimate(Path(sys.argv[1]))
@@ -1,15 +1,32 @@
 # pyright: basic
 import os
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import TYPE_CHECKING, Any
 
 from dotenv import load_dotenv
-from google import genai
-from google.genai.client import Client
-from google.genai.types import GenerateContentResponse
+from rich import print as rprint
 
-from aivideocut.configs import DEFAULT_GEMINI_MODEL, GeminiModels
+from aivideocut.configs import (
+    DEFAULT_GEMINI_MODEL,
+    GeminiModels,
+    gemini_cache,
+    gemini_concurrency,
+    gemini_http_options,
+)
+from aivideocut.gem_cache import (
+    get_cached_response,
+    get_response_cache_key,
+    save_cached_response,
+)
 
-load_dotenv()
+if TYPE_CHECKING:
+    from google.genai.client import Client
+    from google.genai.types import GenerateContentResponse
 
+load_dotenv()
 
 gemini_models: tuple[GeminiModels, ...] = (
     # 1.5-flash-8b
@@ -36,20 +53,122 @@ gemini_models: tuple[GeminiModels, ...] = (
 )
 
 
-def get_gemini_client() -> Client:
-    api_key = os.getenv("GEMINI_API_KEY")
-    return genai.Client(api_key=api_key)
+# One client per process and settings, like the model registries. Every
+# genai.Client owns an httpx connection pool (safe to share between threads),
+# so reusing it keeps HTTPS connections alive instead of a new TLS handshake
+# per request. The pid keeps a forked child off its parent's sockets.
+_gemini_clients: dict[tuple[int, str | None, int], "Client"] = {}
+_gemini_clients_lock = Lock()
+
+
+def get_gemini_client(
+    *,
+    base_url: str | None = None,
+    timeout_ms: int | None = None,
+) -> "Client":
+    # google-genai takes a good part of a second to import, only pay it when
+    # a request is actually made (not for --help or --dry-run)
+    from google import genai
+    from google.genai import types
+
+    # Read at call time, so a changed config reaches every later call
+    base_url = base_url or gemini_http_options["base_url"]
+    timeout_ms = timeout_ms or gemini_http_options["timeout_ms"]
+    gemini_client_key = (os.getpid(), base_url, timeout_ms)
+
+    with _gemini_clients_lock:
+        if gemini_client_key not in _gemini_clients:
+            _gemini_clients[gemini_client_key] = genai.Client(
+                api_key=os.getenv("GEMINI_API_KEY"),
+                http_options=types.HttpOptions(base_url=base_url, timeout=timeout_ms),
+            )
+
+        return _gemini_clients[gemini_client_key]
+
+
+def evict_gemini_clients() -> None:
+    with _gemini_clients_lock:
+        for (pid, *_), client in _gemini_clients.items():
+            # Client.close only exists in newer google-genai releases
+            if pid == os.getpid() and (close := getattr(client, "close", None)):
+                close()
+        _gemini_clients.clear()
 
 
 def ask_gemini(
-    prompt: str, *, model: GeminiModels = DEFAULT_GEMINI_MODEL
-) -> GenerateContentResponse:
+    prompt: str,
+    *,
+    model: GeminiModels = DEFAULT_GEMINI_MODEL,
+    config: dict[str, Any] | None = None,
+    use_cache: bool = True,
+) -> "GenerateContentResponse":
+    use_cache = use_cache and gemini_cache["enabled"]
+    cache_key = get_response_cache_key(model=model, prompt=prompt, config=config)
+
+    if use_cache and (cached_response := get_cached_response(cache_key)) is not None:
+        return cached_response
+
+    client = get_gemini_client()
+    response = client.models.generate_content(
+        model=model,
+        contents=prompt,
+        config=config,
+    )
+
+    # An empty (blocked, cut) response is asked again next time
+    if use_cache and response.text:
+        save_cached_response(cache_key, response, model=model)
+
+    return response
+
+
+async def ask_gemini_async(
+    prompt: str,
+    *,
+    model: GeminiModels = DEFAULT_GEMINI_MODEL,
+    config: dict[str, Any] | None = None,
+    use_cache: bool = True,
+) -> "GenerateContentResponse":
+    # Same shared client. Its async pool belongs to the first event loop that
+    # uses it, so keep to one loop per process (one asyncio.run).
+    use_cache = use_cache and gemini_cache["enabled"]
+    cache_key = get_response_cache_key(model=model, prompt=prompt, config=config)
+
+    if use_cache and (cached_response := get_cached_response(cache_key)) is not None:
+        return cached_response
+
     client = get_gemini_client()
-    return client.models.generate_content(
+    response = await client.aio.models.generate_content(
         model=model,
         contents=prompt,
+        config=config,
     )
 
+    if use_cache and response.text:
+        save_cached_response(cache_key, response, model=model)
+
+    return response
+
+
+def ask_gemini_many(
+    prompts: Iterable[str],
+    *,
+    model: GeminiModels = DEFAULT_GEMINI_MODEL,
+    concurrency: int | None = None,
+    use_cache: bool = True,
+) -> list["GenerateContentResponse"]:
+    # Requests are mostly waiting on the network, threads are enough. `map`
+    # returns responses in prompt order, whatever finishes first.
+    prompts = list(prompts)
+    concurrency = concurrency or gemini_concurrency
+    workers = max(1, min(concurrency, len(prompts)))
+    rprint(f"🤖 Sending {len(prompts)} prompt(s) to {model}, {workers} at a time")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(partial(ask_gemini, model=model, use_cache=use_cache), prompts)
+        )
+
 
 def list_gemini_models() -> None:
     client = get_gemini_client()
@@ -60,4 +179,5 @@ def list_gemini_models() -> None:
 
 
 if __name__ == "__main__":
+    # python -m aivideocut.gem_utils
     list_gemini_models()
@@ -1,42 +1,48 @@
+from functools import partial
+
 from rich import print as rprint
 
 from aivideocut.configs import (
     CHAPTERS_YT_FILE_PATH,
     ORIGINAL_SRT_FILE_PATH,
     OUTPUT_DIR_PATH,
-    PROMPT_MAX_CHARS,
+    gemini_output_ratios,
 )
 from aivideocut.gem_prompts import create_youtube_chapters_prompt
-from aivideocut.gem_utils import ask_gemini
+from aivideocut.gem_tokens import get_chunk_token_budget, split_srt_cues_by_tokens
+from aivideocut.gem_utils import ask_gemini_many
+from aivideocut.srt import read_srt_file
 from aivideocut.utils import (
     create_file_path,
-    read_file_path,
-    split_srt_blocks,
     write_str_to_file,
 )
 
 
 def gem_yt_chapters(*, dry_run: bool = False) -> None:
-    srt_content = read_file_path(ORIGINAL_SRT_FILE_PATH)
-    srt_blocks = split_srt_blocks(srt_content, max_chars=PROMPT_MAX_CHARS)
+    srt_cues = read_srt_file(ORIGINAL_SRT_FILE_PATH)
+    prompt_template = partial(
+        create_youtube_chapters_prompt,
+        additional_context=(
+            "Vídeo educacional mostrando exemplos de uso avançado de "
+            "f-string no Python."
+        ),
+    )
+    max_tokens = get_chunk_token_budget(
+        prompt_template=prompt_template,
+        output_ratio=gemini_output_ratios["chapters"],
+    )
+    srt_blocks = split_srt_cues_by_tokens(srt_cues, max_tokens)
 
-    response_text = ""
-    response_model = ""
-    for block in srt_blocks:
-        current_block = "\n\n".join(block)
-        prompt = create_youtube_chapters_prompt(
-            current_block,
-            (
-                "Vídeo educacional mostrando exemplos de uso avançado de "
-                "f-string no Python."
-            ),
-        )
+    prompts = [prompt_template("\n\n".join(block)) for block in srt_blocks]
 
-        if dry_run:
+    if dry_run:
+        for prompt in prompts:
             rprint(prompt, "\n\n")
-            continue
+        return
 
-        gemini_response = ask_gemini(prompt)
+    response_text = ""
+    response_model = ""
+    for gemini_response in ask_gemini_many(prompts):
         gemini_response_text = gemini_response.text
 
         if gemini_response_text:
@@ -46,9 +52,6 @@ def gem_yt_chapters(*, dry_run: bool = False) -> None:
 
         rprint(response_text)
 
-    if dry_run:
-        return
-
     if not response_text:
         rprint("\n🔴 Gemini did not return the text")
         return
@@ -0,0 +1,85 @@
+# pyright: basic
+import json
+import os
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+ChunkSegments = list[dict[str, Any]]
+
+
+def get_journal_path(output_file: Path) -> Path:
+    return output_file.with_name(f"{output_file.name}{JOURNAL_SUFFIX}")
+
+
+def read_journal_chunks(path: Path, journal_key: str) -> dict[int, ChunkSegments]:
+    # Nothing is trusted from a journal written for other input or settings.
+    # A torn last line (killed mid-write) ends the read.
+    if not path.is_file():
+        return {}
+
+    chunk_segments: dict[int, ChunkSegments] = {}
+
+    with path.open("r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break
+
+            if line_number == 0:
+                if entry.get("key") != journal_key:
+                    return {}
+                continue
+
+            chunk_segments[entry["chunk"]] = entry["segments"]
+
+    return chunk_segments
+
+
+class TranscriptionJournal:
+    # Append-only JSON lines: a header with the key of everything that
+    # decides the result, then one line per finished chunk, flushed to disk
+    # before the next one starts.
+    def __init__(self, path: Path, journal_key: str) -> None:
+        self.path = path
+        self.journal_key = journal_key
+        self.chunk_segments = read_journal_chunks(path, journal_key)
+
+        # Rewritten with only the valid lines, appending after a torn one
+        # would corrupt the next entry.
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            f.write(json.dumps({"key": journal_key}) + "\n")
+            for chunk_index, segments in self.chunk_segments.items():
+                f.write(self.get_entry_line(chunk_index, segments))
+        tmp_path.replace(path)
+
+        self.file = path.open("a", encoding="utf-8")
+
+    @staticmethod
+    def get_entry_line(chunk_index: int, segments: ChunkSegments) -> str:
+        entry = {"chunk": chunk_index, "segments": segments}
+        return json.dumps(entry, ensure_ascii=False) + "\n"
+
+    def append(self, chunk_index: int, segments: ChunkSegments) -> None:
+        self.chunk_segments[chunk_index] = segments
+        self.file.write(self.get_entry_line(chunk_index, segments))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
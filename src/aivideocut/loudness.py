@@ -0,0 +1,262 @@
+# pyright: basic
+import math
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from aivideocut.audio import iter_audio_frames, probe_audio
+
+# ITU-R BS.1770-4 / EBU R128 constants, same as libebur128 (used by ffmpeg)
+ABSOLUTE_GATE_LUFS = -70.0
+INTEGRATED_RELATIVE_GATE_LU = -10.0
+LRA_RELATIVE_GATE_LU = -20.0
+HOPS_PER_SECOND = 10
+MOMENTARY_HOPS = 4  # 400ms blocks, 75% overlap
+SHORT_TERM_HOPS = 30  # 3s blocks
+SHORT_TERM_STEP_HOPS = 10  # libebur128 computes LRA on 3s blocks every 1s
+FILTER_BLOCK_SAMPLES = 65536
+TRUE_PEAK_RATE = 192000
+TRUE_PEAK_TAPS_PER_PHASE = 12
+
+
+class LoudnessStats(NamedTuple):
+    integrated: float
+    loudness_range: float
+    true_peak: float
+    threshold: float
+
+
+def get_k_weighting_filter(sampling_rate: int) -> tuple[np.ndarray, np.ndarray]:
+    # High shelf (head effects) followed by the RLB high-pass, coefficients
+    # derived for any sample rate exactly like libebur128 does.
+    f0 = 1681.974450955533
+    gain_db = 3.999843853973347
+    q = 0.7071752369554196
+
+    k = math.tan(math.pi * f0 / sampling_rate)
+    vh = 10 ** (gain_db / 20)
+    vb = vh**0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf_b = [(vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0]
+    shelf_b.append((vh - vb * k / q + k * k) / a0)
+    shelf_a = [1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]
+
+    f0 = 38.13547087602444
+    q = 0.5003270373238773
+    k = math.tan(math.pi * f0 / sampling_rate)
+    a0 = 1 + k / q + k * k
+    highpass_b = [1.0, -2.0, 1.0]
+    highpass_a = [1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]
+
+    return np.convolve(shelf_b, highpass_b), np.convolve(shelf_a, highpass_a)
+
+
+def get_impulse_response(
+    b: np.ndarray, a: np.ndarray, tolerance: float = 1e-12
+) -> np.ndarray:
+    # Both K-weighting stages are stable, so their impulse response decays
+    # geometrically with the largest pole radius. Truncating it below
+    # `tolerance` lets us filter whole blocks with FFT convolution instead of a
+    # per-sample recursion in Python.
+    max_pole_radius = float(np.max(np.abs(np.roots(a))))
+    taps = math.ceil(math.log(tolerance) / math.log(max_pole_radius)) + len(a)
+
+    impulse_response = np.zeros(taps)
+    x = np.zeros(taps)
+    x[0] = 1.0
+    order = len(a) - 1
+    y_history = [0.0] * order
+    for n in range(taps):
+        y = sum(b[i] * x[n - i] for i in range(len(b)) if n - i >= 0)
+        y -= sum(a[i + 1] * y_history[i] for i in range(order))
+        y_history = [y, *y_history[:-1]]
+        impulse_response[n] = y
+
+    return impulse_response
+
+
+def get_true_peak_filter(factor: int) -> np.ndarray:
+    # Windowed-sinc interpolator split into one column per polyphase branch
+    taps = TRUE_PEAK_TAPS_PER_PHASE * factor
+    n = np.arange(taps) - (taps - 1) / 2
+    interpolator = np.sinc(n / factor) * np.hanning(taps)
+    interpolator *= factor / interpolator.sum()
+    return interpolator.reshape(TRUE_PEAK_TAPS_PER_PHASE, factor)[::-1]
+
+
+def get_channel_weights(channels: int) -> np.ndarray:
+    if channels == 6:  # 5.1: L R C LFE Ls Rs, LFE is ignored
+        return np.array([1.0, 1.0, 1.0, 0.0, 1.41, 1.41])
+    return np.ones(channels)
+
+
+def energy_to_loudness(energy: np.ndarray | float) -> np.ndarray | float:
+    with np.errstate(divide="ignore"):
+        return -0.691 + 10 * np.log10(energy)
+
+
+class LoudnessMeter:
+    def __init__(self, sampling_rate: int, channels: int) -> None:
+        self.sampling_rate = sampling_rate
+        self.channels = channels
+        self.hop_samples = sampling_rate // HOPS_PER_SECOND
+        self.channel_weights = get_channel_weights(channels)
+
+        self.k_weighting_ir = get_impulse_response(
+            *get_k_weighting_filter(sampling_rate)
+        )
+        self.fft_size = (
+            1 << (FILTER_BLOCK_SAMPLES + len(self.k_weighting_ir)).bit_length()
+        )
+        self.k_weighting_fft = np.fft.rfft(self.k_weighting_ir, self.fft_size)
+        self.filter_overlap = np.zeros((channels, len(self.k_weighting_ir) - 1))
+
+        true_peak_factor = max(1, math.ceil(TRUE_PEAK_RATE / sampling_rate))
+        self.true_peak_filter = get_true_peak_filter(true_peak_factor)
+        self.true_peak_history = np.zeros((channels, TRUE_PEAK_TAPS_PER_PHASE - 1))
+        self.true_peak = 0.0
+
+        # Decoded frames (~1024 samples) are copied into one preallocated
+        # block, the filters only run on full blocks
+        self.block = np.empty((channels, FILTER_BLOCK_SAMPLES))
+        self.block_fill = 0
+        self.hop_remainder = np.zeros((channels, 0))
+        self.hop_energies: list[np.ndarray] = []
+
+    def feed(self, samples: np.ndarray) -> None:
+        position = 0
+
+        while position < samples.shape[1]:
+            copied = min(
+                FILTER_BLOCK_SAMPLES - self.block_fill, samples.shape[1] - position
+            )
+            self.block[:, self.block_fill : self.block_fill + copied] = samples[
+                :, position : position + copied
+            ]
+            self.block_fill += copied
+            position += copied
+
+            if self.block_fill == FILTER_BLOCK_SAMPLES:
+                self._process_block(self.block)
+                self.block_fill = 0
+
+    def _process_block(self, block: np.ndarray) -> None:
+        self._update_true_peak(block)
+
+        block_samples = block.shape[1]
+        filtered = np.fft.irfft(
+            np.fft.rfft(block, self.fft_size) * self.k_weighting_fft, self.fft_size
+        )[:, : block_samples + self.filter_overlap.shape[1]]
+        filtered[:, : self.filter_overlap.shape[1]] += self.filter_overlap
+        self.filter_overlap = filtered[:, block_samples:]
+
+        squared = np.concatenate(
+            (self.hop_remainder, filtered[:, :block_samples] ** 2), 1
+        )
+        full_hops = squared.shape[1] // self.hop_samples
+        hop_sums = squared[:, : full_hops * self.hop_samples].reshape(
+            self.channels, full_hops, self.hop_samples
+        )
+        self.hop_energies.append(hop_sums.sum(2))
+        self.hop_remainder = squared[:, full_hops * self.hop_samples :]
+
+    def _update_true_peak(self, block: np.ndarray) -> None:
+        with_history = np.concatenate((self.true_peak_history, block), 1)
+        self.true_peak_history = with_history[:, -(TRUE_PEAK_TAPS_PER_PHASE - 1) :]
+
+        windows = np.lib.stride_tricks.sliding_window_view(
+            with_history, TRUE_PEAK_TAPS_PER_PHASE, axis=1
+        )
+        oversampled = windows @ self.true_peak_filter
+        self.true_peak = max(
+            self.true_peak, float(np.abs(oversampled).max()), float(np.abs(block).max())
+        )
+
+    def _get_block_energies(self, hops_per_block: int, step: int) -> np.ndarray:
+        hop_energies = np.concatenate(self.hop_energies, 1)
+        hop_energies = hop_energies * self.channel_weights[:, None]
+        hop_energies = hop_energies.sum(0)
+
+        if hop_energies.shape[0] < hops_per_block:
+            return np.zeros(0)
+
+        cumulative = np.concatenate(([0.0], np.cumsum(hop_energies)))
+        block_starts = np.arange(0, hop_energies.shape[0] - hops_per_block + 1, step)
+        block_sums = (
+            cumulative[block_starts + hops_per_block] - cumulative[block_starts]
+        )
+        return block_sums / (hops_per_block * self.hop_samples)
+
+    def result(self) -> LoudnessStats:
+        if self.block_fill > 0:
+            self._process_block(self.block[:, : self.block_fill])
+            self.block_fill = 0
+
+        if not self.hop_energies:
+            self.hop_energies.append(np.zeros((self.channels, 0)))
+
+        absolute_gate = 10 ** ((ABSOLUTE_GATE_LUFS + 0.691) / 10)
+
+        momentary = self._get_block_energies(MOMENTARY_HOPS, 1)
+        momentary = momentary[momentary >= absolute_gate]
+        threshold = ABSOLUTE_GATE_LUFS
+        integrated = ABSOLUTE_GATE_LUFS
+        if momentary.size:
+            threshold = (
+                energy_to_loudness(momentary.mean()) + INTEGRATED_RELATIVE_GATE_LU
+            )
+            relative_gate = 10 ** ((threshold + 0.691) / 10)
+            gated = momentary[momentary >= relative_gate]
+            integrated = energy_to_loudness(gated.mean())
+
+        short_term = self._get_block_energies(SHORT_TERM_HOPS, SHORT_TERM_STEP_HOPS)
+        short_term = short_term[short_term >= absolute_gate]
+        loudness_range = 0.0
+        if short_term.size:
+            lra_threshold = energy_to_loudness(short_term.mean()) + LRA_RELATIVE_GATE_LU
+            short_term = np.sort(
+                short_term[short_term >= 10 ** ((lra_threshold + 0.691) / 10)]
+            )
+            last_index = short_term.size - 1
+            low = short_term[int(last_index * 0.10 + 0.5)]
+            high = short_term[int(last_index * 0.95 + 0.5)]
+            loudness_range = energy_to_loudness(high) - energy_to_loudness(low)
+
+        with np.errstate(divide="ignore"):
+            true_peak = 20 * math.log10(self.true_peak) if self.true_peak else -math.inf
+
+        return LoudnessStats(
+            integrated=float(integrated),
+            loudness_range=float(loudness_range),
+            true_peak=float(true_peak),
+            threshold=float(threshold),
+        )
+
+
+def measure_loudness(input_file: Path) -> LoudnessStats:
+    # Not shared with the VAD's decode: this measures the normalize stage's
+    # input, the VAD runs on its normalized output.
+    sampling_rate, channels = probe_audio(input_file)
+    loudness_meter = LoudnessMeter(sampling_rate, channels)
+
+    for samples in iter_audio_frames(input_file):
+        loudness_meter.feed(samples)
+
+    return loudness_meter.result()
+
+
+def get_loudnorm_measurements(loudness_stats: LoudnessStats) -> dict[str, str]:
+    # Same keys as ffmpeg's loudnorm `print_format=json`. Its `target_offset`
+    # is how far the first pass's dynamic normalization missed `I`, and only
+    # running that filter gives it. The second pass ignores `offset` in
+    # linear mode (the gain is `I` - `input_i`). It only falls back to dynamic
+    # mode when the LRA or the true peak rule linear out, and 0 there just
+    # skips that correction of a few tenths of LU.
+    return {
+        "input_i": f"{loudness_stats.integrated:.2f}",
+        "input_tp": f"{loudness_stats.true_peak:.2f}",
+        "input_lra": f"{loudness_stats.loudness_range:.2f}",
+        "input_thresh": f"{loudness_stats.threshold:.2f}",
+        "target_offset": "0.00",
+    }
@@ -0,0 +1,56 @@
+# pyright: basic
+import sys
+import time
+
+import numpy as np
+
+from aivideocut.loudness import LoudnessMeter, LoudnessStats
+
+SAMPLING_RATE = 48000
+CHANNELS = 2
+FRAME_SAMPLES = 1024  # one AAC frame, what the decoder hands the meter
+
+
+def get_random_audio(minutes: float, *, seed: int = 0) -> np.ndarray:
+    # Speech-like noise: level changes every 500ms
+    rng = np.random.default_rng(seed)
+    samples = int(minutes * 60 * SAMPLING_RATE)
+    levels = rng.uniform(0.001, 0.2, samples // (SAMPLING_RATE // 2) + 1)
+    audio = rng.standard_normal((CHANNELS, samples), dtype=np.float32)
+    return audio * np.repeat(levels, SAMPLING_RATE // 2)[:samples].astype(np.float32)
+
+
+def measure_in_frames(audio: np.ndarray, frame_samples: int) -> LoudnessStats:
+    loudness_meter = LoudnessMeter(SAMPLING_RATE, CHANNELS)
+    for start in range(0, audio.shape[1], frame_samples):
+        loudness_meter.feed(audio[:, start : start + frame_samples])
+    return loudness_meter.result()
+
+
+def benchmark_loudness(minutes: float = 30) -> None:
+    audio = get_random_audio(minutes)
+
+    start_time = time.perf_counter()
+    whole_stats = measure_in_frames(audio, audio.shape[1])
+    whole_secs = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    frame_stats = measure_in_frames(audio, FRAME_SAMPLES)
+    frame_secs = time.perf_counter() - start_time
+
+    print(f"🔉 {minutes}min {CHANNELS}ch {SAMPLING_RATE}Hz:", whole_stats)
+    for status, label, elapsed_secs in (
+        ("✅", "one array", whole_secs),
+        (
+            "✅" if frame_stats == whole_stats else "🔴",
+            f"{FRAME_SAMPLES} sample frames",
+            frame_secs,
+        ),
+    ):
+        realtime = minutes * 60 / elapsed_secs
+        print(status, f"{label:<20} {elapsed_secs:>6.2f}s {realtime:>6.0f}x realtime")
+
+
+if __name__ == "__main__":
+    # python -m aivideocut.loudness_bench [minutes]
+    benchmark_loudness(float(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -0,0 +1,218 @@
+# pyright: basic
+import os
+import time
+import traceback
+from collections.abc import Callable
+from importlib import import_module
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any
+
+from rich import print as rprint
+
+from aivideocut.configs import (
+    MODEL_SERVER_SOCKET_PATH,
+    silero_torch_threads,
+    use_model_server,
+    whisper_model_options,
+)
+
+ModelJob = Callable[..., Any]
+AUTHKEY_FILENAME = "authkey"
+# What the client gets when a job raises: the exception's type name, message
+# and the server's traceback. The exception itself may not pickle.
+ModelJobError = tuple[str, str, str]
+
+# Job name -> (module, function). Modules are imported on the first job that
+# needs them: transcribe imports this module to send its jobs, and a
+# transcription never needs torch, nor a client talking to a server either.
+MODEL_JOBS = {
+    "speech_timestamps": ("aivideocut.vad", "stream_speech_timestamps"),
+    "speech_probabilities": ("aivideocut.vad", "stream_speech_probabilities"),
+    "loud_and_speech_intervals": (
+        "aivideocut.vad",
+        "detect_loud_and_speech_intervals",
+    ),
+    "transcription_segments": ("aivideocut.transcribe", "get_transcription_segments"),
+}
+# Job kwargs the server overrides: a client sizes them for its own process,
+# the server runs every job on the models it loaded at start up. A client's
+# `cpu_threads` would load a second Whisper.
+SERVER_JOB_KWARGS = {
+    "transcription_segments": {"cpu_threads": None},
+}
+
+
+def get_model_job(job: str) -> ModelJob:
+    module_name, function_name = MODEL_JOBS[job]
+    return getattr(import_module(module_name), function_name)
+
+
+def resolve_job_argument(argument: Any) -> Any:  # noqa: ANN401
+    # The server has its own working directory
+    return argument.resolve() if isinstance(argument, Path) else argument
+
+
+def get_authkey_path(socket_path: Path) -> Path:
+    return socket_path.with_name(AUTHKEY_FILENAME)
+
+
+def is_private_path(path: Path) -> bool:
+    # Ours and closed to everyone else. The socket path is predictable, a
+    # socket or key another user put there is never trusted.
+    path_stat = path.stat()
+    return path_stat.st_uid == os.getuid() and not path_stat.st_mode & 0o077
+
+
+def read_model_server_authkey(socket_path: Path) -> bytes | None:
+    server_paths = (socket_path.parent, socket_path, get_authkey_path(socket_path))
+
+    try:
+        if not all(map(is_private_path, server_paths)):
+            rprint("🔴 Ignoring a model server that is not private:", socket_path)
+            return None
+
+        return server_paths[-1].read_bytes()
+    except OSError:
+        # No server (FileNotFoundError) or not ours to read (PermissionError)
+        return None
+
+
+def connect_to_model_server(
+    socket_path: Path = MODEL_SERVER_SOCKET_PATH,
+) -> Connection | None:
+    # Jobs and results travel pickled: only a server holding the key this
+    # user's server wrote is ever talked to.
+    authkey = read_model_server_authkey(socket_path)
+    if authkey is None:
+        return None
+
+    try:
+        return Client(str(socket_path), family="AF_UNIX", authkey=authkey)
+    except (OSError, AuthenticationError):
+        # A socket left by a server that died, or a server with another key
+        return None
+
+
+def is_model_server_job(job: str, kwargs: dict[str, Any]) -> bool:
+    # A parallel job starts its own pool of models, in the server it would
+    # have to run on the single resident one, one chunk after the other.
+    workers = kwargs.get("workers") or 1
+    if workers > 1:
+        rprint(f"🧠 {job}: {workers} workers, running here, not in the model server")
+        return False
+
+    return True
+
+
+def run_model_job(job: str, *args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+    args = tuple(resolve_job_argument(arg) for arg in args)
+    kwargs = {key: resolve_job_argument(value) for key, value in kwargs.items()}
+    connection = (
+        connect_to_model_server()
+        if use_model_server and is_model_server_job(job, kwargs)
+        else None
+    )
+
+    if connection is None:
+        return get_model_job(job)(*args, **kwargs)
+
+    with connection:
+        connection.send((job, args, kwargs))
+        is_ok, result = connection.recv()
+
+    if not is_ok:
+        error_type, error_message, error_traceback = result
+        msg = (
+            f"{job} failed in the model server, {error_type}: {error_message}"
+            f"\n\n{error_traceback}"
+        )
+        raise RuntimeError(msg)
+
+    return result
+
+
+def handle_model_job(connection: Connection) -> None:
+    try:
+        job, args, kwargs = connection.recv()
+    except EOFError:
+        return
+
+    kwargs = {**kwargs, **SERVER_JOB_KWARGS.get(job, {})}
+    rprint(f"🧠 {job}:", *args)
+    start_time = time.perf_counter()
+
+    try:
+        response = (True, get_model_job(job)(*args, **kwargs))
+    except Exception as e:  # noqa: BLE001
+        job_error: ModelJobError = (type(e).__name__, str(e), traceback.format_exc())
+        response = (False, job_error)
+
+    rprint(f"🧠 {job} done in {time.perf_counter() - start_time:.2f}s", "\n\n")
+    connection.send(response)
+
+
+def warm_up_models() -> None:
+    from aivideocut.transcribe import get_whisper_model
+    from aivideocut.vad import warm_up_silero_model
+
+    start_time = time.perf_counter()
+    warm_up_silero_model(threads=silero_torch_threads)
+    get_whisper_model(**whisper_model_options)
+    rprint(f"🧠 Models loaded in {time.perf_counter() - start_time:.2f}s")
+
+
+def create_model_server_dir(socket_path: Path) -> bytes:
+    # A fresh random key per server, readable by this user only
+    server_dir = socket_path.parent
+    server_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if not is_private_path(server_dir):
+        msg = f"{server_dir} must belong to you and be private (chmod 700)"
+        raise PermissionError(msg)
+
+    authkey = os.urandom(32)
+    authkey_path = get_authkey_path(socket_path)
+    authkey_path.unlink(missing_ok=True)
+    authkey_fd = os.open(authkey_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(authkey_fd, "wb") as f:
+        f.write(authkey)
+
+    return authkey
+
+
+def serve_models(socket_path: Path = MODEL_SERVER_SOCKET_PATH) -> None:
+    # One job at a time: a job already uses every thread it was given, and
+    # clients simply wait in the listen backlog.
+    connection = connect_to_model_server(socket_path)
+    if connection is not None:
+        connection.close()
+        rprint("🧠 A model server is already running:", socket_path)
+        return
+
+    authkey = create_model_server_dir(socket_path)
+    socket_path.unlink(missing_ok=True)
+    warm_up_models()
+
+    # Jobs arrive pickled, only this user may connect
+    old_umask = os.umask(0o177)
+    try:
+        listener = Listener(str(socket_path), family="AF_UNIX", authkey=authkey)
+    finally:
+        os.umask(old_umask)
+
+    rprint("🧠 Serving models on:", socket_path, "\n\n")
+    with listener:
+        while True:
+            # A client that dies mid-job only loses its own answer
+            try:
+                with listener.accept() as connection:
+                    handle_model_job(connection)
+            except (OSError, EOFError, AuthenticationError) as e:
+                rprint("🔴 Model job connection failed:", repr(e), "\n\n")
+
+
+if __name__ == "__main__":
+    # python -m aivideocut.model_server
+    # Leave it running in a terminal, Ctrl+C stops it (and removes the socket)
+    serve_models()
@@ -0,0 +1,172 @@
+# pyright: basic
+import sys
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+from rich import print as rprint
+
+from aivideocut.configs import ORIGINAL_SRT_FILE_PATH
+from aivideocut.segments import SpeechTimestamps, read_speech_timestamps
+from aivideocut.srt import SRTCue, cues_to_srt, read_srt_file
+from aivideocut.timeline import read_timeline_json
+from aivideocut.utils import write_str_to_file
+
+# (keep list, cut file stem) for every cut stage of `run_single_file` that
+# writes a keep list, in pipeline order. Each keep list is in the time of that
+# stage's input.
+CUT_STAGE_KEEP_FILES = (("03_SILERO.json", "04_FINAL"),)
+TIMELINE_FILENAME = "03_TIMELINE.json"
+TIMELINE_CUT_STEM = "04_FINAL"
+# auto-editor writes no keep list, so its cut cannot be mapped back
+AUTO_EDITOR_CUT_STEM = "02_AE_CUT"
+
+
+class TimeRemap:
+    # Maps a time in the cut's input to the time it ends up at in the cut
+    # output. Kept intervals must be sorted and not overlap, like every keep
+    # list the pipeline writes.
+    __slots__ = ("output_starts", "source_ends", "source_starts")
+
+    def __init__(self, source_starts: np.ndarray, source_ends: np.ndarray) -> None:
+        self.source_starts = source_starts
+        self.source_ends = source_ends
+        durations = source_ends - source_starts
+        self.output_starts = np.concatenate(([0.0], np.cumsum(durations)[:-1]))
+
+    @classmethod
+    def from_intervals(cls, keep_intervals: SpeechTimestamps) -> "TimeRemap":
+        return cls(
+            np.array([i["start"] for i in keep_intervals], dtype=np.float64),
+            np.array([i["end"] for i in keep_intervals], dtype=np.float64),
+        )
+
+    def get_output_duration(self) -> float:
+        return float(np.sum(self.source_ends - self.source_starts))
+
+    def to_output(self, source_time: float) -> float | None:
+        # None when `source_time` was cut out
+        i = int(np.searchsorted(self.source_starts, source_time, side="right")) - 1
+
+        if i < 0 or source_time > self.source_ends[i]:
+            return None
+
+        return float(self.output_starts[i] + source_time - self.source_starts[i])
+
+    def to_source(self, output_time: float, *, is_end: bool = False) -> float:
+        # Inverse of `to_output`, every output time has a source time. A join
+        # between two kept intervals is the end of the first one for an end
+        # time (`is_end`) and the start of the second one otherwise.
+        side = "left" if is_end else "right"
+        i = int(np.searchsorted(self.output_starts, output_time, side=side)) - 1
+        i = max(0, i)
+        return float(self.source_starts[i] + output_time - self.output_starts[i])
+
+    def clip_to_output(self, start: float, end: float) -> tuple[float, float] | None:
+        # A cue partially cut keeps whatever part of it survived, from the
+        # first kept instant to the last one. None if nothing survived.
+        first = int(np.searchsorted(self.source_ends, start, side="right"))
+        last = int(np.searchsorted(self.source_starts, end, side="left")) - 1
+
+        if first > last:
+            return None
+
+        output_start = self.output_starts[first] + max(
+            0.0, start - self.source_starts[first]
+        )
+        output_end = self.output_starts[last] + (
+            min(end, self.source_ends[last]) - self.source_starts[last]
+        )
+        return float(output_start), float(output_end)
+
+
+def get_cut_files(output_dir: Path, cut_stem: str) -> list[Path]:
+    return [path for path in output_dir.glob(f"{cut_stem}.*") if path.suffix != ".json"]
+
+
+def is_timeline_current(output_dir: Path) -> bool:
+    # The single render writes its timeline after the output, a later
+    # multi-stage run renders over that output and leaves the timeline older
+    timeline_file = output_dir / TIMELINE_FILENAME
+    cut_files = get_cut_files(output_dir, TIMELINE_CUT_STEM)
+
+    if not timeline_file.is_file() or not cut_files:
+        return False
+
+    timeline_mtime_ns = timeline_file.stat().st_mtime_ns
+    return all(path.stat().st_mtime_ns <= timeline_mtime_ns for path in cut_files)
+
+
+def get_output_remaps(output_dir: Path) -> list[TimeRemap]:
+    # A single-render timeline already is in master time. Otherwise every
+    # cut stage that ran adds one remap, applied in pipeline order.
+    if is_timeline_current(output_dir):
+        timeline = read_timeline_json(output_dir / TIMELINE_FILENAME)
+        return [TimeRemap.from_intervals(timeline.keep_intervals)]
+
+    if get_cut_files(output_dir, AUTO_EDITOR_CUT_STEM):
+        msg = "auto-editor cuts are not retimable, use --native-silence-cut"
+        raise ValueError(msg)
+
+    remaps: list[TimeRemap] = []
+    for keep_filename, cut_stem in CUT_STAGE_KEEP_FILES:
+        keep_file = output_dir / keep_filename
+        cut_files = get_cut_files(output_dir, cut_stem)
+
+        if not cut_files:
+            continue
+
+        if not keep_file.is_file():
+            msg = f"{cut_files[0].name} has no keep list ({keep_filename})"
+            raise FileNotFoundError(msg)
+
+        remaps.append(TimeRemap.from_intervals(read_speech_timestamps(keep_file)))
+
+    return remaps
+
+
+def retime_srt_cues(cues: Iterable[SRTCue], remaps: Iterable[TimeRemap]) -> str:
+    remaps = list(remaps)
+    retimed_cues: list[SRTCue] = []
+
+    for cue in cues:
+        cue_times: tuple[float, float] | None = (
+            cue.start_ms / 1000,
+            cue.end_ms / 1000,
+        )
+        for remap in remaps:
+            if cue_times is None:
+                break
+            cue_times = remap.clip_to_output(*cue_times)
+
+        if cue_times is None:
+            continue
+
+        retimed_cues.append(
+            SRTCue(
+                len(retimed_cues) + 1,
+                round(cue_times[0] * 1000),
+                round(cue_times[1] * 1000),
+                cue.text,
+            )
+        )
+
+    return cues_to_srt(retimed_cues)
+
+
+def retime_srt_file(*, srt_path: Path, output_dir: Path, retimed_path: Path) -> Path:
+    remaps = get_output_remaps(output_dir)
+    retimed_srt = retime_srt_cues(read_srt_file(srt_path), remaps)
+    write_str_to_file(retimed_srt, retimed_path, create_parents=True)
+
+    rprint(f"\n✅ Retimed {srt_path.name} with {len(remaps)} cut(s): {retimed_path}")
+    return retimed_path
+
+
+if __name__ == "__main__":
+    # python -m aivideocut.remap path/to/video_dir/output_dir
+    retime_srt_file(
+        srt_path=ORIGINAL_SRT_FILE_PATH,
+        output_dir=Path(sys.argv[1]),
+        retimed_path=ORIGINAL_SRT_FILE_PATH.with_stem("final_transcription"),
+    )
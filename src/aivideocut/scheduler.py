@@ -0,0 +1,133 @@
+# pyright: basic
+import multiprocessing
+import os
+import time
+from collections.abc import Callable, Generator
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing.synchronize import Semaphore
+from pathlib import Path
+from typing import Any, Literal, NamedTuple, TypeAlias
+
+StageKind: TypeAlias = Literal["encode", "analysis", "vad", "transcribe"]
+
+
+class StageBudget(NamedTuple):
+    slots: int
+    threads: int
+
+
+class FileResult(NamedTuple):
+    in_file: Path
+    files_processed: list[Path]
+    elapsed_secs: float
+    error: str | None = None
+
+
+# Set once per worker process by `_init_worker`. While empty, `stage_slot` is a
+# no-op and ffmpeg/torch pick their own thread counts (sequential mode).
+_stage_semaphores: dict[StageKind, Semaphore] = {}
+_stage_budgets: dict[StageKind, StageBudget] = {}
+
+
+def get_default_budgets(cpu_count: int | None = None) -> dict[StageKind, StageBudget]:
+    cpus = cpu_count or os.cpu_count() or 1
+    encode_threads = max(1, cpus // 2)
+    vad_threads = max(1, min(4, cpus // 4))
+    transcribe_threads = max(1, min(8, cpus // 2))
+
+    return {
+        # libx264 scales well up to a point, so two half-machine encodes keep
+        # every core busy without one file starving the others.
+        "encode": StageBudget(
+            slots=max(1, cpus // encode_threads), threads=encode_threads
+        ),
+        # loudnorm first pass is single-threaded (decode + filter)
+        "analysis": StageBudget(slots=max(1, cpus // 2), threads=1),
+        "vad": StageBudget(slots=max(1, cpus // vad_threads // 2), threads=vad_threads),
+        # CTranslate2 stops scaling around 8 threads, and every slot holds its
+        # own copy of the Whisper model in memory.
+        "transcribe": StageBudget(slots=1, threads=transcribe_threads),
+    }
+
+
+def get_default_workers(budgets: dict[StageKind, StageBudget]) -> int:
+    # One extra file in flight per encode slot, so the next file is already in
+    # its VAD/analysis stage when an encode finishes.
+    return budgets["encode"].slots * 2
+
+
+def _init_worker(
+    semaphores: dict[StageKind, Semaphore],
+    budgets: dict[StageKind, StageBudget],
+    initializer: Callable[[], Any] | None,
+) -> None:
+    _stage_semaphores.update(semaphores)
+    _stage_budgets.update(budgets)
+
+    if initializer is not None:
+        initializer()
+
+
+@contextmanager
+def stage_slot(kind: StageKind) -> Generator[int | None]:
+    semaphore = _stage_semaphores.get(kind)
+
+    if semaphore is None:
+        yield None
+        return
+
+    with semaphore:
+        yield _stage_budgets[kind].threads
+
+
+def _run_timed(
+    func: Callable[..., list[Path]], in_file: Path, kwargs: dict[str, object]
+) -> tuple[list[Path], float]:
+    start_time = time.perf_counter()
+    files_processed = func(input_path=in_file, **kwargs)
+    return files_processed, time.perf_counter() - start_time
+
+
+def run_files_in_pool(
+    func: Callable[..., list[Path]],
+    files: list[Path],
+    *,
+    workers: int | None = None,
+    budgets: dict[StageKind, StageBudget] | None = None,
+    initializer: Callable[[], Any] | None = None,
+    **kwargs: object,
+) -> list[FileResult]:
+    budgets = budgets or get_default_budgets()
+    workers = workers or get_default_workers(budgets)
+    workers = max(1, min(workers, len(files)))
+
+    mp_context = multiprocessing.get_context()
+    semaphores = {
+        kind: mp_context.Semaphore(budget.slots) for kind, budget in budgets.items()
+    }
+
+    futures: list[Future[tuple[list[Path], float]]] = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=_init_worker,
+        initargs=(semaphores, budgets, initializer),
+    ) as executor:
+        futures.extend(
+            executor.submit(_run_timed, func, in_file, kwargs) for in_file in files
+        )
+
+        # Waiting in submission order keeps the report in input order even if
+        # a short file finishes before a long one submitted earlier.
+        results: list[FileResult] = []
+        for in_file, future in zip(files, futures, strict=True):
+            try:
+                files_processed, elapsed_secs = future.result()
+            except Exception as e:  # noqa: BLE001
+                results.append(FileResult(in_file, [], 0.0, f"{type(e).__name__}: {e}"))
+                continue
+
+            results.append(FileResult(in_file, files_processed, elapsed_secs))
+
+    return results
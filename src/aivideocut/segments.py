@@ -0,0 +1,234 @@
+# pyright: basic
+import json
+from collections.abc import Iterable, Iterator
+from fractions import Fraction
+from pathlib import Path
+from typing import Literal, TypeAlias
+
+import numpy as np
+
+SpeechTimestamp: TypeAlias = dict[Literal["start"] | Literal["end"], float]
+SpeechTimestamps: TypeAlias = list[SpeechTimestamp]
+
+# Segment times are tenths of a second plus centisecond paddings, anything
+# past microseconds is float noise.
+SMARTCUT_MAX_DENOMINATOR = 1_000_000
+
+
+class SpeechSegments:
+    # Column storage for speech segments: two float64 arrays instead of one
+    # dict per segment, so padding/merging can run as array operations.
+    __slots__ = ("ends", "starts")
+
+    def __init__(self, starts: Iterable[float], ends: Iterable[float]) -> None:
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = np.asarray(ends, dtype=np.float64)
+
+    @classmethod
+    def from_timestamps(cls, speech_timestamps: SpeechTimestamps) -> "SpeechSegments":
+        return cls(
+            [timestamp["start"] for timestamp in speech_timestamps],
+            [timestamp["end"] for timestamp in speech_timestamps],
+        )
+
+    def to_timestamps(self) -> SpeechTimestamps:
+        return [
+            {"start": start, "end": end}
+            for start, end in zip(self.starts.tolist(), self.ends.tolist(), strict=True)
+        ]
+
+    def to_smartcut_segments(self) -> list[tuple[Fraction, Fraction]]:
+        # What `smartcut.__main__.parse_time_segments` returns, built without
+        # joining every timestamp into a string for it to split again.
+        return [
+            (
+                Fraction(start).limit_denominator(SMARTCUT_MAX_DENOMINATOR),
+                Fraction(end).limit_denominator(SMARTCUT_MAX_DENOMINATOR),
+            )
+            for start, end in zip(self.starts.tolist(), self.ends.tolist(), strict=True)
+        ]
+
+    def is_sorted(self) -> bool:
+        return bool(
+            np.all(np.diff(self.starts) >= 0) and np.all(np.diff(self.ends) >= 0)
+        )
+
+    def get_duration(self) -> float:
+        return float(np.sum(self.ends - self.starts))
+
+    def __len__(self) -> int:
+        return self.starts.size
+
+    def __iter__(self) -> Iterator[tuple[float, float]]:
+        return zip(self.starts.tolist(), self.ends.tolist(), strict=True)
+
+    def __repr__(self) -> str:
+        return f"SpeechSegments({len(self)} segments, {self.get_duration():.2f}s)"
+
+
+def search_first_long_enough(
+    ends: np.ndarray, group_starts: np.ndarray, min_length: float
+) -> np.ndarray:
+    # For every j, the first i >= j with `ends[i] - group_starts[j] >=
+    # min_length` (or len(ends)). searchsorted gets within float rounding of
+    # it, then a few steps with the loop's exact expression settle the ties.
+    size = ends.size
+    indexes = np.arange(size)
+    found = np.maximum(
+        np.searchsorted(ends, group_starts + min_length, side="left"), indexes
+    )
+
+    def is_long_at(positions: np.ndarray) -> np.ndarray:
+        clipped = np.clip(positions, 0, size - 1)
+        return ends[clipped] - group_starts >= min_length
+
+    while np.any(step_back := (found > indexes) & is_long_at(found - 1)):
+        found -= step_back
+
+    while np.any(step_forward := (found < size) & ~is_long_at(found)):
+        found += step_forward
+
+    return found
+
+
+def follow_jumps(next_indexes: np.ndarray) -> np.ndarray:
+    # Indexes visited starting at 0 and jumping to next_indexes[i] (always
+    # > i) until past the end. Pointer doubling: log2(n) array gathers instead
+    # of one Python step per visited index.
+    size = next_indexes.size
+    jumps = np.append(np.minimum(next_indexes, size), size)
+    steps = np.arange(size)
+    positions = np.zeros(size, dtype=np.int64)
+
+    bit = 0
+    while (1 << bit) < size:
+        has_bit = (steps >> bit) & 1 == 1
+        positions[has_bit] = jumps[positions[has_bit]]
+        jumps = jumps[jumps]
+        bit += 1
+
+    return positions[positions < size]
+
+
+def adjust_speech_segments(
+    segments: SpeechSegments,
+    *,
+    min_speech_length_secs: float = 1,
+    pad_start_secs: float = 0.02,
+    pad_end_secs: float = 0.03,
+) -> SpeechSegments:
+    # Same result as `adjust_speech_timestamps_sequential`. Segments are
+    # grouped until a group lasts min_speech_length_secs, and every group
+    # starts right after the one before, so once we know where a group
+    # starting at any j would end, the real groups are the jumps from 0.
+    if len(segments) == 0:
+        return segments
+
+    if not segments.is_sorted():
+        speech_timestamps = adjust_speech_timestamps_sequential(
+            segments.to_timestamps(),
+            min_speech_length_secs=min_speech_length_secs,
+            pad_start_secs=pad_start_secs,
+            pad_end_secs=pad_end_secs,
+        )
+        return SpeechSegments.from_timestamps(speech_timestamps)
+
+    raw_starts, raw_ends = segments.starts, segments.ends
+    size = raw_starts.size
+    last_end = raw_ends[-1]
+
+    ends = (
+        np.minimum(last_end, raw_ends + pad_end_secs) if pad_end_secs > 0 else raw_ends
+    )
+    # The kept end a group starting at j works against is the end of j - 1
+    previous_ends = np.concatenate(([0.0], ends[:-1]))
+
+    # Segments whose (padded) start lands on the previous kept end are
+    # skipped by the loop, with sorted starts they are a contiguous run.
+    if pad_start_secs > 0:
+        shifted_starts = raw_starts - pad_start_secs
+        group_starts = np.maximum(previous_ends, shifted_starts)
+        skipped_from = np.zeros(size, dtype=np.int64)
+        skipped_to = np.searchsorted(shifted_starts, previous_ends, side="right")
+    else:
+        group_starts = raw_starts
+        skipped_from = np.searchsorted(raw_starts, previous_ends, side="left")
+        skipped_to = np.searchsorted(raw_starts, previous_ends, side="right")
+
+    kept_at = search_first_long_enough(ends, group_starts, min_speech_length_secs)
+    kept_at = np.where(
+        (kept_at >= skipped_from) & (kept_at < skipped_to), skipped_to, kept_at
+    )
+
+    group_indexes = follow_jumps(kept_at + 1)
+    # A group still open at the last segment is never kept
+    group_indexes = group_indexes[kept_at[group_indexes] < size]
+
+    if group_indexes.size == 0:
+        return SpeechSegments([raw_starts[0]], [last_end])
+
+    new_starts = group_starts[group_indexes]
+    new_ends = ends[kept_at[group_indexes]]
+    new_ends[-1] = last_end
+    return SpeechSegments(new_starts, new_ends)
+
+
+def adjust_speech_timestamps_sequential(
+    speech_timestamps: SpeechTimestamps,
+    min_speech_length_secs: float = 1,
+    pad_start_secs: float = 0.02,
+    pad_end_secs: float = 0.03,
+) -> SpeechTimestamps:
+    # The original loop, kept as the reference for `adjust_speech_segments`
+    # and for unsorted input.
+    new_timestamps: SpeechTimestamps = []
+
+    if not speech_timestamps:
+        return new_timestamps
+
+    first_timestamp_start = speech_timestamps[-0]["start"]
+    last_timestamp_end = speech_timestamps[-1]["end"]
+
+    last_current_start = -1
+    last_current_end = 0
+    for timestamp in speech_timestamps:
+        current_start, current_end = timestamp["start"], timestamp["end"]
+
+        if pad_start_secs > 0:
+            current_start = max(last_current_end, current_start - pad_start_secs)
+
+        if pad_end_secs > 0:
+            current_end = min(last_timestamp_end, current_end + pad_end_secs)
+
+        if last_current_start < 0:
+            last_current_start = current_start
+
+        if current_start == last_current_end:
+            continue
+
+        current_duration = current_end - last_current_start
+        if current_duration >= min_speech_length_secs:
+            new_timestamps.append({"start": last_current_start, "end": current_end})
+            last_current_start = -1
+            last_current_end = current_end
+
+    if not new_timestamps:
+        new_timestamps.append(
+            {"start": first_timestamp_start, "end": last_timestamp_end}
+        )
+    else:
+        new_timestamps[-1]["end"] = last_timestamp_end
+
+    return new_timestamps
+
+
+def read_speech_timestamps(path: Path) -> SpeechTimestamps:
+    # Every keep list the pipeline writes: Silero's speech, the loud
+    # intervals, a transcription's speech JSON
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_speech_timestamps(speech_timestamps: SpeechTimestamps, path: Path) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(speech_timestamps, f)
@@ -0,0 +1,64 @@
+# pyright: basic
+import sys
+import time
+
+import numpy as np
+
+from aivideocut.segments import (
+    SpeechSegments,
+    SpeechTimestamps,
+    adjust_speech_segments,
+    adjust_speech_timestamps_sequential,
+)
+
+
+def get_random_speech_timestamps(size: int, *, seed: int = 0) -> SpeechTimestamps:
+    # Silero-like output: 0.1s resolution, short gaps, lots of short segments
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, 40, size) / 10
+    gaps = rng.integers(0, 10, size) / 10
+    starts = np.round(np.cumsum(gaps + np.concatenate(([0], lengths[:-1]))), 1)
+    ends = np.round(starts + lengths, 1)
+    return SpeechSegments(starts, ends).to_timestamps()
+
+
+def benchmark_adjust_speech_segments(size: int = 100_000) -> None:
+    speech_timestamps = get_random_speech_timestamps(size)
+    segments = SpeechSegments.from_timestamps(speech_timestamps)
+
+    for adjust_options in (
+        {"min_speech_length_secs": 1, "pad_start_secs": 0.02, "pad_end_secs": 0.03},
+        {"min_speech_length_secs": 0.2, "pad_start_secs": 0.01, "pad_end_secs": 0.01},
+        {"min_speech_length_secs": 3, "pad_start_secs": 0, "pad_end_secs": 0},
+    ):
+        start_time = time.perf_counter()
+        expected = adjust_speech_timestamps_sequential(
+            speech_timestamps, **adjust_options
+        )
+        sequential_secs = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        adjusted = adjust_speech_segments(segments, **adjust_options)
+        vectorized_secs = time.perf_counter() - start_time
+
+        # What a caller holding dicts pays: conversion both ways included
+        start_time = time.perf_counter()
+        adjusted_timestamps = adjust_speech_segments(
+            SpeechSegments.from_timestamps(speech_timestamps), **adjust_options
+        ).to_timestamps()
+        round_trip_secs = time.perf_counter() - start_time
+
+        status = "✅" if adjusted_timestamps == expected else "🔴"
+        print(
+            status,
+            f"{size} segments -> {len(adjusted)},",
+            f"loop {sequential_secs * 1000:.1f}ms,",
+            f"arrays {vectorized_secs * 1000:.1f}ms,",
+            f"dicts in/out {round_trip_secs * 1000:.1f}ms:",
+            adjust_options,
+        )
+
+
+if __name__ == "__main__":
+    # python -m aivideocut.segments_bench [segments]
+    benchmark_adjust_speech_segments(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -1,34 +1,72 @@
 # pyright: basic
 # ruff: noqa: S603,ERA001
 import json
+import os
 import re
 import time
 from collections import namedtuple
 from collections.abc import Callable
-from functools import wraps
+from functools import partial, wraps
 from pathlib import Path
 from subprocess import run
 from typing import Literal, ParamSpec, TypeVar
 
-import av
 from rich.console import Console
-from silero_vad import get_speech_timestamps, load_silero_vad, read_audio
-from smartcut.__main__ import Progress, parse_time_segments
-from smartcut.cut_video import (
-    MediaContainer,
-    VideoExportMode,
-    VideoExportQuality,
-    VideoSettings,
-    smart_cut,
-)
-from smartcut.misc_data import AudioExportInfo, AudioExportSettings
 
-from aivideocut.utils import SpeechTimestamps, ajust_vad_speech_timestamps
+from aivideocut.configs import (
+    audio_normalization,
+    audio_silence,
+    ffmpeg_audio_encode,
+    ffmpeg_video_encode,
+    silero_adjust,
+    silero_parallel,
+    silero_torch_threads,
+    silero_vad,
+    transcribe,
+    whisper_batch_size,
+    whisper_model_options,
+    whisper_model_size,
+    whisper_parallel,
+    whisper_vad_gate,
+)
+from aivideocut.loudness import get_loudnorm_measurements, measure_loudness
+from aivideocut.model_server import run_model_job
+from aivideocut.scheduler import FileResult, run_files_in_pool, stage_slot
+from aivideocut.segments import (
+    SpeechSegments,
+    SpeechTimestamps,
+    read_speech_timestamps,
+    write_speech_timestamps,
+)
+from aivideocut.silence import detect_loud_intervals
+from aivideocut.speech_probs import (
+    SILERO_SAMPLING_RATE,
+    SILERO_WINDOW_SAMPLES,
+    get_speech_timestamps_from_probabilities,
+    load_speech_probabilities,
+    save_speech_probabilities,
+)
+from aivideocut.stage_cache import (
+    clear_stage_key,
+    get_command_version,
+    get_output_mtime_ns,
+    get_package_version,
+    get_stage_key,
+    is_stage_cached,
+    save_stage_key,
+)
+from aivideocut.timeline import (
+    compose_timeline,
+    get_kept_duration,
+    write_timeline_json,
+)
+from aivideocut.utils import ajust_vad_speech_timestamps
 
 console = Console(highlight=False, style="cyan")
 rprint = console.print
 
 ROOT_DIR = Path(__file__).parent.parent.parent
+AUTO_EDITOR_BIN = ROOT_DIR / ".." / "autoeditorlatest" / ".venv" / "bin" / "auto-editor"
 FFMPEG_LOG_LEVEL = Literal[
     "quiet",
     "panic",
@@ -40,6 +78,7 @@ FFMPEG_LOG_LEVEL = Literal[
     "debug",
     "trace",
 ]
+ALLOWED_EXTENSIONS = [".mp4", ".mov", ".mkv"]
 
 FilePaths = namedtuple(
     "FilePaths",
@@ -64,6 +103,42 @@ def get_ffmpeg_cmd(log_level: FFMPEG_LOG_LEVEL = "warning") -> list[str]:
     return ["ffmpeg", "-hide_banner", "-loglevel", log_level, "-stats"]
 
 
+def add_ffmpeg_threads(
+    ffmpeg_cmd: list[str | Path], threads: int | None
+) -> list[str | Path]:
+    if threads is None:
+        return ffmpeg_cmd
+
+    # Right after the input, `-threads` is an output option (encoder/filters)
+    after_input_index = ffmpeg_cmd.index("-i") + 2
+    return [
+        *ffmpeg_cmd[:after_input_index],
+        "-threads",
+        str(threads),
+        *ffmpeg_cmd[after_input_index:],
+    ]
+
+
+def get_video_encode_args() -> list[str]:
+    return [
+        "-c:v",
+        ffmpeg_video_encode["codec"],
+        "-crf",
+        ffmpeg_video_encode["crf"],
+        "-preset",
+        ffmpeg_video_encode["preset"],
+    ]
+
+
+def get_audio_encode_args() -> list[str]:
+    return [
+        "-c:a",
+        ffmpeg_audio_encode["codec"],
+        "-b:a",
+        ffmpeg_audio_encode["bitrate"],
+    ]
+
+
 def ffmpeg_fix_codecs(
     *, input_file: Path, output_file: Path, dry_run: bool = True
 ) -> Path:
@@ -73,10 +148,11 @@ def ffmpeg_fix_codecs(
     ffmpeg_cmd = [
         *ffmpeg_cmd,
         "-i", input_file,
-        "-c:v", "libx264", "-crf", "13", "-preset", "fast",
-        "-c:a", "aac", "-b:a", "512k",
+        *get_video_encode_args(),
+        *get_audio_encode_args(),
         "-movflags", "+faststart", "-fflags", "+genpts",
-        output_file
+        output_file,
+        "-y",
     ]
     # fmt: on
 
@@ -89,27 +165,34 @@ def ffmpeg_fix_codecs(
     if dry_run:
         return output_file
 
-    run(ffmpeg_cmd)
+    with stage_slot("encode") as threads:
+        run(add_ffmpeg_threads(ffmpeg_cmd, threads), check=True)
 
     return output_file
 
 
-def ffmpeg_audio_normalization(
+def ffmpeg_loudnorm_measure(
     *,
     input_file: Path,
-    output_file: Path,
-    loudnorm_i: str = "-14",
-    loudnorm_tp: str = "-2.0",
-    loudnorm_lra: str = "11",
-    dry_run: bool = False,
-) -> Path:
+    loudnorm_i: str,
+    loudnorm_tp: str,
+    loudnorm_lra: str,
+    in_process: bool = False,
+) -> dict[str, str] | None:
+    if in_process:
+        rprint("🔉 Normalization first pass (in process):", input_file, "\n\n")
+
+        with stage_slot("analysis"):
+            parsed_loud_norm = get_loudnorm_measurements(measure_loudness(input_file))
+
+        rprint("🔉 Normalization data:", parsed_loud_norm, "\n\n")
+        return parsed_loud_norm
+
     # fmt: off
-    ffmpeg_cmd = get_ffmpeg_cmd(log_level="info")
-    ffmpeg_audio_normalization = [
-        *ffmpeg_cmd,
+    ffmpeg_loudnorm_first_pass = [
+        *get_ffmpeg_cmd(log_level="info"),
         "-i", input_file,
-        "-c:v", "copy",
-        "-c:a", "aac", "-b:a", "512k",
+        "-map", "0:a:0", "-vn", "-sn", "-dn",
         "-af",
         f"loudnorm=I={loudnorm_i}:TP={loudnorm_tp}:LRA={loudnorm_lra}:print_format=json",
         "-f", "null",
@@ -119,15 +202,16 @@ def ffmpeg_audio_normalization(
 
     rprint(
         "🔉 Normalization first pass:",
-        f"[code]{join(ffmpeg_audio_normalization)}[/code]\n\n",
+        f"[code]{join(ffmpeg_loudnorm_first_pass)}[/code]\n\n",
     )
 
-    ffmpeg_normalization_output = run(
-        ffmpeg_audio_normalization,
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+    with stage_slot("analysis") as threads:
+        ffmpeg_normalization_output = run(
+            add_ffmpeg_threads(ffmpeg_loudnorm_first_pass, threads),
+            capture_output=True,
+            text=True,
+            check=False,
+        )
     stderr_output = ffmpeg_normalization_output.stderr
     found_loud_norm_output = re.search(
         r"(?:\[Parsed_loudnorm.*?\].*)(\{.*?\})",
@@ -135,47 +219,139 @@ def ffmpeg_audio_normalization(
         re.DOTALL | re.MULTILINE,
     )
 
-    if found_loud_norm_output:
-        raw_loud_norm_json = found_loud_norm_output.group(1)
-        parsed_loud_norm = json.loads(raw_loud_norm_json)
-
-        measured_i = parsed_loud_norm["input_i"]
-        measured_lra = parsed_loud_norm["input_lra"]
-        measured_tp = parsed_loud_norm["input_tp"]
-        measured_thresh = parsed_loud_norm["input_thresh"]
-        target_offset = parsed_loud_norm["target_offset"]
-
-        # fmt: off
-        ffmpeg_audio_normalization = [
-            *ffmpeg_cmd,
-            "-i", input_file,
-            "-c:v", "copy",
-            "-af",
-            (
-                f"loudnorm=I={loudnorm_i}:TP={loudnorm_tp}:LRA={loudnorm_lra}:"
-                f"measured_I={measured_i}:"
-                f"measured_LRA={measured_lra}:measured_TP={measured_tp}:measured_thresh={measured_thresh}:"
-                f"offset={target_offset}:linear=true:print_format=summary"
-            ),
-            "-c:a", "aac", "-b:a", "512k",
-            output_file,
-            "-y",
-        ]
-        # fmt: on
-        #
-        rprint("🔉 Normalization data:", parsed_loud_norm, "\n\n")
-        rprint(
-            "🔉 Normalization second pass:",
-            f"[code]{join(ffmpeg_audio_normalization)}[/code]",
-            "\n\n",
-        )
+    if not found_loud_norm_output:
+        return None
 
-        if dry_run:
-            return output_file
+    raw_loud_norm_json = found_loud_norm_output.group(1)
+    parsed_loud_norm = json.loads(raw_loud_norm_json)
+    rprint("🔉 Normalization data:", parsed_loud_norm, "\n\n")
+
+    return parsed_loud_norm
+
+
+def get_loudnorm_second_pass_filter(
+    parsed_loud_norm: dict[str, str],
+    *,
+    loudnorm_i: str,
+    loudnorm_tp: str,
+    loudnorm_lra: str,
+) -> str:
+    measured_i = parsed_loud_norm["input_i"]
+    measured_lra = parsed_loud_norm["input_lra"]
+    measured_tp = parsed_loud_norm["input_tp"]
+    measured_thresh = parsed_loud_norm["input_thresh"]
+    target_offset = parsed_loud_norm["target_offset"]
+
+    return (
+        f"loudnorm=I={loudnorm_i}:TP={loudnorm_tp}:LRA={loudnorm_lra}:"
+        f"measured_I={measured_i}:"
+        f"measured_LRA={measured_lra}:measured_TP={measured_tp}:"
+        f"measured_thresh={measured_thresh}:"
+        f"offset={target_offset}:linear=true:print_format=summary"
+    )
+
+
+def ffmpeg_audio_normalization(
+    *,
+    input_file: Path,
+    output_file: Path,
+    loudnorm_i: str,
+    loudnorm_tp: str,
+    loudnorm_lra: str,
+    measure_in_process: bool = False,
+    dry_run: bool = False,
+) -> Path:
+    loudnorm_targets = {
+        "loudnorm_i": loudnorm_i,
+        "loudnorm_tp": loudnorm_tp,
+        "loudnorm_lra": loudnorm_lra,
+    }
+    parsed_loud_norm = ffmpeg_loudnorm_measure(
+        input_file=input_file, in_process=measure_in_process, **loudnorm_targets
+    )
+
+    if parsed_loud_norm is None:
+        return output_file
+
+    # fmt: off
+    ffmpeg_audio_normalization = [
+        *get_ffmpeg_cmd(log_level="info"),
+        "-i", input_file,
+        "-c:v", "copy",
+        "-af", get_loudnorm_second_pass_filter(parsed_loud_norm, **loudnorm_targets),
+        *get_audio_encode_args(),
+        output_file,
+        "-y",
+    ]
+    # fmt: on
+
+    rprint(
+        "🔉 Normalization second pass:",
+        f"[code]{join(ffmpeg_audio_normalization)}[/code]",
+        "\n\n",
+    )
+
+    if dry_run:
+        return output_file
+
+    with stage_slot("encode") as threads:
+        run(add_ffmpeg_threads(ffmpeg_audio_normalization, threads), check=True)
+
+    return output_file
+
+
+def ffmpeg_fix_codecs_and_normalize(
+    *,
+    input_file: Path,
+    output_file: Path,
+    loudnorm_i: str,
+    loudnorm_tp: str,
+    loudnorm_lra: str,
+    measure_in_process: bool = False,
+    dry_run: bool = False,
+) -> Path:
+    loudnorm_targets = {
+        "loudnorm_i": loudnorm_i,
+        "loudnorm_tp": loudnorm_tp,
+        "loudnorm_lra": loudnorm_lra,
+    }
+    # Measuring only reads the audio stream, so the video is decoded exactly
+    # once: by the encode below, which also applies the loudnorm second pass.
+    parsed_loud_norm = ffmpeg_loudnorm_measure(
+        input_file=input_file, in_process=measure_in_process, **loudnorm_targets
+    )
+
+    # Nothing is written without the measurement: an unnormalized output
+    # would be cached as this stage's and never normalized again.
+    if parsed_loud_norm is None:
+        msg = f"Loudnorm measurement failed for {input_file}"
+        raise RuntimeError(msg)
 
-        run(ffmpeg_audio_normalization)
+    # fmt: off
+    ffmpeg_cmd = [
+        *get_ffmpeg_cmd(log_level="info"),
+        "-i", input_file,
+        *get_video_encode_args(),
+        "-af", get_loudnorm_second_pass_filter(parsed_loud_norm, **loudnorm_targets),
+        *get_audio_encode_args(),
+        "-movflags", "+faststart", "-fflags", "+genpts",
+        output_file,
+        "-y",
+    ]
+    # fmt: on
 
+    rprint(
+        "🎬🔉 ffmpeg fix codecs + normalization:",
+        f"[code]{join(ffmpeg_cmd)}[/code]",
+        "\n\n",
+    )
+
+    if dry_run:
         return output_file
+
+    with stage_slot("encode") as threads:
+        run(add_ffmpeg_threads(ffmpeg_cmd, threads), check=True)
+
     return output_file
 
 
@@ -183,10 +359,9 @@ def auto_editor_cut_silences(
     *, input_file: Path, output_file: Path, dry_run: bool = False
 ) -> Path:
     # fmt: off
-    auto_editor_bin = ROOT_DIR / ".." /  "autoeditorlatest"/".venv"/"bin"/"auto-editor"
     auto_editor_silence_cut  = [
         # "/Users/luizotavio/Desktop/tutoriais_e_cursos/autoeditorlatest/.venv/bin/auto-editor",
-        str(auto_editor_bin),
+        str(AUTO_EDITOR_BIN),
         # "--edit", "audio:threshold=0.02,stream=all,mincut=30", # OLD
         "--edit", "audio:threshold=0.04,stream=all,mincut=30",
         "--margin", "0.2s,0.3s",
@@ -210,19 +385,202 @@ def auto_editor_cut_silences(
     if dry_run:
         return output_file
 
-    run(auto_editor_silence_cut)
+    with stage_slot("encode"):
+        run(auto_editor_silence_cut, check=True)
     rprint(join(auto_editor_silence_cut), "\n\n")
 
     return output_file
 
 
+def native_detect_audio_silences(*, input_file: Path) -> SpeechTimestamps:
+    # auto-editor's silence detection without its render: the loud intervals
+    # are a layer of the edit timeline, rendered once with the other cuts.
+    rprint("🔇 Native silence detection:", input_file, audio_silence, "\n\n")
+
+    with stage_slot("analysis"):
+        loud_intervals = detect_loud_intervals(input_file, **audio_silence)
+
+    rprint("🔇 Loud intervals:", loud_intervals, "\n\n")
+    return loud_intervals
+
+
+def whisper_uses_silero(*, vad_gate: bool) -> bool:
+    # Parallel transcriptions run in chunks cut at Silero's silences, so they
+    # need it even when the speech was already cut
+    return vad_gate or whisper_parallel["workers"] > 1
+
+
+def whisper_transcribe_to_srt(
+    *,
+    input_file: Path,
+    output_file: Path,
+    vad_gate: bool = False,
+    dry_run: bool = False,
+) -> Path:
+    # faster-whisper only loads for runs that transcribe
+    from aivideocut.transcribe import transcribe_to_srt
+    from aivideocut.vad import set_silero_threads
+
+    speech_timestamps: SpeechTimestamps | None = None
+    workers = whisper_parallel["workers"]
+
+    if whisper_uses_silero(vad_gate=vad_gate) and not dry_run:
+        with stage_slot("vad") as threads:
+            set_silero_threads(threads or silero_torch_threads)
+            speech_timestamps = run_model_job(
+                "speech_timestamps", input_file, **silero_vad
+            )
+
+    with stage_slot("transcribe") as threads:
+        return transcribe_to_srt(
+            input_file=input_file,
+            output_file=output_file,
+            speech_timestamps=speech_timestamps,
+            cpu_threads=max(1, threads // workers) if threads else None,
+            workers=workers,
+            dry_run=dry_run,
+        )
+
+
+def render_edit_timeline(
+    *,
+    input_file: Path,
+    output_file: Path,
+    timeline_file: Path,
+    cut_audio_silences: bool = True,
+    cut_speech_silences: bool = True,
+    stream_vad: bool = False,
+    parallel_vad: bool = False,
+    dry_run: bool = False,
+) -> Path:
+    rprint("🎞️ Edit timeline from:", input_file, "\n\n")
+
+    if dry_run:
+        return output_file
+
+    if stream_vad:
+        from aivideocut.vad import set_silero_threads
+
+        with stage_slot("vad") as threads:
+            set_silero_threads(threads or silero_torch_threads)
+            timeline_layers = get_streaming_edit_timeline_layers(
+                input_file,
+                cut_audio_silences=cut_audio_silences,
+                cut_speech_silences=cut_speech_silences,
+            )
+    else:
+        timeline_layers = get_edit_timeline_layers(
+            input_file,
+            wav_file=output_file.with_name("03_SILERO.wav"),
+            cut_audio_silences=cut_audio_silences,
+            cut_speech_silences=cut_speech_silences,
+            parallel_vad=parallel_vad,
+        )
+
+    edit_timeline = compose_timeline(input_file, timeline_layers)
+    rprint(
+        "🎞️ Edit timeline:",
+        f"{len(edit_timeline.keep_intervals)} intervals,",
+        f"{get_kept_duration(edit_timeline.keep_intervals):.2f}s kept",
+        "\n\n",
+    )
+
+    # Every cut stage is now a layer of the same timeline, so the master is
+    # rendered once and no cut works from an already cut (lossy) intermediate.
+    smartcut_cut_by_second_timestamps(
+        input_path=input_file,
+        output_path=output_file,
+        speech_timestamps=edit_timeline.keep_intervals,
+        dry_run=dry_run,
+    )
+
+    # Written after the render, so a timeline newer than the output is the
+    # one it was rendered from (see `aivideocut.remap`)
+    write_timeline_json(edit_timeline, timeline_file)
+    rprint("🎞️ Edit timeline saved to:", timeline_file, "\n\n")
+    return output_file
+
+
+def get_edit_timeline_layers(
+    input_file: Path,
+    *,
+    wav_file: Path,
+    cut_audio_silences: bool,
+    cut_speech_silences: bool,
+    parallel_vad: bool,
+) -> dict[str, SpeechTimestamps]:
+    # The same Silero run as the speech cut stage without `stream_vad`: on a
+    # 16kHz wav written by ffmpeg, in parallel windows with `parallel_vad`.
+    timeline_layers: dict[str, SpeechTimestamps] = {}
+
+    if cut_audio_silences:
+        timeline_layers["audio_silence"] = native_detect_audio_silences(
+            input_file=input_file
+        )
+
+    if cut_speech_silences:
+        timeline_layers["speech"], _ = silero_get_speech_pauses(
+            input_file=input_file, output_file=wav_file, parallel=parallel_vad
+        )
+
+    return timeline_layers
+
+
+def get_streaming_edit_timeline_layers(
+    input_file: Path, *, cut_audio_silences: bool, cut_speech_silences: bool
+) -> dict[str, SpeechTimestamps]:
+    # Silero's VADIterator on the decoded frames. With both layers a single
+    # decode feeds the audio levels and Silero.
+    if cut_audio_silences and cut_speech_silences:
+        loud_intervals, speech_timestamps = run_model_job(
+            "loud_and_speech_intervals",
+            input_file,
+            audio_silence_options=audio_silence,
+            silero_vad_options=silero_vad,
+        )
+        return {
+            "audio_silence": loud_intervals,
+            "speech": adjust_silero_speech_timestamps(speech_timestamps),
+        }
+
+    if cut_audio_silences:
+        return {"audio_silence": detect_loud_intervals(input_file, **audio_silence)}
+
+    speech_timestamps = run_model_job("speech_timestamps", input_file, **silero_vad)
+    return {"speech": adjust_silero_speech_timestamps(speech_timestamps)}
+
+
 def silero_get_speech_pauses(
-    *, input_file: Path, output_file: Path, dry_run: bool = False
+    *,
+    input_file: Path,
+    output_file: Path,
+    streaming: bool = False,
+    parallel: bool = False,
+    dry_run: bool = False,
 ) -> tuple[SpeechTimestamps, Path]:
+    # torch and Silero only load for runs that cut speech silences
+    from aivideocut.vad import SILERO_WAV_ARGS, get_silero_model, set_silero_threads
+
+    if streaming:
+        rprint("🌊 SILERO VAD streaming from:", input_file, "\n\n")
+
+        if dry_run:
+            return [], output_file
+
+        with stage_slot("vad") as threads:
+            set_silero_threads(threads or silero_torch_threads)
+
+            silero_speech_timestamps = run_model_job(
+                "speech_timestamps", input_file, **silero_vad
+            )
+
+        return adjust_silero_speech_timestamps(silero_speech_timestamps), output_file
+
     ffmpeg_input_to_wav = [
         *get_ffmpeg_cmd(),
         "-i",
         input_file,
+        *(SILERO_WAV_ARGS if parallel else []),
         output_file,
         "-y",
     ]
@@ -232,32 +590,118 @@ def silero_get_speech_pauses(
         return [], output_file
 
     rprint(join(ffmpeg_input_to_wav), "\n\n")
-    run(ffmpeg_input_to_wav)
-
-    silero_model = load_silero_vad()
-    audio_data = read_audio(str(output_file))
-    silero_speech_timestamps = get_speech_timestamps(
-        audio_data,
-        silero_model,
-        threshold=0.5,
-        sampling_rate=16000,
-        min_speech_duration_ms=100,  # old 150
-        max_speech_duration_s=float("inf"),
-        min_silence_duration_ms=50,  # old 100
-        speech_pad_ms=30,
-        return_seconds=True,
+    with stage_slot("analysis") as threads:
+        run(add_ffmpeg_threads(ffmpeg_input_to_wav, threads), check=True)
+
+    with stage_slot("vad") as threads:
+        if parallel:
+            silero_speech_timestamps = silero_get_parallel_speech_timestamps(
+                output_file, workers=threads
+            )
+        else:
+            from silero_vad import get_speech_timestamps, read_audio
+
+            set_silero_threads(threads or silero_torch_threads)
+
+            silero_model = get_silero_model()
+            audio_data = read_audio(str(output_file))
+            silero_speech_timestamps = get_speech_timestamps(
+                audio_data,
+                silero_model,
+                sampling_rate=16000,
+                max_speech_duration_s=float("inf"),
+                return_seconds=True,
+                **silero_vad,
+            )
+
+    return adjust_silero_speech_timestamps(silero_speech_timestamps), output_file
+
+
+def silero_get_parallel_speech_timestamps(
+    wav_file: Path, *, workers: int | None = None
+) -> SpeechTimestamps:
+    # In a pool, the vad slot's threads become worker processes (one torch
+    # thread each). Sequential runs spread the windows over every core.
+    workers = workers or silero_parallel["workers"] or os.cpu_count() or 1
+    rprint(f"🧩 SILERO VAD in {workers} parallel workers:", wav_file, "\n\n")
+
+    from aivideocut.vad import get_parallel_speech_timestamps
+
+    return get_parallel_speech_timestamps(
+        wav_file,
+        workers=workers,
+        window_secs=silero_parallel["window_secs"],
+        overlap_secs=silero_parallel["overlap_secs"],
+        **silero_vad,
     )
+
+
+def silero_speech_probabilities(
+    *, input_file: Path, output_file: Path, dry_run: bool = False
+) -> Path:
+    rprint("📈 SILERO VAD probabilities from:", input_file, "\n\n")
+
+    if dry_run:
+        return output_file
+
+    from aivideocut.vad import set_silero_threads
+
+    with stage_slot("vad") as threads:
+        set_silero_threads(threads or silero_torch_threads)
+        speech_probabilities = run_model_job("speech_probabilities", input_file)
+
+    save_speech_probabilities(speech_probabilities, output_file)
+    return output_file
+
+
+def silero_get_speech_pauses_from_probabilities(
+    *,
+    input_file: Path,
+    output_file: Path,
+    use_cache: bool = True,
+    dry_run: bool = False,
+) -> SpeechTimestamps:
+    # The probabilities stage is keyed on the input and model only, so
+    # retuning silero_vad/silero_adjust never runs the model again.
+    run_cached_stage(
+        partial(
+            silero_speech_probabilities,
+            input_file=input_file,
+            output_file=output_file,
+            dry_run=dry_run,
+        ),
+        stage="silero_probabilities",
+        input_file=input_file,
+        output_file=output_file,
+        params={
+            "sampling_rate": SILERO_SAMPLING_RATE,
+            "window_samples": SILERO_WINDOW_SAMPLES,
+        },
+        tool_versions=[
+            get_package_version("silero-vad"),
+            get_package_version("torch"),
+            get_package_version("av"),
+        ],
+        use_cache=use_cache,
+        dry_run=dry_run,
+    )
+
+    if dry_run:
+        return []
+
+    silero_speech_timestamps = get_speech_timestamps_from_probabilities(
+        load_speech_probabilities(output_file), **silero_vad
+    )
+    return adjust_silero_speech_timestamps(silero_speech_timestamps)
+
+
+def adjust_silero_speech_timestamps(
+    silero_speech_timestamps: SpeechTimestamps,
+) -> SpeechTimestamps:
     rprint("🤖 SILERO VAD Output:", silero_speech_timestamps, "\n\n")
 
     proccessed_silero_timestamps = ajust_vad_speech_timestamps(
-        silero_speech_timestamps,
-        # OLD
-        # min_speech_length_secs=0.5,
-        # pad_start_secs=0.03,
-        # pad_end_secs=0.04,
-        min_speech_length_secs=0.2,
-        pad_start_secs=0.01,
-        pad_end_secs=0.01,
+        silero_speech_timestamps, **silero_adjust
     )
     rprint(
         "⏳ Processed timestamps with ajust_vad_speech_timestamps:",
@@ -265,7 +709,7 @@ def silero_get_speech_pauses(
         "\n\n",
     )
 
-    return proccessed_silero_timestamps, output_file
+    return proccessed_silero_timestamps
 
 
 def smartcut_cut_by_second_timestamps(
@@ -275,16 +719,26 @@ def smartcut_cut_by_second_timestamps(
     speech_timestamps: SpeechTimestamps,
     dry_run: bool = False,
 ) -> Path:
-    smartcut_seconds_to_keep = ",".join(
-        [f"{t['start']},{t['end']}" for t in speech_timestamps]
-    )
     if dry_run:
         return output_path
 
-    rprint("⏱️ Smartcut timestamps:", smartcut_seconds_to_keep, "\n\n")
+    # smartcut (and its av/numpy/tqdm stack) only loads when a cut is made
+    import av
+    from smartcut.__main__ import Progress
+    from smartcut.cut_video import (
+        MediaContainer,
+        VideoExportMode,
+        VideoExportQuality,
+        VideoSettings,
+        smart_cut,
+    )
+    from smartcut.misc_data import AudioExportInfo, AudioExportSettings
+
+    speech_segments = SpeechSegments.from_timestamps(speech_timestamps)
+    rprint("⏱️ Smartcut segments:", speech_segments, "\n\n")
 
     smartcut_media_source = MediaContainer(input_path)
-    smartcut_segments = parse_time_segments(smartcut_seconds_to_keep)
+    smartcut_segments = speech_segments.to_smartcut_segments()
 
     # Default audio settings: no mix, include all tracks with lossless passthru
     smartcut_audio_settings = [AudioExportSettings(codec="passthru")] * len(
@@ -303,15 +757,16 @@ def smartcut_cut_by_second_timestamps(
     smartcut_log_level = "info"
     av.logging.set_level(av.logging.INFO)  # pyright: ignore
 
-    smartcut_exception_value = smart_cut(
-        smartcut_media_source,
-        smartcut_segments,
-        str(output_path),
-        audio_export_info=smartcut_export_info,
-        video_settings=smartcut_video_settings,
-        progress=smartcut_progress,
-        log_level=smartcut_log_level,
-    )
+    with stage_slot("encode"):
+        smartcut_exception_value = smart_cut(
+            smartcut_media_source,
+            smartcut_segments,
+            str(output_path),
+            audio_export_info=smartcut_export_info,
+            video_settings=smartcut_video_settings,
+            progress=smartcut_progress,
+            log_level=smartcut_log_level,
+        )
 
     smartcut_progress.tqdm.close()  # pyright: ignore
 
@@ -373,6 +828,254 @@ def create_in_out_paths(
     )
 
 
+def get_output_dir(input_path: Path) -> Path:
+    return input_path.parent / f"{input_path.stem}_{input_path.suffix[1:]}"
+
+
+def collect_input_files(input_path: Path) -> list[Path]:
+    files = list(input_path.rglob("**/*.*"))
+    output_dirs = {get_output_dir(file) for file in files}
+    input_files = []
+
+    for file in files:
+        if file.parent in output_dirs:
+            rprint("🙅 File skipped (PROCESSED):", file)
+            continue
+
+        if file.suffix not in ALLOWED_EXTENSIONS:
+            rprint("🤷‍♀️ File skipped:", file)
+            continue
+
+        input_files.append(file)
+
+    return input_files
+
+
+def run_cached_stage(
+    stage_fn: Callable[[], object],
+    *,
+    stage: str,
+    input_file: Path,
+    output_file: Path,
+    params: dict[str, object],
+    tool_versions: list[str],
+    use_cache: bool = True,
+    dry_run: bool = False,
+) -> None:
+    if dry_run or not use_cache:
+        stage_fn()
+        return
+
+    stage_key = get_stage_key(
+        stage=stage,
+        input_file=input_file,
+        params=params,
+        tool_versions=tool_versions,
+    )
+
+    if is_stage_cached(output_file, stage_key):
+        rprint(f"♻️ Stage {stage} cached, skipping:", output_file, "\n\n")
+        return
+
+    # The old key goes before the stage runs: a failed or killed stage must
+    # not leave it next to a partial output. A stage that wrote nothing (a
+    # failed measurement) must not stamp an output left by an earlier run.
+    clear_stage_key(output_file)
+    output_mtime_ns = get_output_mtime_ns(output_file)
+
+    stage_fn()
+
+    if get_output_mtime_ns(output_file) != output_mtime_ns:
+        save_stage_key(output_file, stage_key, stage=stage)
+
+
+def get_ffmpeg_version() -> str:
+    return get_command_version("ffmpeg", "-version")
+
+
+def run_master_stages(
+    *,
+    input_path: Path,
+    output_path: Path,
+    fix_codecs: bool,
+    normalize_audio: bool,
+    fuse_fix_and_normalize: bool,
+    measure_loudness_in_process: bool,
+    cache_flags: dict[str, bool],
+) -> list[Path]:
+    files_processed = []
+    current_input_path = input_path
+    current_output_path = output_path
+    fuse_fix_and_normalize = fix_codecs and normalize_audio and fuse_fix_and_normalize
+    dry_run = cache_flags["dry_run"]
+
+    if fuse_fix_and_normalize:
+        current_output_path = current_output_path.with_stem("01_NORMALIZED")
+
+        run_cached_stage(
+            partial(
+                ffmpeg_fix_codecs_and_normalize,
+                input_file=current_input_path,
+                output_file=current_output_path,
+                measure_in_process=measure_loudness_in_process,
+                dry_run=dry_run,
+                **audio_normalization,
+            ),
+            stage="fix_codecs_and_normalize",
+            input_file=current_input_path,
+            output_file=current_output_path,
+            params={
+                "measure_in_process": measure_loudness_in_process,
+                "video_encode": ffmpeg_video_encode,
+                "audio_encode": ffmpeg_audio_encode,
+                **audio_normalization,
+            },
+            tool_versions=[get_ffmpeg_version()],
+            **cache_flags,
+        )
+
+        files_processed.append(current_output_path)
+        current_input_path = current_output_path
+
+    if fix_codecs and not fuse_fix_and_normalize:
+        current_output_path = current_output_path.with_stem("00_FIX_CODECS")
+
+        run_cached_stage(
+            partial(
+                ffmpeg_fix_codecs,
+                input_file=current_input_path,
+                output_file=current_output_path,
+                dry_run=dry_run,
+            ),
+            stage="fix_codecs",
+            input_file=current_input_path,
+            output_file=current_output_path,
+            params={
+                "video_encode": ffmpeg_video_encode,
+                "audio_encode": ffmpeg_audio_encode,
+            },
+            tool_versions=[get_ffmpeg_version()],
+            **cache_flags,
+        )
+
+        files_processed.append(current_output_path)
+        current_input_path = current_output_path
+
+    if normalize_audio and not fuse_fix_and_normalize:
+        current_output_path = current_output_path.with_stem("01_NORMALIZED")
+
+        run_cached_stage(
+            partial(
+                ffmpeg_audio_normalization,
+                input_file=current_input_path,
+                output_file=current_output_path,
+                measure_in_process=measure_loudness_in_process,
+                dry_run=dry_run,
+                **audio_normalization,
+            ),
+            stage="normalize_audio",
+            input_file=current_input_path,
+            output_file=current_output_path,
+            params={
+                "measure_in_process": measure_loudness_in_process,
+                "audio_encode": ffmpeg_audio_encode,
+                **audio_normalization,
+            },
+            tool_versions=[get_ffmpeg_version()],
+            **cache_flags,
+        )
+
+        files_processed.append(current_output_path)
+        current_input_path = current_output_path
+
+    return files_processed
+
+
+def run_edit_timeline_stage(
+    *,
+    input_file: Path,
+    output_file: Path,
+    cut_audio_silences: bool,
+    cut_speech_silences: bool,
+    stream_vad: bool,
+    parallel_vad: bool,
+    cache_flags: dict[str, bool],
+) -> None:
+    run_cached_stage(
+        partial(
+            render_edit_timeline,
+            input_file=input_file,
+            output_file=output_file,
+            timeline_file=output_file.with_name("03_TIMELINE.json"),
+            cut_audio_silences=cut_audio_silences,
+            cut_speech_silences=cut_speech_silences,
+            stream_vad=stream_vad,
+            parallel_vad=parallel_vad,
+            dry_run=cache_flags["dry_run"],
+        ),
+        stage="edit_timeline",
+        input_file=input_file,
+        output_file=output_file,
+        params={
+            "cut_audio_silences": cut_audio_silences,
+            "cut_speech_silences": cut_speech_silences,
+            "audio_silence": audio_silence,
+            "silero_vad": silero_vad,
+            "silero_adjust": silero_adjust,
+            "streaming": stream_vad,
+            "parallel": parallel_vad,
+            **(silero_parallel if parallel_vad and not stream_vad else {}),
+        },
+        tool_versions=[
+            get_ffmpeg_version(),
+            get_package_version("av"),
+            get_package_version("numpy"),
+            get_package_version("silero-vad"),
+            get_package_version("torch"),
+            get_package_version("smartcut"),
+        ],
+        **cache_flags,
+    )
+
+
+def run_transcription_stage(
+    *,
+    input_file: Path,
+    output_file: Path,
+    vad_gate: bool,
+    cache_flags: dict[str, bool],
+) -> None:
+    run_cached_stage(
+        partial(
+            whisper_transcribe_to_srt,
+            input_file=input_file,
+            output_file=output_file,
+            vad_gate=vad_gate,
+            dry_run=cache_flags["dry_run"],
+        ),
+        stage="transcribe",
+        input_file=input_file,
+        output_file=output_file,
+        params={
+            "transcribe": transcribe,
+            "whisper_model_size": whisper_model_size,
+            "whisper_model_options": whisper_model_options,
+            "whisper_batch_size": whisper_batch_size,
+            "silero_vad": (
+                silero_vad if whisper_uses_silero(vad_gate=vad_gate) else None
+            ),
+            # `workers` does not change the output, the chunk size does
+            "whisper_chunk_secs": whisper_parallel["chunk_secs"],
+        },
+        tool_versions=[
+            get_package_version("faster-whisper"),
+            get_package_version("ctranslate2"),
+            get_package_version("av"),
+        ],
+        **cache_flags,
+    )
+
+
 @get_time_elapsed
 def run_single_file(
     *,
@@ -382,76 +1085,163 @@ def run_single_file(
     cut_audio_silences: bool = True,
     cut_speech_silences: bool = True,
     fix_codecs: bool = True,
+    fuse_fix_and_normalize: bool = False,
+    stream_vad: bool = False,
+    parallel_vad: bool = False,
+    vad_probabilities: bool = False,
+    measure_loudness_in_process: bool = False,
+    native_silence_cut: bool = False,
+    single_render: bool = False,
+    transcribe_srt: bool = False,
+    use_cache: bool = True,
 ) -> list[Path]:
-    files_processed = []
     in_path = input_path.resolve()
 
     if not in_path.is_file():
         raise FileNotFoundError(in_path)
 
     source_filename = in_path.name
-    source_fileext = in_path.suffix
-    source_filestem = in_path.stem
-    source_dirname = in_path.parent
-    output_dir = source_dirname / f"{source_filestem}_{source_fileext[1:]}"
+    output_dir = get_output_dir(in_path)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     current_input_path = in_path
     current_output_path = output_dir / source_filename
 
-    if fix_codecs:
-        current_output_path = current_output_path.with_stem("00_FIX_CODECS")
+    cache_flags = {"use_cache": use_cache, "dry_run": dry_run}
+    files_processed = run_master_stages(
+        input_path=current_input_path,
+        output_path=current_output_path,
+        fix_codecs=fix_codecs,
+        normalize_audio=normalize_audio,
+        fuse_fix_and_normalize=fuse_fix_and_normalize,
+        measure_loudness_in_process=measure_loudness_in_process,
+        cache_flags=cache_flags,
+    )
+    current_input_path = files_processed[-1] if files_processed else in_path
 
-        ffmpeg_fix_codecs(
+    # The native silence detection only gives intervals, the timeline renders
+    use_single_render = (
+        single_render and (cut_audio_silences or cut_speech_silences)
+    ) or (native_silence_cut and cut_audio_silences)
+    if use_single_render:
+        current_output_path = current_output_path.with_stem("04_FINAL")
+        run_edit_timeline_stage(
             input_file=current_input_path,
             output_file=current_output_path,
-            dry_run=dry_run,
+            cut_audio_silences=cut_audio_silences,
+            cut_speech_silences=cut_speech_silences,
+            stream_vad=stream_vad,
+            parallel_vad=parallel_vad,
+            cache_flags=cache_flags,
         )
 
         files_processed.append(current_output_path)
         current_input_path = current_output_path
 
-    if normalize_audio:
-        current_output_path = current_output_path.with_stem("01_NORMALIZED")
+    if cut_audio_silences and not use_single_render:
+        current_output_path = current_output_path.with_stem("02_AE_CUT")
 
-        ffmpeg_audio_normalization(
+        run_cached_stage(
+            partial(
+                auto_editor_cut_silences,
+                input_file=current_input_path,
+                output_file=current_output_path,
+                dry_run=dry_run,
+            ),
+            stage="cut_audio_silences",
             input_file=current_input_path,
             output_file=current_output_path,
-            dry_run=dry_run,
+            params={},
+            tool_versions=[get_command_version(AUTO_EDITOR_BIN, "--version")],
+            **cache_flags,
         )
 
         files_processed.append(current_output_path)
         current_input_path = current_output_path
 
-    if cut_audio_silences:
-        current_output_path = current_output_path.with_stem("02_AE_CUT")
+    if cut_speech_silences and not use_single_render:
+        current_output_path = current_output_path.with_stem("04_FINAL")
+        speech_timestamps_path = current_input_path.with_name("03_SILERO.json")
+        speech_timestamps: SpeechTimestamps = []
+
+        def run_silero_stage() -> None:
+            nonlocal speech_timestamps
+            if vad_probabilities:
+                speech_timestamps = silero_get_speech_pauses_from_probabilities(
+                    input_file=current_input_path,
+                    output_file=current_input_path.with_name("03_SILERO.probs.npy"),
+                    use_cache=use_cache,
+                    dry_run=dry_run,
+                )
+            else:
+                speech_timestamps, _ = silero_get_speech_pauses(
+                    input_file=current_input_path,
+                    output_file=current_input_path.with_name("03_SILERO.wav"),
+                    streaming=stream_vad,
+                    parallel=parallel_vad,
+                    dry_run=dry_run,
+                )
+
+            if not dry_run:
+                write_speech_timestamps(speech_timestamps, speech_timestamps_path)
+
+        run_cached_stage(
+            run_silero_stage,
+            stage="silero_vad",
+            input_file=current_input_path,
+            output_file=speech_timestamps_path,
+            params={
+                "silero_vad": silero_vad,
+                "silero_adjust": silero_adjust,
+                "streaming": stream_vad,
+                "parallel": parallel_vad,
+                **(silero_parallel if parallel_vad else {}),
+                "probabilities": vad_probabilities,
+            },
+            tool_versions=[
+                get_ffmpeg_version(),
+                get_package_version("silero-vad"),
+                get_package_version("torch"),
+                get_package_version("av"),
+            ],
+            **cache_flags,
+        )
 
-        auto_editor_cut_silences(
+        if speech_timestamps_path.is_file() and not speech_timestamps:
+            speech_timestamps = read_speech_timestamps(speech_timestamps_path)
+
+        run_cached_stage(
+            partial(
+                smartcut_cut_by_second_timestamps,
+                input_path=current_input_path,
+                output_path=current_output_path,
+                speech_timestamps=speech_timestamps,
+                dry_run=dry_run,
+            ),
+            stage="smartcut",
             input_file=current_input_path,
             output_file=current_output_path,
-            dry_run=dry_run,
+            params={"speech_timestamps": speech_timestamps},
+            tool_versions=[
+                get_package_version("smartcut"),
+                get_package_version("av"),
+            ],
+            **cache_flags,
         )
 
         files_processed.append(current_output_path)
         current_input_path = current_output_path
 
-    if cut_speech_silences:
-        current_output_path = current_output_path.with_stem("04_FINAL")
-
-        speech_timestamps, _ = silero_get_speech_pauses(
+    if transcribe_srt:
+        transcription_path = output_dir / "05_TRANSCRIPTION.srt"
+        # A speech cut left nothing but speech, gating it again is wasted work
+        run_transcription_stage(
             input_file=current_input_path,
-            output_file=current_input_path.with_name("03_SILERO.wav"),
-            dry_run=dry_run,
-        )
-        smartcut_cut_by_second_timestamps(
-            input_path=current_input_path,
-            output_path=current_output_path,
-            speech_timestamps=speech_timestamps,
-            dry_run=dry_run,
+            output_file=transcription_path,
+            vad_gate=whisper_vad_gate and not cut_speech_silences,
+            cache_flags=cache_flags,
         )
-
-        files_processed.append(current_output_path)
-        current_input_path = current_output_path
+        files_processed.append(transcription_path)
 
     return files_processed
 
@@ -465,35 +1255,73 @@ def run_many_files(
     cut_audio_silences: bool = True,
     cut_speech_silences: bool = True,
     fix_codecs: bool = True,
-) -> None:
+    fuse_fix_and_normalize: bool = False,
+    stream_vad: bool = False,
+    parallel_vad: bool = False,
+    vad_probabilities: bool = False,
+    measure_loudness_in_process: bool = False,
+    native_silence_cut: bool = False,
+    single_render: bool = False,
+    transcribe_srt: bool = False,
+    use_cache: bool = True,
+    workers: int = 1,
+) -> list[FileResult]:
     in_path = input_path.resolve()
-    allowed_extensions = [".mp4", ".mov", ".mkv"]
-    files_processed = []
 
     if not in_path.is_dir():
         raise NotADirectoryError(input_path)
 
-    files = list(in_path.rglob("**/*.*"))
-    for file in files:
-        file_ext = file.suffix
-
-        if file in files_processed:
-            rprint("🙅 File skipped (PROCESSED):", file)
+    files = collect_input_files(in_path)
+    stage_flags = {
+        "fix_codecs": fix_codecs,
+        "normalize_audio": normalize_audio,
+        "cut_audio_silences": cut_audio_silences,
+        "cut_speech_silences": cut_speech_silences,
+        "fuse_fix_and_normalize": fuse_fix_and_normalize,
+        "stream_vad": stream_vad,
+        "parallel_vad": parallel_vad,
+        "vad_probabilities": vad_probabilities,
+        "measure_loudness_in_process": measure_loudness_in_process,
+        "native_silence_cut": native_silence_cut,
+        "single_render": single_render,
+        "transcribe_srt": transcribe_srt,
+        "use_cache": use_cache,
+        "dry_run": dry_run,
+    }
+
+    if workers > 1:
+        initializer = None
+        if cut_speech_silences:
+            from aivideocut.vad import warm_up_silero_model
+
+            initializer = warm_up_silero_model
+
+        rprint(f"🏭 Processing {len(files)} files with {workers} workers", "\n\n")
+        results = run_files_in_pool(
+            run_single_file,
+            files,
+            workers=workers,
+            initializer=initializer,
+            **stage_flags,
+        )
+    else:
+        results = []
+        for file in files:
+            rprint("📋 FILE", file)
+            start_time = time.perf_counter()
+            files_processed = run_single_file(input_path=file, **stage_flags)
+            elapsed_secs = time.perf_counter() - start_time
+            results.append(FileResult(file, files_processed, elapsed_secs))
+
+    for result in results:
+        if result.error is not None:
+            rprint(f"🔴 {result.in_file}: {result.error}")
             continue
 
-        if file_ext not in allowed_extensions:
-            rprint("🤷‍♀️ File skipped:", file)
-            continue
+        minutes, seconds = divmod(result.elapsed_secs, 60)
+        rprint(f"✅ {result.in_file}: {int(minutes)}min {seconds:.2f}s")
 
-        rprint("📋 FILE", file)
-        files_processed += run_single_file(
-            input_path=file,
-            fix_codecs=fix_codecs,
-            normalize_audio=normalize_audio,
-            cut_audio_silences=cut_audio_silences,
-            cut_speech_silences=cut_speech_silences,
-            dry_run=dry_run,
-        )
+    return results
 
 
 if __name__ == "__main__":
@@ -505,6 +1333,7 @@ if __name__ == "__main__":
         cut_audio_silences=True,
         cut_speech_silences=True,
         dry_run=False,
+        workers=1,
     )
 
     # input_path = Path("/users/luizotavio/desktop/videos/smaller.mp4")
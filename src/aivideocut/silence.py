@@ -0,0 +1,206 @@
+# pyright: basic
+from collections.abc import Iterable
+from fractions import Fraction
+from pathlib import Path
+from typing import Any, Literal, TypeAlias
+
+import av
+import numpy as np
+
+from aivideocut.audio import iter_audio_frames, probe_audio
+from aivideocut.segments import SpeechTimestamps
+
+DEFAULT_TIMEBASE = Fraction(30)
+
+AudioLevelMethod: TypeAlias = Literal["peak", "rms"]
+AddInRange: TypeAlias = tuple[float, float | None]
+
+
+class AudioLevels:
+    # Per video frame audio level, the unit auto-editor thresholds work on.
+    # Frames map to samples with a fractional step (44100 / 29.97...), so frame
+    # `i` covers samples [floor(i * step), floor((i + 1) * step)).
+    def __init__(
+        self,
+        sampling_rate: int,
+        timebase: Fraction,
+        *,
+        method: AudioLevelMethod = "peak",
+    ) -> None:
+        self.timebase = timebase
+        self.samples_per_frame = Fraction(sampling_rate) / timebase
+        self.method = method
+        self.next_frame = 0
+        self.pending_start = 0
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.levels: list[np.ndarray] = []
+
+    def feed(self, samples: np.ndarray) -> None:
+        # `stream=all`: the loudest channel decides
+        self.pending = np.concatenate((self.pending, np.abs(samples).max(0)))
+        pending_end = self.pending_start + self.pending.shape[0]
+
+        last_frame = int(pending_end / self.samples_per_frame)
+        if last_frame <= self.next_frame:
+            return
+
+        frame_indexes = np.arange(self.next_frame, last_frame + 1, dtype=np.int64)
+        frame_bounds = (
+            frame_indexes * self.samples_per_frame.numerator
+        ) // self.samples_per_frame.denominator - self.pending_start
+        frame_samples = self.pending[: frame_bounds[-1]]
+
+        if self.method == "rms":
+            squared_sums = np.add.reduceat(frame_samples**2, frame_bounds[:-1])
+            frame_levels = np.sqrt(squared_sums / np.diff(frame_bounds))
+        else:
+            frame_levels = np.maximum.reduceat(frame_samples, frame_bounds[:-1])
+
+        self.levels.append(frame_levels)
+        self.pending = self.pending[frame_bounds[-1] :]
+        self.pending_start += int(frame_bounds[-1])
+        self.next_frame = last_frame
+
+    def result(self) -> np.ndarray:
+        # The audio rarely ends on a frame boundary, its last frame is short
+        if self.pending.size:
+            if self.method == "rms":
+                trailing_level = np.sqrt(np.mean(self.pending**2))
+            else:
+                trailing_level = self.pending.max()
+
+            self.levels.append(np.array([trailing_level]))
+            self.pending_start += self.pending.shape[0]
+            self.pending = np.zeros(0, dtype=np.float32)
+            self.next_frame += 1
+
+        levels = np.concatenate(self.levels) if self.levels else np.zeros(0)
+        max_level = levels.max(initial=0.0)
+
+        # Levels are relative to the loudest frame, like auto-editor's
+        return levels / max_level if max_level > 0 else levels
+
+
+def remove_small_runs(mask: np.ndarray, min_length: int, *, value: bool) -> np.ndarray:
+    # Flips every run of `value` shorter than `min_length` frames
+    if min_length <= 1 or mask.size == 0:
+        return mask
+
+    padded = np.concatenate(([False], mask == value, [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    run_starts, run_ends = edges[::2], edges[1::2]
+    is_small_run = run_ends - run_starts < min_length
+
+    flip_marks = np.zeros(mask.size + 1, dtype=np.int64)
+    np.add.at(flip_marks, run_starts[is_small_run], 1)
+    np.add.at(flip_marks, run_ends[is_small_run], -1)
+    flip = np.cumsum(flip_marks[:-1]) > 0
+
+    return np.where(flip, not value, mask)
+
+
+def apply_margin(mask: np.ndarray, before: int, after: int) -> np.ndarray:
+    # Grows every loud run `before` frames to the left and `after` to the right
+    loud_counts = np.concatenate(([0], np.cumsum(mask)))
+    frame_indexes = np.arange(mask.size)
+    window_starts = np.clip(frame_indexes - after, 0, mask.size)
+    window_ends = np.clip(frame_indexes + before + 1, 0, mask.size)
+    return loud_counts[window_ends] - loud_counts[window_starts] > 0
+
+
+def apply_add_in(
+    mask: np.ndarray, add_in: Iterable[AddInRange], timebase: Fraction
+) -> np.ndarray:
+    # Negative values count from the end, None means the end of the file
+    result = mask.copy()
+
+    for start_secs, end_secs in add_in:
+        start = round(start_secs * timebase)
+        end = mask.size if end_secs is None else round(end_secs * timebase)
+        result[slice(start, end)] = True
+
+    return result
+
+
+def mask_to_intervals(mask: np.ndarray, timebase: Fraction) -> SpeechTimestamps:
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+
+    return [
+        {"start": float(start / timebase), "end": float(end / timebase)}
+        for start, end in zip(edges[::2].tolist(), edges[1::2].tolist(), strict=True)
+    ]
+
+
+def get_video_timebase(input_file: Path) -> Fraction:
+    with av.open(str(input_file)) as container:
+        if not container.streams.video:
+            return DEFAULT_TIMEBASE
+
+        average_rate = container.streams.video[0].average_rate
+        return Fraction(average_rate) if average_rate else DEFAULT_TIMEBASE
+
+
+def get_loud_mask(
+    levels: np.ndarray,
+    timebase: Fraction,
+    *,
+    threshold: float = 0.04,
+    mincut: int = 30,
+    minclip: int = 3,
+    margin_secs: tuple[float, float] = (0.2, 0.3),
+    add_in_secs: Iterable[AddInRange] = ((0, 2), (-2, None)),
+) -> np.ndarray:
+    # Same order auto-editor applies them: threshold, drop loud blips shorter
+    # than minclip, keep silences shorter than mincut, margin, then add-in.
+    loud_mask = levels >= threshold
+    loud_mask = remove_small_runs(loud_mask, minclip, value=True)
+    loud_mask = remove_small_runs(loud_mask, mincut, value=False)
+
+    margin_before, margin_after = (round(m * timebase) for m in margin_secs)
+    loud_mask = apply_margin(loud_mask, margin_before, margin_after)
+
+    return apply_add_in(loud_mask, add_in_secs, timebase)
+
+
+def get_loud_intervals(
+    levels: np.ndarray,
+    timebase: Fraction,
+    *,
+    threshold: float = 0.04,
+    mincut: int = 30,
+    minclip: int = 3,
+    margin_secs: tuple[float, float] = (0.2, 0.3),
+    add_in_secs: Iterable[AddInRange] = ((0, 2), (-2, None)),
+) -> SpeechTimestamps:
+    loud_mask = get_loud_mask(
+        levels,
+        timebase,
+        threshold=threshold,
+        mincut=mincut,
+        minclip=minclip,
+        margin_secs=margin_secs,
+        add_in_secs=add_in_secs,
+    )
+    return mask_to_intervals(loud_mask, timebase)
+
+
+def get_audio_levels(input_file: Path, method: AudioLevelMethod) -> AudioLevels:
+    sampling_rate, _ = probe_audio(input_file)
+    return AudioLevels(sampling_rate, get_video_timebase(input_file), method=method)
+
+
+def detect_loud_intervals(
+    input_file: Path,
+    *,
+    method: AudioLevelMethod = "peak",
+    **loud_options: Any,  # noqa: ANN401
+) -> SpeechTimestamps:
+    audio_levels = get_audio_levels(input_file, method)
+
+    for samples in iter_audio_frames(input_file):
+        audio_levels.feed(samples)
+
+    return get_loud_intervals(
+        audio_levels.result(), audio_levels.timebase, **loud_options
+    )
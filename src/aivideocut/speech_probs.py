@@ -0,0 +1,208 @@
+# pyright: basic
+import itertools
+import os
+import sys
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from aivideocut.configs import silero_adjust, silero_sweep, silero_vad
+from aivideocut.segments import (
+    SpeechSegments,
+    SpeechTimestamps,
+    adjust_speech_segments,
+)
+
+# Must match aivideocut.vad, duplicated so this module (and the sweep workers)
+# never import torch.
+SILERO_SAMPLING_RATE = 16000
+SILERO_WINDOW_SAMPLES = 512
+
+SILERO_ADJUST_KEYS = frozenset(silero_adjust)
+
+
+class VadSweepResult(NamedTuple):
+    params: dict[str, Any]
+    kept_secs: float
+    cuts: int
+
+
+def save_speech_probabilities(speech_probabilities: np.ndarray, path: Path) -> None:
+    # float16 keeps ~3 decimal digits, more than any threshold we tune with,
+    # and a 3h file is under 1MB.
+    np.save(path, speech_probabilities.astype(np.float16))
+
+
+def load_speech_probabilities(path: Path) -> np.ndarray:
+    return np.load(path, mmap_mode="r")
+
+
+def get_state_runs(state: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    padded = np.concatenate(([False], state, [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    return edges[::2], edges[1::2]
+
+
+def get_speech_timestamps_from_probabilities(
+    speech_probabilities: np.ndarray,
+    *,
+    threshold: float = 0.5,
+    min_speech_duration_ms: int = 250,
+    min_silence_duration_ms: int = 100,
+    speech_pad_ms: int = 30,
+    neg_threshold: float | None = None,
+) -> SpeechTimestamps:
+    # Vectorized `silero_vad.get_speech_timestamps` (max_speech_duration_s=inf,
+    # return_seconds=True) over already computed window probabilities.
+    probabilities = np.asarray(speech_probabilities, dtype=np.float32)
+    if neg_threshold is None:
+        neg_threshold = max(threshold - 0.15, 0.01)
+
+    audio_length = probabilities.size * SILERO_WINDOW_SAMPLES
+    min_speech_samples = SILERO_SAMPLING_RATE * min_speech_duration_ms / 1000
+    min_silence_samples = SILERO_SAMPLING_RATE * min_silence_duration_ms / 1000
+    speech_pad_samples = SILERO_SAMPLING_RATE * speech_pad_ms / 1000
+
+    # Hysteresis: speech starts at >= threshold and only stops below
+    # neg_threshold, anything in between keeps the previous state.
+    window_indexes = np.arange(probabilities.size)
+    is_decisive = (probabilities >= threshold) | (probabilities < neg_threshold)
+    last_decisive = np.maximum.accumulate(np.where(is_decisive, window_indexes, -1))
+    speaking = (last_decisive >= 0) & (
+        probabilities[np.maximum(last_decisive, 0)] >= threshold
+    )
+
+    # A silence ends the segment once some window below neg_threshold lies
+    # min_silence samples after its start, the last such window decides.
+    silence_starts, silence_ends = get_state_runs(~speaking)
+    last_negative = np.maximum.accumulate(
+        np.where(probabilities < neg_threshold, window_indexes, -1)
+    )
+    silence_lengths = (
+        last_negative[np.maximum(silence_ends - 1, 0)] - silence_starts
+    ) * SILERO_WINDOW_SAMPLES
+    # Leading silence is not inside a segment. A short trailing one is, and
+    # the last segment then runs to the end of the audio.
+    is_short_silence = (silence_lengths < min_silence_samples) & (silence_starts > 0)
+
+    fill_marks = np.zeros(probabilities.size + 1, dtype=np.int64)
+    np.add.at(fill_marks, silence_starts[is_short_silence], 1)
+    np.add.at(fill_marks, silence_ends[is_short_silence], -1)
+    speaking |= np.cumsum(fill_marks[:-1]) > 0
+
+    speech_starts, speech_ends = get_state_runs(speaking)
+    starts = speech_starts * SILERO_WINDOW_SAMPLES
+    ends = speech_ends * SILERO_WINDOW_SAMPLES
+
+    is_long_speech = ends - starts > min_speech_samples
+    starts, ends = starts[is_long_speech], ends[is_long_speech]
+
+    if starts.size == 0:
+        return []
+
+    # Padding: gaps shorter than two pads are split in the middle
+    silence_durations = starts[1:] - ends[:-1]
+    pad_shifts = np.where(
+        silence_durations < 2 * speech_pad_samples,
+        silence_durations // 2,
+        speech_pad_samples,
+    )
+    starts, ends = starts.astype(np.float64), ends.astype(np.float64)
+    ends[:-1] += pad_shifts
+    starts[1:] -= pad_shifts
+    starts[0] = max(0, starts[0] - speech_pad_samples)
+    ends[-1] = min(audio_length, ends[-1] + speech_pad_samples)
+
+    # Python's round, not np.round: 0.45 has to become 0.5 like in silero
+    starts = (np.floor(starts) / SILERO_SAMPLING_RATE).tolist()
+    ends = (np.floor(ends) / SILERO_SAMPLING_RATE).tolist()
+    return [
+        {"start": round(start, 1), "end": round(end, 1)}
+        for start, end in zip(starts, ends, strict=True)
+    ]
+
+
+def get_adjusted_speech_segments(
+    speech_probabilities: np.ndarray, params: Mapping[str, Any]
+) -> SpeechSegments:
+    # `params` mixes silero_vad and silero_adjust keys, like a sweep entry
+    vad_params = {k: v for k, v in params.items() if k not in SILERO_ADJUST_KEYS}
+    adjust_params = {k: v for k, v in params.items() if k in SILERO_ADJUST_KEYS}
+
+    speech_timestamps = get_speech_timestamps_from_probabilities(
+        speech_probabilities, **vad_params
+    )
+    return adjust_speech_segments(
+        SpeechSegments.from_timestamps(speech_timestamps), **adjust_params
+    )
+
+
+def get_parameter_grid(
+    parameter_values: Mapping[str, Iterable[Any]],
+    *,
+    base_params: Mapping[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    base_params = base_params or {}
+    keys = list(parameter_values)
+
+    return [
+        {**base_params, **dict(zip(keys, values, strict=True))}
+        for values in itertools.product(*parameter_values.values())
+    ]
+
+
+def evaluate_vad_parameters(
+    probabilities_path: Path, params: dict[str, Any]
+) -> VadSweepResult:
+    speech_probabilities = load_speech_probabilities(probabilities_path)
+    segments = get_adjusted_speech_segments(speech_probabilities, params)
+
+    duration = speech_probabilities.size * SILERO_WINDOW_SAMPLES / SILERO_SAMPLING_RATE
+    cuts = max(0, len(segments) - 1)
+    if len(segments) and segments.starts[0] > 0:
+        cuts += 1
+    if len(segments) and segments.ends[-1] < duration:
+        cuts += 1
+
+    return VadSweepResult(params, segments.get_duration(), cuts)
+
+
+def sweep_vad_parameters(
+    probabilities_path: Path,
+    parameter_sets: list[dict[str, Any]],
+    *,
+    workers: int | None = None,
+) -> list[VadSweepResult]:
+    # Only numpy runs here, the model never loads. Results keep the order of
+    # `parameter_sets`.
+    workers = max(1, min(workers or os.cpu_count() or 1, len(parameter_sets)))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                evaluate_vad_parameters,
+                [probabilities_path] * len(parameter_sets),
+                parameter_sets,
+            )
+        )
+
+
+def print_vad_sweep(results: list[VadSweepResult]) -> None:
+    for result in results:
+        minutes, seconds = divmod(result.kept_secs, 60)
+        print(
+            f"🎚️ {int(minutes)}min {seconds:05.2f}s kept,",
+            f"{result.cuts:>5} cuts:",
+            result.params,
+        )
+
+
+if __name__ == "__main__":
+    # python -m aivideocut.speech_probs path/to/03_SILERO.probs.npy
+    parameter_sets = get_parameter_grid(
+        silero_sweep, base_params={**silero_vad, **silero_adjust}
+    )
+    print_vad_sweep(sweep_vad_parameters(Path(sys.argv[1]), parameter_sets))
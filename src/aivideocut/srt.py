@@ -0,0 +1,122 @@
+# pyright: basic
+import mmap
+from collections.abc import Generator, Iterable, Mapping
+from pathlib import Path
+from typing import NamedTuple
+
+from aivideocut.configs import CUE_TEXT_LINE_RE, SRT_CUE_RE
+
+
+class SRTCue(NamedTuple):
+    index: int
+    start_ms: int
+    end_ms: int
+    text: str
+
+
+def parse_srt_time_ms(
+    hours: bytes, minutes: bytes, seconds: bytes, millis: bytes
+) -> int:
+    return ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(millis)
+
+
+def parse_srt(srt: str | bytes | mmap.mmap) -> Generator[SRTCue]:
+    # A single regex pass, only the text of each cue is decoded. Cues without
+    # an index line get their position. \r\n and stray spaces around lines
+    # are dropped from the text.
+    srt_bytes = srt.encode() if isinstance(srt, str) else srt
+
+    for position, match in enumerate(SRT_CUE_RE.finditer(srt_bytes), start=1):
+        index, *times, text = match.groups()
+        yield SRTCue(
+            int(index) if index else position,
+            parse_srt_time_ms(*times[:4]),
+            parse_srt_time_ms(*times[4:]),
+            "\n".join(line.strip() for line in text.decode().strip().splitlines()),
+        )
+
+
+def read_srt_file(path: Path) -> list[SRTCue]:
+    # Mapped, not read: the regex runs on the page cache and a long SRT
+    # never exists as one big str.
+    with path.open("rb") as f:
+        if path.stat().st_size == 0:
+            return []
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as srt_map:
+            return list(parse_srt(srt_map))
+
+
+def format_srt_time(ms: int) -> str:
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+
+
+def format_srt_cue(cue: SRTCue) -> str:
+    text = cue.text.strip().replace("-->", "->")
+    start, end = format_srt_time(cue.start_ms), format_srt_time(cue.end_ms)
+    return f"{cue.index}\n{start} --> {end}\n{text}"
+
+
+def cues_to_srt(cues: Iterable[SRTCue]) -> str:
+    # Same layout as whisper's WriteSRT (`SRTStringWriter`)
+    return "\n\n".join(map(format_srt_cue, cues))
+
+
+def format_cue_text_lines(cues: Iterable[SRTCue]) -> list[str]:
+    # `position: text` per cue, the cue's lines joined by spaces
+    return [
+        f"{position}: {' '.join(cue.text.split())}"
+        for position, cue in enumerate(cues, start=1)
+    ]
+
+
+def parse_cue_text_lines(text: str) -> dict[int, str]:
+    # Lines without a number (code fences, notes) are ignored, the first
+    # line of a repeated number wins.
+    cue_texts: dict[int, str] = {}
+
+    for match in CUE_TEXT_LINE_RE.finditer(text):
+        cue_texts.setdefault(int(match.group(1)), match.group(2))
+
+    return cue_texts
+
+
+def split_text_into_lines(text: str, line_count: int) -> str:
+    # At the spaces closest to `line_count` equal parts
+    text = " ".join(text.split())
+    space_positions = [i for i, char in enumerate(text) if char == " "]
+    line_starts = [0]
+
+    for line in range(1, line_count):
+        target = len(text) * line / line_count
+        candidates = [i for i in space_positions if i >= line_starts[-1]]
+        if not candidates:
+            break
+
+        line_end = min(candidates, key=lambda i: abs(i - target))
+        line_starts.append(line_end + 1)
+
+    line_ends = [start - 1 for start in line_starts[1:]] + [len(text)]
+    return "\n".join(
+        text[start:end] for start, end in zip(line_starts, line_ends, strict=True)
+    )
+
+
+def replace_cue_texts(
+    cues: Iterable[SRTCue], cue_texts: Mapping[int, str]
+) -> list[SRTCue]:
+    # New text by position (as in `format_cue_text_lines`), split into as
+    # many lines as the cue had. Cues without a new text keep theirs.
+    return [
+        cue._replace(
+            text=split_text_into_lines(
+                cue_texts[position], len(cue.text.splitlines()) or 1
+            )
+        )
+        if cue_texts.get(position)
+        else cue
+        for position, cue in enumerate(cues, start=1)
+    ]
@@ -0,0 +1,62 @@
+# pyright: basic
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from aivideocut.srt import SRTCue, cues_to_srt, parse_srt, read_srt_file
+
+
+def get_random_srt_cues(hours: float, *, seed: int = 0) -> list[SRTCue]:
+    # Whisper-like cues: 1 to 6 seconds, one or two lines of speech
+    rng = random.Random(seed)  # noqa: S311
+    words = ["então", "vamos", "ver", "isso", "aqui", "no", "Python", "f-string"]
+    cues: list[SRTCue] = []
+    start_ms = 0
+
+    while start_ms < hours * 3_600_000:
+        end_ms = start_ms + rng.randint(1000, 6000)
+        lines = [" ".join(rng.choices(words, k=rng.randint(3, 9)))]
+        if rng.random() < 0.3:
+            lines.append(" ".join(rng.choices(words, k=rng.randint(3, 9))))
+
+        cues.append(SRTCue(len(cues) + 1, start_ms, end_ms, "\n".join(lines)))
+        start_ms = end_ms + rng.randint(0, 800)
+
+    return cues
+
+
+def benchmark_srt(hours: float = 10) -> None:
+    cues = get_random_srt_cues(hours)
+
+    start_time = time.perf_counter()
+    srt = cues_to_srt(cues)
+    serialize_secs = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    parsed_cues = list(parse_srt(srt))
+    parse_secs = time.perf_counter() - start_time
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        srt_path = Path(tmp_dir) / "benchmark.srt"
+        # What a Windows editor or a chatty model leaves behind
+        noisy_srt = srt.replace("\n\n", "\n \n\n").replace("\n", "\r\n")
+        srt_path.write_bytes(noisy_srt.encode())
+
+        start_time = time.perf_counter()
+        read_cues = read_srt_file(srt_path)
+        read_secs = time.perf_counter() - start_time
+
+    print(f"🎬 {hours}h SRT: {len(cues)} cues, {len(srt) / 1024 / 1024:.1f}MB")
+    for status, label, elapsed_secs in (
+        ("✅", "serialize", serialize_secs),
+        ("✅" if parsed_cues == cues else "🔴", "parse str", parse_secs),
+        ("✅" if read_cues == cues else "🔴", "read CRLF file (mmap)", read_secs),
+    ):
+        print(status, f"{label:<22} {elapsed_secs * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    # python -m aivideocut.srt_bench [hours]
+    benchmark_srt(float(sys.argv[1]) if len(sys.argv) > 1 else 10)
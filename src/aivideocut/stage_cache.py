@@ -0,0 +1,112 @@
+# pyright: basic
+# ruff: noqa: S603
+import hashlib
+import json
+import os
+from collections.abc import Iterable, Mapping
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from subprocess import run
+
+FINGERPRINT_SAMPLES = 16
+FINGERPRINT_SAMPLE_BYTES = 1024 * 1024
+STAGE_KEY_SUFFIX = ".stage.json"
+
+
+def get_file_fingerprint(path: Path) -> str:
+    # Hashing a multi-GB video in full costs about as much as decoding it, so
+    # big files are fingerprinted by their size plus evenly spaced samples.
+    file_size = path.stat().st_size
+    digest = hashlib.blake2b(str(file_size).encode(), digest_size=16)
+
+    with path.open("rb") as f:
+        if file_size <= FINGERPRINT_SAMPLES * FINGERPRINT_SAMPLE_BYTES:
+            digest.update(f.read())
+            return digest.hexdigest()
+
+        sample_step = (file_size - FINGERPRINT_SAMPLE_BYTES) // (
+            FINGERPRINT_SAMPLES - 1
+        )
+        for i in range(FINGERPRINT_SAMPLES):
+            f.seek(i * sample_step)
+            digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+
+    return digest.hexdigest()
+
+
+@cache
+def get_package_version(package: str) -> str:
+    try:
+        return f"{package}=={version(package)}"
+    except PackageNotFoundError:
+        return f"{package}==missing"
+
+
+@cache
+def get_command_version(*cmd: str | Path) -> str:
+    try:
+        output = run(cmd, capture_output=True, text=True, check=False)
+    except FileNotFoundError:
+        return f"{cmd[0]} missing"
+
+    first_line, *_ = (output.stdout or output.stderr).strip().splitlines() or [""]
+    return first_line
+
+
+def get_stage_key(
+    *,
+    stage: str,
+    input_file: Path,
+    params: Mapping[str, object],
+    tool_versions: Iterable[str],
+) -> str:
+    stage_key_data = {
+        "stage": stage,
+        "input": get_file_fingerprint(input_file),
+        "params": params,
+        "tools": sorted(tool_versions),
+    }
+    raw_stage_key = json.dumps(stage_key_data, sort_keys=True, default=str)
+    return hashlib.blake2b(raw_stage_key.encode(), digest_size=16).hexdigest()
+
+
+def get_stage_key_path(output_file: Path) -> Path:
+    return output_file.with_name(f"{output_file.name}{STAGE_KEY_SUFFIX}")
+
+
+def is_stage_cached(output_file: Path, stage_key: str) -> bool:
+    stage_key_path = get_stage_key_path(output_file)
+
+    if not output_file.is_file() or not stage_key_path.is_file():
+        return False
+
+    with stage_key_path.open("r", encoding="utf-8") as f:
+        saved_stage_key = json.load(f)
+
+    return saved_stage_key.get("key") == stage_key
+
+
+def get_output_mtime_ns(output_file: Path) -> int | None:
+    try:
+        return output_file.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def clear_stage_key(output_file: Path) -> None:
+    get_stage_key_path(output_file).unlink(missing_ok=True)
+
+
+def save_stage_key(output_file: Path, stage_key: str, *, stage: str) -> None:
+    # Written only after the stage finished, so an interrupted stage leaves a
+    # partial output without a key and is redone on the next run. The key
+    # file itself is replaced atomically, never half written.
+    if not output_file.is_file():
+        return
+
+    stage_key_path = get_stage_key_path(output_file)
+    tmp_path = stage_key_path.with_name(f"{stage_key_path.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump({"stage": stage, "key": stage_key}, f)
+    os.replace(tmp_path, stage_key_path)
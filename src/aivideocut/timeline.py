@@ -0,0 +1,72 @@
+# pyright: basic
+import json
+from functools import reduce
+from pathlib import Path
+from typing import NamedTuple
+
+from aivideocut.segments import SpeechTimestamps
+
+
+class EditTimeline(NamedTuple):
+    # Every interval is in source (master) time. `layers` keeps what each cut
+    # stage wanted to keep, `keep_intervals` is what survives all of them.
+    source: Path
+    keep_intervals: SpeechTimestamps
+    layers: dict[str, SpeechTimestamps]
+
+
+def intersect_intervals(
+    first: SpeechTimestamps, second: SpeechTimestamps
+) -> SpeechTimestamps:
+    intersection: SpeechTimestamps = []
+    i = j = 0
+
+    while i < len(first) and j < len(second):
+        start = max(first[i]["start"], second[j]["start"])
+        end = min(first[i]["end"], second[j]["end"])
+
+        if start < end:
+            intersection.append({"start": start, "end": end})
+
+        if first[i]["end"] < second[j]["end"]:
+            i += 1
+        else:
+            j += 1
+
+    return intersection
+
+
+def compose_timeline(source: Path, layers: dict[str, SpeechTimestamps]) -> EditTimeline:
+    sorted_layers = {
+        name: sorted(intervals, key=lambda interval: interval["start"])
+        for name, intervals in layers.items()
+    }
+    keep_intervals = reduce(intersect_intervals, sorted_layers.values())
+    return EditTimeline(source, keep_intervals, sorted_layers)
+
+
+def get_kept_duration(intervals: SpeechTimestamps) -> float:
+    return sum(interval["end"] - interval["start"] for interval in intervals)
+
+
+def write_timeline_json(timeline: EditTimeline, path: Path) -> None:
+    timeline_json = {
+        "source": str(timeline.source),
+        "kept_duration": get_kept_duration(timeline.keep_intervals),
+        "keep_intervals": timeline.keep_intervals,
+        "layers": timeline.layers,
+    }
+
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(timeline_json, f, indent=2)
+
+
+def read_timeline_json(path: Path) -> EditTimeline:
+    with path.open("r", encoding="utf-8") as f:
+        timeline_json = json.load(f)
+
+    return EditTimeline(
+        source=Path(timeline_json["source"]),
+        keep_intervals=timeline_json["keep_intervals"],
+        layers=timeline_json["layers"],
+    )
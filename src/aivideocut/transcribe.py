@@ -0,0 +1,650 @@
+# pyright: basic
+import multiprocessing
+import os
+import sys
+from bisect import bisect_right
+from collections.abc import Generator, Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from functools import partial
+from pathlib import Path
+from threading import Lock
+from typing import Any, NamedTuple
+
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
+from faster_whisper.vad import VadOptions, get_speech_timestamps, merge_segments
+from rich import print as rprint
+
+from aivideocut.audio import gather_audio_intervals, iter_audio_frames
+from aivideocut.configs import (
+    ORIGINAL_SRT_FILE_PATH,
+    transcribe,
+    whisper_batch_size,
+    whisper_checkpoint,
+    whisper_model_options,
+    whisper_model_size,
+    whisper_parallel,
+)
+from aivideocut.journal import ChunkSegments, TranscriptionJournal, get_journal_path
+from aivideocut.model_server import run_model_job
+from aivideocut.remap import TimeRemap
+from aivideocut.segments import SpeechTimestamps, read_speech_timestamps
+from aivideocut.stage_cache import get_package_version, get_stage_key
+from aivideocut.utils import SRTStringWriter, write_str_to_file
+
+WHISPER_SAMPLING_RATE = 16000
+# Whisper sees 30s windows, a pack fills one without cutting a segment
+WHISPER_CHUNK_SECS = 30
+# Mel frames, the unit of a segment's `seek` (the start of its 30s window)
+WHISPER_FRAMES_PER_SECOND = 100
+
+ClipRange = tuple[float, float]
+
+
+class SpeechChunk(NamedTuple):
+    # Samples [audio_start, audio_end) of the concatenated speech audio, with
+    # its clips in seconds from audio_start.
+    audio_start: int
+    audio_end: int
+    clips: list[ClipRange]
+
+
+# Same idea as the Silero registry in aivideocut.vad: one model per process,
+# keyed by everything that changes how it was loaded.
+_whisper_models: dict[tuple[str, str, str, int], WhisperModel] = {}
+_whisper_models_lock = Lock()
+
+
+def get_whisper_model(
+    *,
+    model_size: str = whisper_model_size,
+    device: str = "cpu",
+    compute_type: str = "int8",
+    cpu_threads: int = 0,
+) -> WhisperModel:
+    whisper_model_key = (model_size, device, compute_type, cpu_threads)
+
+    with _whisper_models_lock:
+        if whisper_model_key not in _whisper_models:
+            _whisper_models[whisper_model_key] = WhisperModel(
+                model_size,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+            )
+
+        return _whisper_models[whisper_model_key]
+
+
+def evict_whisper_model() -> None:
+    with _whisper_models_lock:
+        _whisper_models.clear()
+
+
+def warm_up_whisper_model(*, cpu_threads: int) -> None:
+    # Pool initializer: the model loads once per worker, not per chunk
+    get_whisper_model(**{**whisper_model_options, "cpu_threads": cpu_threads})
+
+
+def segment_to_dict(segment: Any) -> dict[str, Any]:  # noqa: ANN401
+    # The result format of whisper's `transcribe`, what its WriteSRT expects.
+    # With words present it times each cue from its first to its last word.
+    segment_dict: dict[str, Any] = {
+        "seek": segment.seek,
+        "start": segment.start,
+        "end": segment.end,
+        "text": segment.text,
+        "tokens": segment.tokens,
+        "temperature": segment.temperature,
+    }
+
+    if segment.words:
+        segment_dict["words"] = [
+            {
+                "word": word.word,
+                "start": word.start,
+                "end": word.end,
+                "probability": word.probability,
+            }
+            for word in segment.words
+        ]
+
+    return segment_dict
+
+
+def remap_segment_to_source(
+    segment: dict[str, Any], remap: TimeRemap, *, offset: float = 0.0
+) -> dict[str, Any]:
+    # `offset` is where the transcribed audio starts in the remap's output
+    remapped_segment = {
+        **segment,
+        "start": remap.to_source(segment["start"] + offset),
+        "end": remap.to_source(segment["end"] + offset, is_end=True),
+    }
+
+    if "words" in segment:
+        remapped_segment["words"] = [
+            {
+                **word,
+                "start": remap.to_source(word["start"] + offset),
+                "end": remap.to_source(word["end"] + offset, is_end=True),
+            }
+            for word in segment["words"]
+        ]
+
+    return remapped_segment
+
+
+def iter_transcribe_audio(
+    audio: str | Path | Any,  # noqa: ANN401
+    *,
+    batch_size: int = whisper_batch_size,
+    cpu_threads: int | None = None,
+    clips: list[ClipRange] | None = None,
+    **transcribe_options: Any,  # noqa: ANN401
+) -> Generator[dict[str, Any]]:
+    # `audio` is a media file (decoded by faster-whisper with PyAV) or a 16kHz
+    # mono float32 array. With `clips` (seconds) only those ranges are
+    # decoded and faster-whisper's own VAD is off.
+    model_options = dict(whisper_model_options)
+    if cpu_threads is not None:
+        model_options["cpu_threads"] = cpu_threads
+
+    whisper_model = get_whisper_model(**model_options)
+    whisper_audio = str(audio) if isinstance(audio, Path) else audio
+    transcribe_options = {**transcribe, **transcribe_options}
+
+    if clips is not None:
+        transcribe_options["vad_filter"] = False
+        transcribe_options["clip_timestamps"] = get_clip_timestamps(
+            clips, batched=batch_size > 1
+        )
+
+    if batch_size > 1:
+        batched_model = BatchedInferencePipeline(model=whisper_model)
+        segments, _ = batched_model.transcribe(
+            whisper_audio, batch_size=batch_size, **transcribe_options
+        )
+    else:
+        segments, _ = whisper_model.transcribe(whisper_audio, **transcribe_options)
+
+    # `segments` is lazy, the actual decoding happens while iterating it
+    for segment in segments:
+        yield segment_to_dict(segment)
+
+
+def transcribe_audio(
+    audio: str | Path | Any,  # noqa: ANN401
+    *,
+    batch_size: int = whisper_batch_size,
+    cpu_threads: int | None = None,
+    clips: list[ClipRange] | None = None,
+    **transcribe_options: Any,  # noqa: ANN401
+) -> list[dict[str, Any]]:
+    return list(
+        iter_transcribe_audio(
+            audio,
+            batch_size=batch_size,
+            cpu_threads=cpu_threads,
+            clips=clips,
+            **transcribe_options,
+        )
+    )
+
+
+def get_clip_timestamps(clips: list[ClipRange], *, batched: bool) -> list[Any]:
+    # The batched pipeline takes sample offsets per chunk, the sequential one
+    # a flat start,end,start,end... list of seconds.
+    if batched:
+        return [
+            {
+                "start": round(start * WHISPER_SAMPLING_RATE),
+                "end": round(end * WHISPER_SAMPLING_RATE),
+            }
+            for start, end in clips
+        ]
+
+    return [time for clip in clips for time in clip]
+
+
+def pack_speech_clips(
+    remap: TimeRemap, max_secs: float = WHISPER_CHUNK_SECS
+) -> list[ClipRange]:
+    # Clips over the concatenated speech audio. Segments are packed until the
+    # next one would not fit in `max_secs`. A segment longer than that is
+    # split into `max_secs` pieces.
+    clips: list[ClipRange] = []
+    output_ends = remap.output_starts + (remap.source_ends - remap.source_starts)
+    clip_start = 0.0
+
+    for start, end in zip(
+        remap.output_starts.tolist(), output_ends.tolist(), strict=True
+    ):
+        while end - clip_start > max_secs:
+            clip_end = start if start > clip_start else clip_start + max_secs
+            clips.append((clip_start, clip_end))
+            clip_start = clip_end
+
+    total_secs = float(output_ends[-1]) if output_ends.size else 0.0
+    if total_secs > clip_start:
+        clips.append((clip_start, total_secs))
+
+    return clips
+
+
+def get_speech_chunks(
+    clips: list[ClipRange], max_secs: float = whisper_parallel["chunk_secs"]
+) -> list[SpeechChunk]:
+    # Consecutive clips are grouped until the next one would pass `max_secs`.
+    # Clips start where a speech segment starts, so chunks are cut at
+    # silences (only a segment longer than a clip is ever split).
+    chunks: list[SpeechChunk] = []
+    chunk_clips: list[ClipRange] = []
+
+    for clip in [*clips, None]:
+        if chunk_clips and (clip is None or clip[1] - chunk_clips[0][0] > max_secs):
+            audio_start = round(chunk_clips[0][0] * WHISPER_SAMPLING_RATE)
+            audio_end = round(chunk_clips[-1][1] * WHISPER_SAMPLING_RATE)
+            offset = audio_start / WHISPER_SAMPLING_RATE
+            chunks.append(
+                SpeechChunk(
+                    audio_start,
+                    audio_end,
+                    [(start - offset, end - offset) for start, end in chunk_clips],
+                )
+            )
+            chunk_clips = []
+
+        if clip is not None:
+            chunk_clips.append(clip)
+
+    return chunks
+
+
+def transcribe_speech_chunks(
+    speech_audio: np.ndarray,
+    chunks: list[SpeechChunk],
+    *,
+    batch_size: int,
+    cpu_threads: int | None,
+    workers: int,
+    journal: TranscriptionJournal | None = None,
+) -> list[ChunkSegments]:
+    # One result per chunk, in chunk order, whatever finishes first. Chunks
+    # already in the journal are not transcribed again.
+    chunk_segments = dict(journal.chunk_segments) if journal else {}
+    pending_indexes = [i for i in range(len(chunks)) if i not in chunk_segments]
+
+    def save_chunk(chunk_index: int, segments: ChunkSegments) -> None:
+        chunk_segments[chunk_index] = segments
+        if journal is not None:
+            journal.append(chunk_index, segments)
+
+    if workers <= 1 or len(pending_indexes) <= 1:
+        for i in pending_indexes:
+            save_chunk(
+                i,
+                transcribe_audio(
+                    speech_audio[chunks[i].audio_start : chunks[i].audio_end],
+                    batch_size=batch_size,
+                    cpu_threads=cpu_threads,
+                    clips=chunks[i].clips,
+                ),
+            )
+
+        return [chunk_segments[i] for i in range(len(chunks))]
+
+    workers = min(workers, len(pending_indexes))
+    # Threads are split between workers, never `workers` x every core
+    cpu_threads = cpu_threads or max(1, (os.cpu_count() or 1) // workers)
+
+    # spawn, like the Silero pool: CTranslate2's thread pools do not survive
+    # a fork.
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=partial(warm_up_whisper_model, cpu_threads=cpu_threads),
+    ) as executor:
+        futures = {
+            executor.submit(
+                transcribe_audio,
+                speech_audio[chunks[i].audio_start : chunks[i].audio_end],
+                batch_size=batch_size,
+                cpu_threads=cpu_threads,
+                clips=chunks[i].clips,
+            ): i
+            for i in pending_indexes
+        }
+        # Journaled as they finish, so a crash loses only what was running
+        for future in as_completed(futures):
+            save_chunk(futures[future], future.result())
+
+    return [chunk_segments[i] for i in range(len(chunks))]
+
+
+def get_journal_key(
+    input_file: Path,
+    speech_timestamps: SpeechTimestamps | None,
+    *,
+    batch_size: int,
+    chunk_secs: float | None,
+) -> str:
+    # None for both in a whole file transcription
+    return get_stage_key(
+        stage="transcribe_journal",
+        input_file=input_file,
+        params={
+            "speech_timestamps": speech_timestamps,
+            "transcribe": transcribe,
+            "whisper_model_size": whisper_model_size,
+            "whisper_model_options": whisper_model_options,
+            "whisper_batch_size": batch_size,
+            "whisper_chunk_secs": chunk_secs,
+        },
+        tool_versions=[
+            get_package_version("faster-whisper"),
+            get_package_version("ctranslate2"),
+        ],
+    )
+
+
+def get_vad_clips(audio: np.ndarray) -> list[ClipRange]:
+    # The clips BatchedInferencePipeline cuts with its own VAD when it gets no
+    # `clip_timestamps`, so a resumed run can skip the transcribed ones.
+    vad_options = VadOptions(
+        max_speech_duration_s=WHISPER_CHUNK_SECS, min_silence_duration_ms=160
+    )
+    return [
+        (clip["start"] / WHISPER_SAMPLING_RATE, clip["end"] / WHISPER_SAMPLING_RATE)
+        for clip in merge_segments(
+            get_speech_timestamps(audio, vad_options), vad_options
+        )
+    ]
+
+
+def get_prompt_tokens(segments: Iterable[dict[str, Any]]) -> list[int]:
+    # What faster-whisper prompts the window after `segments` with: the tokens
+    # decoded since the last window hot enough to reset the prompt.
+    if not transcribe.get("condition_on_previous_text", True):
+        return []
+
+    reset_temperature = transcribe.get("prompt_reset_on_temperature", 0.5)
+    prompt_tokens: list[int] = []
+
+    for segment in segments:
+        prompt_tokens.extend(segment["tokens"])
+        # Every segment of a window has the window's temperature
+        if segment["temperature"] > reset_temperature:
+            prompt_tokens = []
+
+    return prompt_tokens
+
+
+def transcribe_file_segments(
+    input_file: Path, *, cpu_threads: int | None, journal: TranscriptionJournal
+) -> list[dict[str, Any]]:
+    # Sequential decoding runs in 30s windows, each prompted with the text
+    # before it. A window is journaled once the next one starts, keyed by
+    # where that one starts, and a resumed run restarts right there with the
+    # same prompt tokens.
+    segments = [
+        segment
+        for seek in sorted(journal.chunk_segments)
+        for segment in journal.chunk_segments[seek]
+    ]
+    resume_options = {}
+    if journal.chunk_segments:
+        resume_seek = max(journal.chunk_segments)
+        resume_options = {
+            "clip_timestamps": [resume_seek / WHISPER_FRAMES_PER_SECOND],
+            "initial_prompt": get_prompt_tokens(segments),
+        }
+
+    window_segments: list[dict[str, Any]] = []
+    for segment in iter_transcribe_audio(
+        input_file, batch_size=1, cpu_threads=cpu_threads, **resume_options
+    ):
+        if window_segments and segment["seek"] != window_segments[0]["seek"]:
+            journal.append(segment["seek"], window_segments)
+            window_segments = []
+
+        window_segments.append(segment)
+        segments.append(segment)
+
+    return segments
+
+
+def transcribe_file_clips(
+    input_file: Path,
+    *,
+    batch_size: int,
+    cpu_threads: int | None,
+    journal: TranscriptionJournal,
+) -> list[dict[str, Any]]:
+    # Batched decoding: every VAD clip is transcribed on its own, so the
+    # journal keeps one entry per clip and a resumed run only sends the
+    # clips it does not have. A clip is saved once the pipeline moves past
+    # it (segments come in clip order).
+    audio = decode_audio(str(input_file), sampling_rate=WHISPER_SAMPLING_RATE)
+    clips = get_vad_clips(audio)
+    pending_indexes = [i for i in range(len(clips)) if i not in journal.chunk_segments]
+    pending_starts = [clips[i][0] for i in pending_indexes]
+    clip_segments: list[dict[str, Any]] = []
+    position = 0
+
+    if pending_indexes:
+        for segment in iter_transcribe_audio(
+            audio,
+            batch_size=batch_size,
+            cpu_threads=cpu_threads,
+            clips=[clips[i] for i in pending_indexes],
+        ):
+            segment_position = bisect_right(pending_starts, segment["start"]) - 1
+            while position < segment_position:
+                journal.append(pending_indexes[position], clip_segments)
+                clip_segments, position = [], position + 1
+
+            clip_segments.append(segment)
+
+    for i in pending_indexes[position:]:
+        journal.append(i, clip_segments)
+        clip_segments = []
+
+    return [segment for i in range(len(clips)) for segment in journal.chunk_segments[i]]
+
+
+def transcribe_file(
+    input_file: Path,
+    *,
+    batch_size: int = whisper_batch_size,
+    cpu_threads: int | None = None,
+    journal_file: Path | None = None,
+) -> list[dict[str, Any]]:
+    # The whole file, no Silero. With a `journal_file` what was decoded
+    # survives a crash and is reused.
+    if journal_file is None:
+        return transcribe_audio(
+            input_file, batch_size=batch_size, cpu_threads=cpu_threads
+        )
+
+    journal_key = get_journal_key(
+        input_file, None, batch_size=batch_size, chunk_secs=None
+    )
+
+    with TranscriptionJournal(journal_file, journal_key) as journal:
+        if journal.chunk_segments:
+            rprint(
+                f"♻️ Resuming: {len(journal.chunk_segments)} journal entries from",
+                journal_file,
+                "\n\n",
+            )
+
+        if batch_size > 1:
+            return transcribe_file_clips(
+                input_file,
+                batch_size=batch_size,
+                cpu_threads=cpu_threads,
+                journal=journal,
+            )
+
+        return transcribe_file_segments(
+            input_file, cpu_threads=cpu_threads, journal=journal
+        )
+
+
+def transcribe_speech(
+    input_file: Path,
+    speech_timestamps: SpeechTimestamps,
+    *,
+    batch_size: int = whisper_batch_size,
+    cpu_threads: int | None = None,
+    workers: int = whisper_parallel["workers"],
+    chunk_secs: float = whisper_parallel["chunk_secs"],
+    journal_file: Path | None = None,
+) -> list[dict[str, Any]]:
+    # Only the speech is decoded and concatenated, Whisper never sees the
+    # silences (where it likes to hallucinate), and every timestamp is mapped
+    # back to media time at the end. `cpu_threads` is per worker. With a
+    # `journal_file`, finished chunks survive a crash and are reused.
+    if not speech_timestamps:
+        return []
+
+    sample_intervals = np.round(
+        np.array([[t["start"], t["end"]] for t in speech_timestamps])
+        * WHISPER_SAMPLING_RATE
+    ).astype(np.int64)
+    remap = TimeRemap(
+        sample_intervals[:, 0] / WHISPER_SAMPLING_RATE,
+        sample_intervals[:, 1] / WHISPER_SAMPLING_RATE,
+    )
+
+    audio_frames = iter_audio_frames(
+        input_file, sampling_rate=WHISPER_SAMPLING_RATE, layout="mono"
+    )
+    speech_audio = gather_audio_intervals(audio_frames, sample_intervals)
+    clips = pack_speech_clips(remap)
+    chunks = get_speech_chunks(clips, chunk_secs)
+
+    rprint(
+        f"📝 Transcribing {remap.get_output_duration():.2f}s of speech",
+        f"in {len(clips)} clips, {len(chunks)} chunks, {workers} worker(s)",
+        "\n\n",
+    )
+    with ExitStack() as stack:
+        journal = None
+        if journal_file is not None:
+            journal_key = get_journal_key(
+                input_file,
+                speech_timestamps,
+                batch_size=batch_size,
+                chunk_secs=chunk_secs,
+            )
+            journal = stack.enter_context(
+                TranscriptionJournal(journal_file, journal_key)
+            )
+
+        if journal and journal.chunk_segments:
+            rprint(
+                f"♻️ Resuming: {len(journal.chunk_segments)}/{len(chunks)} chunks",
+                "from",
+                journal_file,
+                "\n\n",
+            )
+
+        chunk_segments = transcribe_speech_chunks(
+            speech_audio,
+            chunks,
+            batch_size=batch_size,
+            cpu_threads=cpu_threads,
+            workers=workers,
+            journal=journal,
+        )
+
+    return [
+        remap_segment_to_source(
+            segment, remap, offset=chunk.audio_start / WHISPER_SAMPLING_RATE
+        )
+        for chunk, segments in zip(chunks, chunk_segments, strict=True)
+        for segment in segments
+    ]
+
+
+def segments_to_srt(segments: Iterable[dict[str, Any]]) -> str:
+    return SRTStringWriter().write_result({"segments": list(segments)})
+
+
+def get_transcription_segments(
+    input_file: Path,
+    *,
+    speech_timestamps: SpeechTimestamps | None = None,
+    batch_size: int = whisper_batch_size,
+    cpu_threads: int | None = None,
+    workers: int = whisper_parallel["workers"],
+    journal_file: Path | None = None,
+) -> list[dict[str, Any]]:
+    if speech_timestamps is None:
+        return transcribe_file(
+            input_file,
+            batch_size=batch_size,
+            cpu_threads=cpu_threads,
+            journal_file=journal_file,
+        )
+
+    return transcribe_speech(
+        input_file,
+        speech_timestamps,
+        batch_size=batch_size,
+        cpu_threads=cpu_threads,
+        workers=workers,
+        journal_file=journal_file,
+    )
+
+
+def transcribe_to_srt(
+    *,
+    input_file: Path,
+    output_file: Path,
+    speech_timestamps: SpeechTimestamps | None = None,
+    batch_size: int = whisper_batch_size,
+    cpu_threads: int | None = None,
+    workers: int = whisper_parallel["workers"],
+    checkpoint: bool = whisper_checkpoint,
+    dry_run: bool = False,
+) -> Path:
+    rprint("📝 Transcribing:", input_file, transcribe, "\n\n")
+
+    if dry_run:
+        return output_file
+
+    journal_file = get_journal_path(output_file) if checkpoint else None
+
+    # In the model server when one is running, the SRT is written here
+    segments = run_model_job(
+        "transcription_segments",
+        input_file,
+        speech_timestamps=speech_timestamps,
+        batch_size=batch_size,
+        cpu_threads=cpu_threads,
+        workers=workers,
+        journal_file=journal_file,
+    )
+    write_str_to_file(segments_to_srt(segments), output_file, create_parents=True)
+    if journal_file is not None:
+        journal_file.unlink(missing_ok=True)
+
+    rprint(f"📝 {len(segments)} segments saved to {output_file}", "\n\n")
+    return output_file
+
+
+if __name__ == "__main__":
+    # python -m aivideocut.transcribe path/to/video.mp4 [path/to/speech.json]
+    # Writes the SRT the gem_* scripts read. With a speech timestamps JSON
+    # (like 03_SILERO.json of the same file) only the speech is transcribed.
+    transcribe_to_srt(
+        input_file=Path(sys.argv[1]),
+        output_file=ORIGINAL_SRT_FILE_PATH,
+        speech_timestamps=(
+            read_speech_timestamps(Path(sys.argv[2])) if len(sys.argv) > 2 else None
+        ),
+    )
@@ -1,32 +1,32 @@
 # pyright: basic
-
+from bisect import bisect_right
 from collections.abc import Generator, Iterable
 from datetime import datetime
 from io import StringIO
 from pathlib import Path
-from typing import Literal, TypeAlias
 
 from rich import print as rprint
-from whisper.utils import WriteSRT
 
-from aivideocut.configs import (
-    ANY_SPACE_RE,
-    DOUBLE_LINE_RE,
-    ENDING_DOT_RE,
-    ONE_LINE_RE,
+from aivideocut.configs import ANY_SPACE_RE, ENDING_DOT_RE
+from aivideocut.segments import (
+    SpeechSegments,
+    SpeechTimestamps,
+    adjust_speech_segments,
 )
-
-SpeechTimestamp: TypeAlias = dict[Literal["start"] | Literal["end"], float]
-SpeechTimestamps: TypeAlias = list[SpeechTimestamp]
+from aivideocut.srt import SRTCue
 
 
-class SRTStringWriter(WriteSRT):
+class SRTStringWriter:
+    # Wraps whisper's WriteSRT. Importing whisper pulls in torch, so it only
+    # happens when an SRT is actually written, not for every `utils` import.
     def __init__(self) -> None:
-        super().__init__("")
+        from whisper.utils import WriteSRT
+
+        self.srt_writer = WriteSRT("")
 
     def write_result(self, result: dict) -> str:
         s = StringIO()
-        super().write_result(result, file=s)
+        self.srt_writer.write_result(result, file=s)
         return s.getvalue().strip()
 
 
@@ -36,55 +36,15 @@ def ajust_vad_speech_timestamps(
     pad_start_secs: float = 0.02,
     pad_end_secs: float = 0.03,
 ) -> SpeechTimestamps:
-    new_timestamps: SpeechTimestamps = []
-
     if not speech_timestamps:
-        return new_timestamps
-
-    first_timestamp_start = speech_timestamps[-0]["start"]
-    last_timestamp_end = speech_timestamps[-1]["end"]
-
-    last_current_start = -1
-    last_current_end = 0
-    for timestamp in speech_timestamps:
-        current_start, current_end = timestamp.values()
-        found_last_end = False
-
-        if pad_start_secs > 0:
-            current_start = max(last_current_end, current_start - pad_start_secs)
-
-        if pad_end_secs > 0:
-            current_end = min(last_timestamp_end, current_end + pad_end_secs)
+        return []
 
-        if last_current_start < 0:
-            last_current_start = current_start
-
-        if current_start == last_current_end:
-            continue
-
-        current_duration = current_end - last_current_start
-        is_current_duration_accepted = current_duration >= min_speech_length_secs
-        last_end_not_found = not found_last_end
-
-        if found_last_end and not is_current_duration_accepted:
-            last_current_start = current_start
-
-        if last_end_not_found and is_current_duration_accepted:
-            new_speech_timestamp: SpeechTimestamp = {
-                "start": last_current_start,
-                "end": current_end,
-            }
-            new_timestamps.append(new_speech_timestamp)
-            found_last_end = True
-            last_current_start = -1
-            last_current_end = current_end
-
-    if not new_timestamps:
-        new_timestamps.append(
-            {"start": first_timestamp_start, "end": last_timestamp_end}
-        )
-    else:
-        new_timestamps[-1]["end"] = last_timestamp_end
+    new_timestamps = adjust_speech_segments(
+        SpeechSegments.from_timestamps(speech_timestamps),
+        min_speech_length_secs=min_speech_length_secs,
+        pad_start_secs=pad_start_secs,
+        pad_end_secs=pad_end_secs,
+    ).to_timestamps()
 
     rprint(
         "\n"
@@ -100,75 +60,86 @@ def ajust_vad_speech_timestamps(
     return new_timestamps
 
 
-def yield_text_by_char_qtd(
-    text_blocks: Iterable[str], max_chars: float = float("inf")
-) -> Generator[list[str]]:
-    qtd_chars = 0
-    limited_blocks: list[str] = []
-
-    for block in text_blocks:
-        if qtd_chars >= max_chars and limited_blocks:
-            yield limited_blocks
-            limited_blocks = []
-            qtd_chars = 0
+def get_last_position_before(
+    positions: list[int], *, after: int, before: int
+) -> int | None:
+    # Largest sorted position in (after, before], by binary search
+    i = bisect_right(positions, before) - 1
+    return positions[i] if i >= 0 and positions[i] > after else None
 
-        qtd_chars += len(block)
-        limited_blocks.append(block)
 
-    if limited_blocks:
-        yield limited_blocks
+def get_first_position_after(
+    positions: list[int], *, after: int, before: int
+) -> int | None:
+    # Smallest sorted position in (after, before), by binary search
+    i = bisect_right(positions, after)
+    return positions[i] if i < len(positions) and positions[i] < before else None
 
 
 def smart_text_split(
-    text: str, approx_max_chars: float = float("inf")
+    text: str,
+    approx_max_chars: float = float("inf"),
+    *,
+    overlap_chars: int = 0,
 ) -> Generator[str]:
-    text_length = len(text)
-
-    remaining_text = ""
-
-    for i in range(0, text_length, int(approx_max_chars)):
-        start = i
-        end = int(min(text_length, i + approx_max_chars))
-
-        text_chunk = f"{remaining_text}{text[start:end]}"
-        chunk_length = len(text_chunk)
-
-        new_end = end
-        for j in range(chunk_length - 1, -1, -1):
-            match = ENDING_DOT_RE.search(text_chunk[j])
-            if match:
-                new_end = j + 1
-                break
-
-        yield (text_chunk[:new_end].strip())
-
-        remaining_text = text_chunk[new_end:].strip()
+    # Chunks of at most `approx_max_chars` ending at the last sentence end
+    # that fits, else the last word, else wherever the size runs out. Ends
+    # before half the size are skipped, they would only make tiny chunks.
+    # Each chunk repeats up to `overlap_chars` of the end of the previous
+    # one, starting at a sentence (or word) when there is one to start at.
+    if approx_max_chars == float("inf"):
+        approx_max_chars = len(text)
 
-    if remaining_text:
-        yield remaining_text.strip()
+    max_chars = max(1, int(approx_max_chars))
+    overlap_chars = min(max(0, overlap_chars), max_chars // 2)
 
+    # Every boundary is found once, each chunk only searches the sorted lists
+    sentence_ends = [match.end() for match in ENDING_DOT_RE.finditer(text)]
+    word_starts = [match.end() for match in ANY_SPACE_RE.finditer(text)]
 
-def split_srt_blocks(srt: str, max_chars: float = float("inf")) -> Generator[list[str]]:
-    blocks: list[str] = DOUBLE_LINE_RE.split(srt.strip())
-    return yield_text_by_char_qtd(blocks, max_chars=max_chars)
-
-
-def extract_text_from_srt(srt: str) -> str:
-    blocks = split_srt_blocks(srt, 1)
-
-    srt_txt = ""
-    for block in blocks:
-        block_lines = ONE_LINE_RE.split(block[0])
-
-        if not block_lines or len(block_lines) < 3:
-            continue
-
-        block_text_lines = " ".join(block_lines[2:])
-        block_text = ONE_LINE_RE.sub(" ", block_text_lines)
-        block_text = ANY_SPACE_RE.sub(" ", block_text)
-        srt_txt += f"{block_text} "
-
-    return srt_txt
+    text_length = len(text)
+    start = 0
+
+    while start < text_length:
+        end = text_length
+        if start + max_chars < text_length:
+            min_end = start + max_chars // 2
+            end = (
+                get_last_position_before(
+                    sentence_ends, after=min_end, before=start + max_chars
+                )
+                or get_last_position_before(
+                    word_starts, after=min_end, before=start + max_chars
+                )
+                or start + max_chars
+            )
+
+        text_chunk = text[start:end].strip()
+        if text_chunk:
+            yield text_chunk
+
+        if end == text_length:
+            break
+
+        next_start = end
+        if overlap_chars:
+            next_start = (
+                get_first_position_after(
+                    sentence_ends, after=end - overlap_chars - 1, before=end
+                )
+                or get_first_position_after(
+                    word_starts, after=end - overlap_chars - 1, before=end
+                )
+                or end - overlap_chars
+            )
+
+        # Always forward, `end` is past the middle of the chunk and the
+        # overlap is at most half of it
+        start = max(next_start, start + 1)
+
+
+def extract_text_from_srt(cues: Iterable[SRTCue]) -> str:
+    return " ".join(ANY_SPACE_RE.sub(" ", cue.text) for cue in cues)
 
 
 def read_file_path(path: Path) -> str:
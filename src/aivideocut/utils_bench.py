@@ -0,0 +1,54 @@
+# pyright: basic
+import random
+import string
+import time
+
+from aivideocut.configs import ANY_SPACE_RE, ENDING_DOT_RE
+from aivideocut.utils import smart_text_split
+
+
+def benchmark_smart_text_split(
+    text_length: int = 1_000_000, max_chars: int = 20_000
+) -> None:
+    rng = random.Random(0)  # noqa: S311
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 10)))
+        for _ in range(2000)
+    ]
+    transcript = ""
+    while len(transcript) < text_length:
+        sentence = " ".join(rng.choices(words, k=rng.randint(3, 30)))
+        transcript += f"{sentence.capitalize()}{rng.choice('...?!')} "
+    transcript = transcript[:text_length]
+
+    for label, text in (
+        ("sentences", transcript),
+        ("no punctuation", ENDING_DOT_RE.sub("", transcript)),
+        ("no spaces", ANY_SPACE_RE.sub("", transcript)),
+    ):
+        for overlap_chars in (0, max_chars // 10):
+            start_time = time.perf_counter()
+            text_chunks = list(
+                smart_text_split(
+                    text, approx_max_chars=max_chars, overlap_chars=overlap_chars
+                )
+            )
+            elapsed_secs = time.perf_counter() - start_time
+
+            longest_chunk = max(len(text_chunk) for text_chunk in text_chunks)
+            # Without overlap, the chunks are the whole text (minus the
+            # spaces stripped at their edges)
+            chunks_text = ANY_SPACE_RE.sub("", "".join(text_chunks))
+            is_complete = overlap_chars or chunks_text == ANY_SPACE_RE.sub("", text)
+            status = "✅" if longest_chunk <= max_chars and is_complete else "🔴"
+            print(
+                status,
+                f"{len(text)} chars, {label}, overlap {overlap_chars}:",
+                f"{len(text_chunks)} chunks (longest {longest_chunk})",
+                f"in {elapsed_secs * 1000:.1f}ms",
+            )
+
+
+if __name__ == "__main__":
+    # python -m aivideocut.utils_bench
+    benchmark_smart_text_split()
@@ -0,0 +1,337 @@
+# pyright: basic
+import multiprocessing
+import wave
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from threading import Lock
+from typing import Any, NamedTuple
+
+import numpy as np
+import torch
+from silero_vad import VADIterator, get_speech_timestamps, load_silero_vad
+
+from aivideocut.audio import (
+    decode_audio,
+    iter_audio_chunks,
+    iter_audio_frames,
+    resample_audio,
+    tap_audio,
+)
+from aivideocut.segments import SpeechTimestamps
+from aivideocut.silence import get_audio_levels, get_loud_intervals
+
+SILERO_SAMPLING_RATE = 16000
+SILERO_WINDOW_SAMPLES = 512
+
+# What ffmpeg must write for `get_parallel_speech_timestamps` to read windows
+# straight from the wav file, without resampling in every worker.
+# fmt: off
+SILERO_WAV_ARGS = [
+    "-vn", "-ac", "1", "-ar", str(SILERO_SAMPLING_RATE), "-c:a", "pcm_s16le",
+]
+# fmt: on
+
+# One model per process (and per worker in a pool), keyed by the onnx flag.
+# Silero models carry RNN state between calls, so a cached model must not be
+# used by two threads at the same time.
+_silero_models: dict[bool, Any] = {}
+_silero_models_lock = Lock()
+
+
+def get_silero_model(*, onnx: bool = False) -> Any:  # noqa: ANN401
+    with _silero_models_lock:
+        if onnx not in _silero_models:
+            _silero_models[onnx] = load_silero_vad(onnx=onnx)
+
+        return _silero_models[onnx]
+
+
+def set_silero_threads(threads: int | None) -> None:
+    # Intra-op threads are a process-wide torch setting, None keeps torch's own
+    if threads is not None and torch.get_num_threads() != threads:
+        torch.set_num_threads(threads)
+
+
+def warm_up_silero_model(*, onnx: bool = False, threads: int | None = None) -> None:
+    set_silero_threads(threads)
+
+    # The first forward pass allocates buffers and picks kernels, do it once
+    # here instead of on the first file.
+    silero_model = get_silero_model(onnx=onnx)
+    silero_model(torch.zeros(SILERO_WINDOW_SAMPLES), SILERO_SAMPLING_RATE)
+    silero_model.reset_states()
+
+
+def evict_silero_model(*, onnx: bool | None = None) -> None:
+    with _silero_models_lock:
+        if onnx is None:
+            _silero_models.clear()
+        else:
+            _silero_models.pop(onnx, None)
+
+
+def stream_speech_timestamps(
+    input_file: Path, **silero_vad_options: float
+) -> SpeechTimestamps:
+    audio_frames = iter_audio_frames(
+        input_file, sampling_rate=SILERO_SAMPLING_RATE, layout="mono"
+    )
+    return get_streaming_speech_timestamps(audio_frames, **silero_vad_options)
+
+
+def get_speech_probabilities(audio_frames: Iterable[np.ndarray]) -> np.ndarray:
+    # One probability per 512-sample window, the raw output every Silero
+    # segmentation is derived from.
+    silero_model = get_silero_model()
+    silero_model.reset_states()
+
+    with torch.inference_mode():
+        speech_probabilities = [
+            silero_model(torch.from_numpy(chunk[0]), SILERO_SAMPLING_RATE).item()
+            for chunk in iter_audio_chunks(audio_frames, SILERO_WINDOW_SAMPLES)
+        ]
+
+    silero_model.reset_states()
+    return np.asarray(speech_probabilities, dtype=np.float32)
+
+
+def stream_speech_probabilities(input_file: Path) -> np.ndarray:
+    audio_frames = iter_audio_frames(
+        input_file, sampling_rate=SILERO_SAMPLING_RATE, layout="mono"
+    )
+    return get_speech_probabilities(audio_frames)
+
+
+def detect_loud_and_speech_intervals(
+    input_file: Path,
+    *,
+    audio_silence_options: dict[str, Any],
+    silero_vad_options: dict[str, Any],
+) -> tuple[SpeechTimestamps, SpeechTimestamps]:
+    # One decode feeds both analyses: the auto-editor style frame levels see
+    # native rate audio, Silero sees the same frames resampled to 16kHz mono.
+    audio_silence_options = dict(audio_silence_options)
+    audio_levels = get_audio_levels(
+        input_file, audio_silence_options.pop("method", "peak")
+    )
+
+    audio_frames = resample_audio(
+        tap_audio(decode_audio(input_file), audio_levels.feed),
+        sampling_rate=SILERO_SAMPLING_RATE,
+        layout="mono",
+    )
+    speech_timestamps = get_streaming_speech_timestamps(
+        audio_frames, **silero_vad_options
+    )
+    loud_intervals = get_loud_intervals(
+        audio_levels.result(), audio_levels.timebase, **audio_silence_options
+    )
+
+    return loud_intervals, speech_timestamps
+
+
+def get_streaming_speech_timestamps(
+    audio_frames: Iterable[np.ndarray],
+    *,
+    threshold: float = 0.5,
+    min_speech_duration_ms: int = 250,
+    min_silence_duration_ms: int = 100,
+    speech_pad_ms: int = 30,
+) -> SpeechTimestamps:
+    silero_model = get_silero_model()
+    vad_iterator = VADIterator(
+        silero_model,
+        threshold=threshold,
+        sampling_rate=SILERO_SAMPLING_RATE,
+        min_silence_duration_ms=min_silence_duration_ms,
+        speech_pad_ms=speech_pad_ms,
+    )
+
+    speech_timestamps: SpeechTimestamps = []
+    speech_start: float | None = None
+    total_samples = 0
+
+    for chunk in iter_audio_chunks(audio_frames, SILERO_WINDOW_SAMPLES):
+        total_samples += SILERO_WINDOW_SAMPLES
+        speech_event = vad_iterator(torch.from_numpy(chunk[0]), return_seconds=True)
+
+        if not speech_event:
+            continue
+
+        if "start" in speech_event:
+            speech_start = speech_event["start"]
+
+        if "end" in speech_event and speech_start is not None:
+            speech_timestamps.append(
+                {"start": speech_start, "end": speech_event["end"]}
+            )
+            speech_start = None
+
+    vad_iterator.reset_states()
+
+    if speech_start is not None:
+        speech_end = round(total_samples / SILERO_SAMPLING_RATE, 1)
+        speech_timestamps.append({"start": speech_start, "end": speech_end})
+
+    # VADIterator has no notion of minimum speech length, get_speech_timestamps
+    # drops those segments before returning, so we do the same.
+    min_speech_secs = min_speech_duration_ms / 1000
+    return [
+        timestamp
+        for timestamp in speech_timestamps
+        if timestamp["end"] - timestamp["start"] >= min_speech_secs
+    ]
+
+
+class VadWindow(NamedTuple):
+    # Sample offsets in the 16kHz audio. Silero runs over [start, end), but
+    # only speech inside [core_start, core_end) belongs to this window. The
+    # overlap around the core gives the model context (and RNN state) at the
+    # edges, so its decisions there match a single pass over the whole file.
+    start: int
+    end: int
+    core_start: int
+    core_end: int
+
+
+def get_vad_windows(
+    total_samples: int, *, window_secs: float, overlap_secs: float
+) -> list[VadWindow]:
+    # Aligned to Silero's window size so every worker sees the same 512-sample
+    # grid a single pass would.
+    window_samples = max(
+        SILERO_WINDOW_SAMPLES,
+        round(window_secs * SILERO_SAMPLING_RATE)
+        // SILERO_WINDOW_SAMPLES
+        * SILERO_WINDOW_SAMPLES,
+    )
+    overlap_samples = (
+        round(overlap_secs * SILERO_SAMPLING_RATE)
+        // SILERO_WINDOW_SAMPLES
+        * SILERO_WINDOW_SAMPLES
+    )
+
+    return [
+        VadWindow(
+            start=max(0, core_start - overlap_samples),
+            end=min(total_samples, core_start + window_samples + overlap_samples),
+            core_start=core_start,
+            core_end=min(total_samples, core_start + window_samples),
+        )
+        for core_start in range(0, total_samples, window_samples)
+    ]
+
+
+def read_wav_window(wav_file: Path, window: VadWindow) -> np.ndarray:
+    with wave.open(str(wav_file), "rb") as wav:
+        wav.setpos(window.start)
+        raw_audio = wav.readframes(window.end - window.start)
+
+    return np.frombuffer(raw_audio, dtype="<i2").astype(np.float32) / 32768
+
+
+def get_window_speech_timestamps(
+    wav_file: Path, window: VadWindow, silero_vad_options: dict[str, Any]
+) -> SpeechTimestamps:
+    audio_data = torch.from_numpy(read_wav_window(wav_file, window))
+    window_timestamps = get_speech_timestamps(
+        audio_data,
+        get_silero_model(),
+        sampling_rate=SILERO_SAMPLING_RATE,
+        max_speech_duration_s=float("inf"),
+        **silero_vad_options,
+    )
+
+    # Back to file sample offsets, clipped to the core of this window
+    speech_timestamps: SpeechTimestamps = []
+    for timestamp in window_timestamps:
+        start = max(window.start + timestamp["start"], window.core_start)
+        end = min(window.start + timestamp["end"], window.core_end)
+
+        if start < end:
+            speech_timestamps.append({"start": start, "end": end})
+
+    return speech_timestamps
+
+
+def stitch_window_speech_timestamps(
+    windows: list[VadWindow],
+    window_timestamps: Iterable[SpeechTimestamps],
+    *,
+    min_speech_duration_ms: int = 250,
+) -> SpeechTimestamps:
+    # Speech crossing a core boundary comes back as two pieces that touch
+    # exactly at the boundary, those are joined again. Pieces touching
+    # anywhere else are separate segments in the single pass too, so they are
+    # left alone.
+    core_boundaries = {window.core_end for window in windows}
+    stitched: SpeechTimestamps = []
+
+    for speech_timestamps in window_timestamps:
+        for timestamp in speech_timestamps:
+            if (
+                stitched
+                and stitched[-1]["end"] == timestamp["start"]
+                and timestamp["start"] in core_boundaries
+            ):
+                stitched[-1]["end"] = timestamp["end"]
+            else:
+                stitched.append(dict(timestamp))
+
+    # Clipping may leave a sliver the model disagreed on at a boundary
+    min_speech_samples = min_speech_duration_ms * SILERO_SAMPLING_RATE / 1000
+    return [
+        {
+            "start": round(timestamp["start"] / SILERO_SAMPLING_RATE, 1),
+            "end": round(timestamp["end"] / SILERO_SAMPLING_RATE, 1),
+        }
+        for timestamp in stitched
+        if timestamp["end"] - timestamp["start"] >= min_speech_samples
+    ]
+
+
+def get_parallel_speech_timestamps(
+    wav_file: Path,
+    *,
+    workers: int,
+    window_secs: float = 300,
+    overlap_secs: float = 10,
+    threads_per_worker: int = 1,
+    **silero_vad_options: Any,  # noqa: ANN401
+) -> SpeechTimestamps:
+    # `wav_file` must be 16kHz mono s16le (see SILERO_WAV_ARGS)
+    with wave.open(str(wav_file), "rb") as wav:
+        total_samples = wav.getnframes()
+
+    windows = get_vad_windows(
+        total_samples, window_secs=window_secs, overlap_secs=overlap_secs
+    )
+    if not windows:
+        return []
+
+    # spawn, not fork: a forked child inherits torch's OpenMP pool from the
+    # parent and can hang on its first forward pass.
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(workers, len(windows))),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=partial(warm_up_silero_model, threads=threads_per_worker),
+    ) as executor:
+        # `map` returns windows in submission order, whatever finishes first
+        window_timestamps = list(
+            executor.map(
+                partial(
+                    get_window_speech_timestamps,
+                    silero_vad_options=silero_vad_options,
+                ),
+                [wav_file] * len(windows),
+                windows,
+            )
+        )
+
+    return stitch_window_speech_timestamps(
+        windows,
+        window_timestamps,
+        min_speech_duration_ms=silero_vad_options.get("min_speech_duration_ms", 250),
+    )
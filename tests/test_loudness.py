@@ -0,0 +1,100 @@
+# pyright: basic
+# ruff: noqa: S603,S607
+import re
+import shutil
+from pathlib import Path
+from subprocess import run
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from aivideocut.loudness import measure_loudness
+
+SAMPLING_RATE = 48000
+# ebur128 prints one decimal, so 0.1 LU (and 0.1dB for the true peak) is the
+# best we can assert
+TOLERANCE_LU = 0.1
+TOLERANCE_DB = 0.1
+EBUR128_SUMMARY_RE = re.compile(
+    r"I:\s+(?P<i>-?[\d.]+) LUFS\s+Threshold:\s+(?P<thresh>-?[\d.]+) LUFS"
+    r".*?LRA:\s+(?P<lra>[\d.]+) LU",
+    re.DOTALL,
+)
+EBUR128_TRUE_PEAK_RE = re.compile(r"True peak:\s+Peak:\s+(?P<tp>-?[\d.]+) dBFS")
+
+
+def get_test_signals() -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(0)
+    seconds = np.arange(SAMPLING_RATE * 20)[:, None] / SAMPLING_RATE
+    level_steps = np.repeat([0.002, 0.02, 0.005, 0.03], SAMPLING_RATE * 5)[:, None]
+    stereo_noise = rng.standard_normal((seconds.size, 2))
+    return {
+        "sine 1kHz stereo": 0.25 * np.sin(2 * np.pi * 1000 * seconds) * np.ones(2),
+        "sine 100Hz mono": 0.5 * np.sin(2 * np.pi * 100 * seconds),
+        "pink-ish noise": np.cumsum(stereo_noise, 0) * 0.001,
+        "noise level steps": stereo_noise * level_steps,
+    }
+
+
+def measure_ebur128(wav_path: Path) -> dict[str, float]:
+    # ffmpeg's ebur128 filter is its BS.1770 meter. loudnorm's own first pass
+    # analyses a 192kHz upsampled copy and may drift ~0.2 LU from both on
+    # wideband material, so it is not the reference.
+    # fmt: off
+    ffmpeg_output = run(
+        [
+            "ffmpeg", "-hide_banner", "-nostats",
+            "-i", wav_path,
+            "-af", "ebur128=peak=true",
+            "-f", "null", "-",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    # fmt: on
+    summary_output = ffmpeg_output[ffmpeg_output.rfind("Summary") :]
+    summary = EBUR128_SUMMARY_RE.search(summary_output)
+    true_peak = EBUR128_TRUE_PEAK_RE.search(summary_output)
+    assert summary is not None, ffmpeg_output
+    assert true_peak is not None, ffmpeg_output
+    return {
+        key: float(value)
+        for key, value in (summary.groupdict() | true_peak.groupdict()).items()
+    }
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+@pytest.mark.parametrize("name", list(get_test_signals()))
+def test_loudness_matches_ffmpeg_ebur128(tmp_path: Path, name: str):
+    wav_path = tmp_path / "signal.wav"
+    sf.write(wav_path, get_test_signals()[name].astype(np.float32), SAMPLING_RATE)
+
+    loudness_stats = measure_loudness(wav_path)
+    ebur128 = measure_ebur128(wav_path)
+
+    assert loudness_stats.integrated == pytest.approx(ebur128["i"], abs=TOLERANCE_LU)
+    assert loudness_stats.threshold == pytest.approx(
+        ebur128["thresh"], abs=TOLERANCE_LU
+    )
+    assert loudness_stats.loudness_range == pytest.approx(
+        ebur128["lra"], abs=TOLERANCE_LU
+    )
+    assert loudness_stats.true_peak == pytest.approx(ebur128["tp"], abs=TOLERANCE_DB)
+
+
+def test_true_peak_finds_peaks_between_samples(tmp_path: Path):
+    # A 12kHz sine at 48kHz sampled 45 degrees off its peaks: every sample is
+    # 3dB under the true peak. ffmpeg's own interpolator reads ~0.6dB over it
+    # at this frequency, so the reference is the sine's exact peak.
+    wav_path = tmp_path / "signal.wav"
+    seconds = np.arange(SAMPLING_RATE * 5) / SAMPLING_RATE
+    signal = 0.5 * np.sin(2 * np.pi * 12000 * seconds + np.pi / 4)
+    sf.write(wav_path, signal.astype(np.float32), SAMPLING_RATE)
+
+    loudness_stats = measure_loudness(wav_path)
+
+    assert loudness_stats.true_peak == pytest.approx(
+        20 * np.log10(0.5), abs=TOLERANCE_DB
+    )
@@ -0,0 +1,188 @@
+# pyright: basic
+from collections.abc import Generator
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from aivideocut.journal import get_journal_path
+from aivideocut.remap import TimeRemap
+
+transcribe = pytest.importorskip("aivideocut.transcribe")
+
+# One segment every 2s of a 120s file, three batched VAD clips
+FAKE_SECS = 120
+FAKE_SEGMENTS = [
+    (secs, secs + 1.5, f" Frase {secs // 2}.") for secs in range(0, FAKE_SECS, 2)
+]
+FAKE_CLIPS = [(0.0, 38.0), (40.0, 78.0), (80.0, 120.0)]
+# The window with this segment falls back to a hot temperature, which resets
+# the prompt for the windows after it
+HOT_SEGMENT_INDEX = 22
+
+
+class FakeWhisperModel:
+    # Decodes FAKE_SEGMENTS and crashes after `crash_after` of them, like a
+    # killed run. The sequential text depends on where its 30s window starts
+    # and on the prompt, like Whisper's does.
+    def __init__(self) -> None:
+        self.crash_after: int | None = None
+        self.decoded = 0
+
+    def decode(
+        self, index: int, *, seek: int, text: str, temperature: float
+    ) -> SimpleNamespace:
+        if self.decoded == self.crash_after:
+            msg = "killed"
+            raise RuntimeError(msg)
+
+        self.decoded += 1
+        start, end, _ = FAKE_SEGMENTS[index]
+        return SimpleNamespace(
+            seek=seek,
+            start=start,
+            end=end,
+            text=text,
+            tokens=[index + 1],
+            temperature=temperature,
+            words=None,
+        )
+
+    def iter_clip_segments(
+        self, clips: list[tuple[float, float]]
+    ) -> Generator[SimpleNamespace]:
+        for clip_start, clip_end in clips:
+            for index, (start, _, text) in enumerate(FAKE_SEGMENTS):
+                if clip_start <= start < clip_end:
+                    yield self.decode(
+                        index, seek=round(clip_start * 100), text=text, temperature=0
+                    )
+
+    def iter_window_segments(
+        self, seek: int, prompt: list[int]
+    ) -> Generator[SimpleNamespace]:
+        while seek < FAKE_SECS * 100:
+            indexes = [
+                index
+                for index, (start, _, _) in enumerate(FAKE_SEGMENTS)
+                if seek <= start * 100 < seek + 3000
+            ]
+            if not indexes:
+                seek += 3000
+                continue
+
+            temperature = 1.0 if HOT_SEGMENT_INDEX in indexes else 0.0
+            context = f" [{seek} {sum(prompt[-223:])}]"
+            for index in indexes:
+                text = FAKE_SEGMENTS[index][2] + context
+                yield self.decode(index, seek=seek, text=text, temperature=temperature)
+
+            prompt = [] if temperature > 0.5 else [*prompt, *(i + 1 for i in indexes)]
+            seek = round(FAKE_SEGMENTS[indexes[-1]][1] * 100)
+
+    def transcribe(
+        self,
+        _audio: object,
+        *,
+        clip_timestamps: list[float] | None = None,
+        initial_prompt: list[int] | None = None,
+        **_: object,
+    ) -> tuple[Generator[SimpleNamespace], None]:
+        seek = round(clip_timestamps[0] * 100) if clip_timestamps else 0
+        return self.iter_window_segments(seek, list(initial_prompt or [])), None
+
+
+class FakeBatchedInferencePipeline:
+    def __init__(self, *, model: FakeWhisperModel) -> None:
+        self.model = model
+
+    def transcribe(
+        self,
+        _audio: object,
+        *,
+        clip_timestamps: list[dict[str, int]] | None = None,
+        **_: object,
+    ) -> tuple[Generator[SimpleNamespace], None]:
+        clips = [
+            (clip["start"] / 16000, clip["end"] / 16000)
+            for clip in clip_timestamps or []
+        ]
+        return self.model.iter_clip_segments(clips or FAKE_CLIPS), None
+
+
+@pytest.fixture
+def whisper_model(monkeypatch: pytest.MonkeyPatch) -> FakeWhisperModel:
+    model = FakeWhisperModel()
+    monkeypatch.setattr(transcribe, "get_whisper_model", lambda **_: model)
+    monkeypatch.setattr(
+        transcribe, "BatchedInferencePipeline", FakeBatchedInferencePipeline
+    )
+    monkeypatch.setattr(transcribe, "decode_audio", lambda *_, **__: np.zeros(16000))
+    monkeypatch.setattr(transcribe, "get_vad_clips", lambda _: FAKE_CLIPS)
+    return model
+
+
+@pytest.mark.parametrize("batch_size", [1, 8])
+@pytest.mark.parametrize("crash_after", [0, 4, 15, 16, 24, 31, 57])
+def test_resumed_whole_file_srt_is_byte_identical(
+    tmp_path: Path,
+    whisper_model: FakeWhisperModel,
+    batch_size: int,
+    crash_after: int,
+):
+    input_file = tmp_path / "video.mp4"
+    input_file.write_bytes(b"not really a video")
+
+    full_srt = transcribe.transcribe_to_srt(
+        input_file=input_file,
+        output_file=tmp_path / "full.srt",
+        batch_size=batch_size,
+        checkpoint=False,
+    )
+    total_segments = whisper_model.decoded
+
+    resumed_srt = tmp_path / "resumed.srt"
+    whisper_model.crash_after, whisper_model.decoded = crash_after, 0
+    with pytest.raises(RuntimeError, match="killed"):
+        transcribe.transcribe_to_srt(
+            input_file=input_file,
+            output_file=resumed_srt,
+            batch_size=batch_size,
+            checkpoint=True,
+        )
+    assert get_journal_path(resumed_srt).is_file()
+    assert not resumed_srt.exists()
+
+    whisper_model.crash_after, whisper_model.decoded = None, 0
+    transcribe.transcribe_to_srt(
+        input_file=input_file,
+        output_file=resumed_srt,
+        batch_size=batch_size,
+        checkpoint=True,
+    )
+
+    assert resumed_srt.read_bytes() == full_srt.read_bytes()
+    assert not get_journal_path(resumed_srt).exists()
+    # At most the unfinished window or clip is decoded again
+    assert whisper_model.decoded <= total_segments - crash_after + 20
+
+
+def test_segment_ending_at_a_join_keeps_its_source_end() -> None:
+    # Kept 1-3s and 10-12s: output 2s is both the end of the first interval
+    # and the start of the second one
+    remap = TimeRemap.from_intervals(
+        [{"start": 1.0, "end": 3.0}, {"start": 10.0, "end": 12.0}]
+    )
+    segment = {
+        "start": 0.5,
+        "end": 2.0,
+        "text": " Frase.",
+        "words": [{"start": 0.5, "end": 2.0, "word": " Frase."}],
+    }
+
+    remapped_segment = transcribe.remap_segment_to_source(segment, remap)
+
+    assert (remapped_segment["start"], remapped_segment["end"]) == (1.5, 3.0)
+    assert remapped_segment["words"][0]["end"] == 3.0
+    assert remap.to_source(2.0) == 10.0